@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sket.nerd.normalizer import MinMaxNormalizer, combsum, select_candidates
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--mentions', default=2000, type=int, help='Number of mentions awaiting similarity-based linking.')
+parser.add_argument('--labels', default=300, type=int, help='Number of ontology labels of the use case.')
+parser.add_argument('--dim', default=200, type=int, help='Size of word2vec vectors.')
+parser.add_argument('--runs', default=5, type=int, help='Number of runs per configuration.')
+parser.add_argument('--thr', default=0.9, type=float, help='Similarity threshold.')
+args = parser.parse_args()
+
+
+def per_mention(mention_vectors, label_vectors, string_scores, labels):
+    """
+    Score mention-label pairs one at a time, then normalize and combine scores one mention at a time (former behavior)
+
+    Params:
+        mention_vectors (np.array): (mentions x dim) word2vec vectors
+        label_vectors (np.array): (labels x dim) word2vec vectors
+        string_scores (np.array): (mentions x labels) string matching scores
+        labels (list(str)): label ids
+
+    Returns: the linked label (or None) for each mention
+    """
+
+    linked = []
+    for mention_vector, mention_string_scores in zip(mention_vectors, string_scores):
+        mention_scores = np.array([
+            [mention_vector.dot(label_vector) / (np.linalg.norm(mention_vector) * np.linalg.norm(label_vector)), string_score]
+            for label_vector, string_score in zip(label_vectors, mention_string_scores)])
+        norms = {i: MinMaxNormalizer(mention_scores[:, i]) for i in range(0, mention_scores.shape[1])}
+        comb_scores = np.array([norms[i](mention_scores[:, i]) for i in range(0, mention_scores.shape[1])]).sum(axis=0)
+        if np.argwhere(comb_scores >= args.thr).size != 0:
+            linked.append(labels[np.argsort(-comb_scores[:])[0]])
+        else:
+            linked.append(None)
+    return linked
+
+
+def batched(mention_vectors, label_vectors, string_scores, labels):
+    """
+    Build the (mentions x labels x methods) score tensor, then normalize and combine scores for all mentions at once (current behavior)
+
+    Params:
+        mention_vectors (np.array): (mentions x dim) word2vec vectors
+        label_vectors (np.array): (labels x dim) word2vec vectors
+        string_scores (np.array): (mentions x labels) string matching scores
+        labels (list(str)): label ids
+
+    Returns: the linked label (or None) for each mention
+    """
+
+    norms = np.outer(np.linalg.norm(mention_vectors, axis=1), np.linalg.norm(label_vectors, axis=1))
+    scores = np.stack([mention_vectors.dot(label_vectors.T) / norms, string_scores], axis=-1)
+    return select_candidates(combsum(scores, MinMaxNormalizer), labels, args.thr)
+
+
+def main():
+    rng = np.random.default_rng(42)
+    mention_vectors = rng.normal(size=(args.mentions, args.dim))
+    label_vectors = rng.normal(size=(args.labels, args.dim))
+    string_scores = rng.random((args.mentions, args.labels))
+    labels = ['label_' + str(i) for i in range(args.labels)]
+
+    outputs = dict()
+    for name, link in [('per-mention normalizers (former)', per_mention), ('batched tensor (current)', batched)]:
+        timings = []
+        for _ in range(args.runs):
+            st = time.perf_counter()
+            outputs[name] = link(mention_vectors, label_vectors, string_scores, labels)
+            timings.append(time.perf_counter() - st)
+        print('{}: median {:.3f}s over {} mentions x {} labels x 2 methods'.format(name, statistics.median(timings), args.mentions, args.labels))
+    print('same linked labels: {}'.format(len(set(tuple(output) for output in outputs.values())) == 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--runs', default=5, type=int, help='Number of cold imports per configuration.')
+args = parser.parse_args()
+
+# heavy backends that SKET loads only on demand (BERT, fastText, MarianMT, scikit-learn)
+heavy_modules = ['torch', 'fasttext', 'transformers', 'sklearn']
+
+# code executed within a fresh interpreter -- times the import of SKET and reports which heavy backends got loaded
+probe = """
+import sys, time, json
+st = time.perf_counter()
+{eager}
+import sket.sket
+end = time.perf_counter()
+print(json.dumps({{'seconds': end - st, 'loaded': [m for m in {heavy} if m in sys.modules]}}))
+"""
+
+# import statements replicating the former module-level imports of nerd.py and report_processing.py
+eager_imports = 'import torch, fasttext\nfrom sklearn.metrics.pairwise import cosine_similarity\nfrom transformers import AutoTokenizer, AutoModel, MarianMTModel, MarianTokenizer'
+
+
+def cold_import(eager):
+    """
+    Import SKET within a fresh interpreter
+
+    Params:
+        eager (bool): whether to import heavy backends upfront (former behavior)
+
+    Returns: import time (in seconds) and list of loaded heavy backends
+    """
+
+    code = probe.format(eager=eager_imports if eager else '', heavy=heavy_modules)
+    out = subprocess.run(
+        [sys.executable, '-c', code], cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'),
+        stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    res = json.loads(out.stdout.strip().split('\n')[-1])
+    return res['seconds'], res['loaded']
+
+
+def main():
+    for name, eager in [('eager (former)', True), ('lazy (current)', False)]:
+        timings = []
+        loaded = []
+        for _ in range(args.runs):
+            seconds, loaded = cold_import(eager)
+            timings.append(seconds)
+        print('{}: median {:.3f}s, min {:.3f}s over {} runs -- heavy backends loaded: {}'.format(
+            name, statistics.median(timings), min(timings), args.runs, ', '.join(loaded) if loaded else 'none'))
+
+
+if __name__ == "__main__":
+    main()
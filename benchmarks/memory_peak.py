@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--reports', default=100000, type=int, help='Number of reports within the synthetic batch.')
+parser.add_argument('--words', default=200, type=int, help='Number of words within each report.')
+args = parser.parse_args()
+
+# code executed within a fresh interpreter -- measures the peak RSS growth caused by translating a batch of processed reports
+probe = """
+import copy, json, random, resource
+from sket.rep_proc.report_processing import ReportProc
+
+rep_proc = ReportProc('en', 'colon')
+# replace NMT w/ identity -- only the memory spent to build translated reports is measured
+rep_proc.translate_text = lambda text, translator=None: text
+
+random.seed(42)
+words = ['adenoma', 'polyp', 'dysplasia', 'colon', 'biopsy', 'mucosa', 'tubular', 'villous', 'grade', 'low', 'high', 'fragment']
+reports = {{
+    'r_' + str(i): {{'text': ' '.join(random.choice(words) for _ in range({words})), 'age': random.randint(20, 90), 'gender': random.choice(['M', 'F'])}}
+    for i in range({reports})}}
+
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if {former}:  # former behavior -- deep copy the whole batch and overwrite the translated field
+    trans_reports = copy.deepcopy(reports)
+    for rid, report in trans_reports.items():
+        trans_reports[rid]['text'] = rep_proc.translate_text(report['text'])
+else:  # current behavior -- build new records sharing untranslated fields
+    trans_reports = rep_proc.translate_reports(reports)
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{'peak_kb': peak - baseline}}))
+"""
+
+
+def peak_rss(former):
+    """
+    Translate a synthetic batch within a fresh interpreter
+
+    Params:
+        former (bool): whether to deep copy the whole batch (former behavior)
+
+    Returns: peak RSS growth (in MB)
+    """
+
+    code = probe.format(former=former, reports=args.reports, words=args.words)
+    out = subprocess.run(
+        [sys.executable, '-c', code], cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'),
+        stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    res = json.loads(out.stdout.strip().split('\n')[-1])
+    # ru_maxrss is expressed in kilobytes on Linux
+    return res['peak_kb'] / 1024
+
+
+def main():
+    for name, former in [('deepcopy (former)', True), ('structural sharing (current)', False)]:
+        print('{}: peak RSS growth {:.1f} MB over {} reports'.format(name, peak_rss(former), args.reports))
+
+
+if __name__ == "__main__":
+    main()
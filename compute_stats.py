@@ -1,34 +1,32 @@
-import json
 import glob
 import argparse
+import itertools
 import numpy as np
 
+from sket.utils import utils
+
 parser = argparse.ArgumentParser()
-parser.add_argument('--outputs', default='./outputs/concepts/refined/colon/*.json', type=str, help='SKET results file.')
+parser.add_argument('--outputs', default='./outputs/concepts/refined/colon/*.jsonl', type=str, help='SKET results file.')
 parser.add_argument('--use_case', default='colon', choices=['colon', 'cervix', 'lung'], help='Considered use-case.')
 args = parser.parse_args()
 
 
 def main():
     # read SKET results
-    if '*.json' == args.outputs.split('/')[-1]:  # read files
+    if args.outputs.split('/')[-1] in ['*.json', '*.jsonl']:  # read files
         # read file paths
         rsfps = glob.glob(args.outputs)
-        # set dict
-        rs = {}
-        for rsfp in rsfps:
-            with open(rsfp, 'r') as rsf:
-                rs.update(json.load(rsf))
     else:  # read file
-        with open(args.outputs, 'r') as rsf:
-            rs = json.load(rsf)
+        rsfps = [args.outputs]
+    # set generator over (report id, result) pairs -- JSON Lines files are streamed one report at a time
+    rs = itertools.chain.from_iterable([utils.iter_json(rsfp) for rsfp in rsfps])
 
-    stats = []
-    # loop over reports and store size
-    for rid, rdata in rs.items():
-        stats.append(sum([len(sem_data) for sem_cat, sem_data in rdata.items()]))
+    stats = {}
+    # loop over reports and store size -- reports appearing in multiple files are counted once
+    for rid, rdata in rs:
+        stats[rid] = sum([len(sem_data) for sem_cat, sem_data in rdata.items()])
     # convert into numpy
-    stats = np.array(stats)
+    stats = np.array(list(stats.values()))
     print('size: {}'.format(np.size(stats)))
     print('max: {}'.format(np.max(stats)))
     print('min: {}'.format(np.min(stats)))
@@ -3,13 +3,16 @@ import json
 import glob
 import os
 import argparse
+import itertools
 
 from sklearn.metrics import hamming_loss, accuracy_score, classification_report
 
+from sket.utils import utils
+
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--gt', default='./ground_truth/lung/aoec/lung_labels_allDS.json', type=str, help='Ground truth file.')
-parser.add_argument('--outputs', default='./outputs/labels/aoec/lung/*.json', type=str, help='SKET results file.')
+parser.add_argument('--outputs', default='./outputs/labels/aoec/lung/*.jsonl', type=str, help='SKET results file.')
 parser.add_argument('--use_case', default='lung', choices=['colon', 'cervix', 'lung'], help='Considered use-case.')
 parser.add_argument('--hospital', default='aoec', choices=['aoec', 'radboud'], help='Considered hospital.')
 parser.add_argument('--debug', default=False, action='store_true', help='Whether to use evaluation for debugging purposes.')
@@ -76,21 +79,17 @@ def main():
     gt_name = args.gt.split('/')[-1].split('.')[0]
 
     # read SKET results
-    if '*.json' == args.outputs.split('/')[-1]:  # read files
+    if args.outputs.split('/')[-1] in ['*.json', '*.jsonl']:  # read files
         # read file paths
         rsfps = glob.glob(args.outputs)
-        # set dict
-        rs = {}
-        for rsfp in rsfps:
-            with open(rsfp, 'r') as rsf:
-                rs.update(json.load(rsf))
     else:  # read file
-        with open(args.outputs, 'r') as rsf:
-            rs = json.load(rsf)
+        rsfps = [args.outputs]
+    # set generator over (report id, result) pairs -- JSON Lines files are streamed one report at a time
+    rs = itertools.chain.from_iterable([utils.iter_json(rsfp) for rsfp in rsfps])
 
     sket = {}
     # prepare SKET results for evaluation
-    for rid, rdata in rs.items():
+    for rid, rdata in rs:
         if args.use_case == 'colon' and args.hospital == 'aoec' and '2ndDS' in args.gt:
             rid = rid.split('_')[0]
         if args.hospital == 'radboud' and args.use_case == 'colon':
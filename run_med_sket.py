@@ -8,6 +8,8 @@ warnings.filterwarnings("ignore", message=r"\[W008\]", category=UserWarning)
 parser = argparse.ArgumentParser()
 parser.add_argument('--src_lang', default='it', type=str, help='Considered source language.')
 parser.add_argument('--use_case', default='colon', choices=['colon', 'cervix', 'lung'], help='Considered use-case.')
+parser.add_argument('--use_cases', default=None, nargs='+', choices=['colon', 'cervix', 'lung'], help='Considered use-cases. If specified, annotate reports for all the use-cases in one pass.')
+parser.add_argument('--route', default=False, action='store_true', help='Whether to route reports to the likely use-cases before annotating them. Used with --use_cases.')
 parser.add_argument('--spacy_model', default='en_core_sci_sm', type=str, help='Considered NLP spacy model.')
 parser.add_argument('--w2v_model', default=False, action='store_true', help='Considered word2vec model.')
 parser.add_argument('--fasttext_model', default=None, type=str, help='File path for FastText model.')
@@ -18,14 +20,17 @@ parser.add_argument('--thr', default=0.9, type=float, help='Similarity threshold
 parser.add_argument('--store', default=False, action='store_true', help='Whether to store concepts, labels, and graphs.')
 parser.add_argument('--rdf_format', default='all', choices=['n3', 'trig', 'turtle', 'all'], help='Whether to specify the rdf format for graph serialization. If "all" is specified, serialize w/ the three different formats')
 parser.add_argument('--raw', default=False, action='store_true', help='Whether to consider full pipeline or not.')
+parser.add_argument('--prefilter', default=False, action='store_true', help='Whether to skip NERD for reports without candidate entities.')
 parser.add_argument('--debug', default=False, action='store_true', help='Whether to use flags for debugging.')
 parser.add_argument('--dataset', default='', type=str, help='Dataset file path.')
+parser.add_argument('--sentence_cache', default=None, type=int, help='Max number of sentences cached for each use-case. If not specified (default to None), reports are processed as whole documents.')
+parser.add_argument('--whole_doc', default=False, action='store_true', help='Whether to process reports as whole documents even when the sentence cache is enabled.')
 args = parser.parse_args()
 
 
 def main():
     # set SKET
-    sket = SKET(args.use_case, args.src_lang, args.spacy_model, args.w2v_model, args.fasttext_model, args.bert_model, args.string_model, args.gpu)
+    sket = SKET(args.use_case, args.src_lang, args.spacy_model, args.w2v_model, args.fasttext_model, args.bert_model, args.string_model, args.gpu, sentence_cache=args.sentence_cache, whole_doc=args.whole_doc)
 
     if args.dataset:  # use dataset from file path
         dataset = args.dataset
@@ -38,7 +43,10 @@ def main():
         }
 
     # use SKET pipeline to extract concepts, labels, and graphs from dataset
-    sket.med_pipeline(dataset, args.src_lang, args.use_case, args.thr, args.store, args.rdf_format, args.raw, args.debug)
+    if args.use_cases:  # annotate reports for several use cases in one pass
+        sket.multi_pipeline(dataset, args.src_lang, args.use_cases, args.thr, args.store, args.rdf_format, args.raw, args.debug, route=args.route)
+    else:
+        sket.med_pipeline(dataset, args.src_lang, args.use_case, args.thr, args.store, args.rdf_format, args.raw, args.debug, prefilter=args.prefilter)
 
     if args.raw:
         print('processed data up to concepts.')
@@ -21,6 +21,10 @@ parser.add_argument('--gpu', default=None, type=int, help='Considered GPU device
 parser.add_argument('--thr', default=2.0, type=float, help='Similarity threshold.')
 parser.add_argument('--raw', default=False, action='store_true', help='Whether to return concepts within semantic areas (deployment) or mentions+concepts (debugging)')
 parser.add_argument('--debug', default=False, action='store_true', help='Whether to use flags for debugging.')
+parser.add_argument('--workers', default=None, type=int, help='Number of worker processes used to create RDF graphs. If not specified (default to None), graphs are created in the main process.')
+parser.add_argument('--chunk_size', default=None, type=int, help='Number of reports within each checkpointed chunk. If specified, processed, translated, and linked reports are checkpointed and reruns resume from the last completed chunk.')
+parser.add_argument('--sentence_cache', default=None, type=int, help='Max number of sentences cached for each use-case. If not specified (default to None), reports are processed as whole documents.')
+parser.add_argument('--whole_doc', default=False, action='store_true', help='Whether to process reports as whole documents even when the sentence cache is enabled.')
 args = parser.parse_args()
 
 
@@ -34,10 +38,10 @@ def main():
         print('Input hospital does not belong to available ones.\nPlease consider either "aoec" or "radboud" as hospital.')
         raise Exception
     # set SKET
-    sket = SKET(args.use_case, src_lang, args.spacy_model, args.w2v_model, args.fasttext_model, args.bert_model, args.string_model, args.gpu)
+    sket = SKET(args.use_case, src_lang, args.spacy_model, args.w2v_model, args.fasttext_model, args.bert_model, args.string_model, args.gpu, sentence_cache=args.sentence_cache, whole_doc=args.whole_doc)
 
     # use SKET pipeline to extract concepts, labels, and graphs from args.dataset
-    sket.exa_pipeline(args.dataset, args.sheet, args.header, args.ver, args.use_case, args.hospital, args.thr, args.raw, args.debug)
+    sket.exa_pipeline(args.dataset, args.sheet, args.header, args.ver, args.use_case, args.hospital, args.thr, args.raw, args.debug, args.workers, args.chunk_size)
 
 
 if __name__ == "__main__":
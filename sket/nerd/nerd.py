@@ -1,25 +1,23 @@
 import numpy as np
-import torch
 import spacy
-import fasttext
 import itertools
 import re
+import threading
 
 from tqdm import tqdm
 from textdistance import ratcliff_obershelp
 from spacy.tokens import Span
 from spacy.matcher import PhraseMatcher
-from sklearn.metrics.pairwise import cosine_similarity
-from transformers import AutoTokenizer, AutoModel
 
-from .normalizer import MinMaxNormalizer
+from .normalizer import MinMaxNormalizer, StandardizationNormalizer, IdentityNormalizer, combsum, select_candidates
+from .sentence_cache import SentenceCache
 from ..utils import utils
 from ..negex.negation import Negex
 
 
 class NERD(object):
 
-	def __init__(self, biospacy="en_core_sci_lg", biow2v=True, str_match=False, biofast=None, biobert=None, rules=None, dysplasia_mappings=None, cin_mappings=None, gpu=None):
+	def __init__(self, biospacy="en_core_sci_lg", biow2v=True, str_match=False, biofast=None, biobert=None, rules=None, dysplasia_mappings=None, cin_mappings=None, gpu=None, sentence_cache=None, norm='minmax'):
 		"""
 		Load models and rules
 
@@ -33,42 +31,36 @@ class NERD(object):
 			dysplasia_mappings (str): dysplasia mappings file path
 			cin_mappings (str): cin mappings file path
 			gpu (int): use gpu when using BERT
+			sentence_cache (int): max number of sentences cached for each use case -- if None, reports are processed as whole documents
+			norm (str): normalization applied to sim scores before combSUM -- i.e., minmax, standardization, or identity
 
 		Returns: None
 		"""
 
 		# prepare spaCy model
 		self.nlp = spacy.load(biospacy)
-		# prepare PhraseMatcher model
-		self.matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
 		# prepare Negex model
 		self.negex = Negex(self.nlp, language="en_clinical", chunk_prefix=["free of", "free from"])  # chunk_prefix allows to match also negations chunked together w/ entity mentions
 		self.negex.add_patterns(preceding_negations=["free from"])  # @smarchesin TODO: read negations from file if the number of patterns rises
 		self.negex.remove_patterns(following_negations=["free"])  # 'free' pattern clashes w/ 'free of' and 'free from' -- @smarchesin TODO: is there a way to fix this without removing 'free'?
 
-		# load hand-crafted rules
-		if rules:  # custom hand-crafted rules file path
-			self.rules = utils.read_rules(rules)
-		else:  # default hand-crafted rules file path
-			self.rules = utils.read_rules('./sket/nerd/rules/rules.txt')
-		# set patterns for PhraseMatcher 
-		self.patterns = {use_case: {trigger: [self.nlp(candidate) for candidate in candidates[0]] for trigger, candidates in rules.items()} for use_case, rules in self.rules.items()}
-
 		# add expand_entity_mentions to spaCy processing pipeline
 		self.nlp.add_pipe(self.expand_entity_mentions, name='expand_entities', after='ner')
 		# add negation detector to spaCy pipeline
-		self.nlp.add_pipe(self.negex, last=True)
+		self.nlp.add_pipe(self.negex, name='negex', last=True)
 
 		self.biow2v = biow2v
 		if str_match:  # prepare string matching model
 			self.gpm = ratcliff_obershelp  # gpm == gestalt pattern matching
 		else:
 			self.gpm = None
-		if biofast:  # prepare fasttext model
+		if biofast:  # prepare fasttext model -- import fasttext only when required
+			import fasttext
 			self.biofast_model = fasttext.load_model(biofast)
 		else:
 			self.biofast_model = None
-		if biobert:  # prepare bert model
+		if biobert:  # prepare bert model -- import transformers only when required
+			from transformers import AutoTokenizer, AutoModel
 			self.bert_tokenizer = AutoTokenizer.from_pretrained(biobert)
 			self.bert_model = AutoModel.from_pretrained(biobert)
 			self.gpu = gpu
@@ -80,16 +72,10 @@ class NERD(object):
 		else:
 			self.bert_model = None
 
-		# load dysplasia mappings
-		if dysplasia_mappings:  # custom dysplasia mappings file path
-			self.dysplasia = utils.read_dysplasia_mappings(dysplasia_mappings)
-		else:  # default dysplasia mappings file path
-			self.dysplasia = utils.read_dysplasia_mappings('./sket/nerd/rules/dysplasia_mappings.txt')
-		# load cin mappings
-		if cin_mappings:  # custom cin mappings file path
-			self.cin = utils.read_cin_mappings(cin_mappings)
-		else:  # default cin mappings file path
-			self.cin = utils.read_cin_mappings('./sket/nerd/rules/cin_mappings.txt')
+		# set hand-crafted rules, dysplasia and cin mappings file paths (custom or default)
+		self.rules_path = rules if rules else './sket/nerd/rules/rules.txt'
+		self.dysplasia_path = dysplasia_mappings if dysplasia_mappings else './sket/nerd/rules/dysplasia_mappings.txt'
+		self.cin_path = cin_mappings if cin_mappings else './sket/nerd/rules/cin_mappings.txt'
 		# define set of ad hoc linking functions
 		self.ad_hoc_linking = {
 			'colon': self.ad_hoc_colon_linking,
@@ -106,14 +92,114 @@ class NERD(object):
 		}
 		# set parameter to None before choosing use case
 		self.use_case_ad_hoc_post_processing = None
-		# set parameter to store the hand-crated rules restricted to a specific use-case (updated w/ self.set_rules() func)
-		self.use_case_rules = dict()
-		# set parameter to store dysplasia  mappings restricted to a specific use-case
-		self.use_case_dysplasia = dict()
+		# set normalization applied to the sim scores of each method before combSUM
+		self.normalizers = {
+			'minmax': MinMaxNormalizer,
+			'standardization': StandardizationNormalizer,
+			'identity': IdentityNormalizer
+		}
+		if norm not in self.normalizers:  # raise exception
+			print('provide correct normalization: "minmax", "standardization", or "identity"')
+			raise Exception
+		self.norm = norm
+		# set thread-local state used by batched linking -- mentions awaiting similarity-based linking and their linked labels
+		self.local = threading.local()
+		# set sentence-level processing -- sentence caches are part of the knowledge, so that reloads drop cached sentences
+		self.sentence_cache = sentence_cache
+		self.sentence_regex = re.compile(r'(?<=[.;!?])\s+')
+		# set parameters to store the knowledge restricted to a specific use-case (updated w/ self.restrict2use_case() func)
+		self.use_case = None
+		self.use_case_knowledge = None
+		# build knowledge (rules, PhraseMatcher, mappings, and ad hoc functions) for each use case
+		self.kb = dict()
+		self.set_knowledge(self.build_knowledge(self.rules_path, self.dysplasia_path, self.cin_path))
 
 	# COMMON FUNCTIONS
 
-	def restrict2use_case(self, use_case):  # @smarchesin TODO: remove all the triggers within PhraseMacher by looping over use cases - then consider only the use case ones
+	def build_matcher(self, use_case_rules):
+		"""
+		Build the PhraseMatcher containing the triggers of the hand-crafted rules for a given use case
+
+		Params:
+			use_case_rules (dict): hand-crafted rules restricted to the considered use case
+
+		Returns: a PhraseMatcher storing the candidates for each trigger
+		"""
+
+		matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+		for trigger, candidates in use_case_rules.items():  # add candidates as patterns for the given trigger
+			matcher.add(trigger, None, *[self.nlp.make_doc(candidate) for candidate in candidates[0]])
+		return matcher
+
+	def build_knowledge(self, rules=None, dysplasia_mappings=None, cin_mappings=None):
+		"""
+		Build the knowledge used for each use case -- only the artefacts depending on the provided files are rebuilt, the others are reused
+
+		Params:
+			rules (str): path to hand-crafted rules file (or None to reuse the current rules)
+			dysplasia_mappings (str): path to dysplasia mappings file (or None to reuse the current mappings)
+			cin_mappings (str): path to cin mappings file (or None to reuse the current mappings)
+
+		Returns: a dict of {use_case: {rules, matcher, dysplasia, cin, ad_hoc_linking, ad_hoc_post_processing, sentences}}
+		"""
+
+		# read the updated files only
+		new_rules = utils.read_rules(rules) if rules else None
+		new_dysplasia = utils.read_dysplasia_mappings(dysplasia_mappings) if dysplasia_mappings else None
+		new_cin = utils.read_cin_mappings(cin_mappings) if cin_mappings else None
+
+		knowledge = dict()
+		for use_case in self.ad_hoc_linking.keys():
+			current = self.kb.get(use_case)
+			knowledge[use_case] = {
+				'rules': new_rules[use_case] if new_rules else current['rules'],
+				'matcher': self.build_matcher(new_rules[use_case]) if new_rules else current['matcher'],
+				'dysplasia': new_dysplasia[use_case] if new_dysplasia else current['dysplasia'],
+				'cin': new_cin if new_cin else current['cin'],
+				'ad_hoc_linking': self.ad_hoc_linking[use_case],
+				'ad_hoc_post_processing': self.ad_hoc_post_processing[use_case],
+				# cached sentences depend on rules and mappings -- start from an empty cache
+				'sentences': SentenceCache(self.sentence_cache) if self.sentence_cache else None
+			}
+		return knowledge
+
+	def set_knowledge(self, knowledge, rules=None, dysplasia_mappings=None, cin_mappings=None):
+		"""
+		Swap the current knowledge w/ the given one -- linking calls that already hold the previous knowledge are not affected
+
+		Params:
+			knowledge (dict): knowledge built w/ self.build_knowledge()
+			rules (str): path to the hand-crafted rules file used to build knowledge (or None if unchanged)
+			dysplasia_mappings (str): path to the dysplasia mappings file used to build knowledge (or None if unchanged)
+			cin_mappings (str): path to the cin mappings file used to build knowledge (or None if unchanged)
+
+		Returns: None
+		"""
+
+		# update file paths
+		self.rules_path = rules if rules else self.rules_path
+		self.dysplasia_path = dysplasia_mappings if dysplasia_mappings else self.dysplasia_path
+		self.cin_path = cin_mappings if cin_mappings else self.cin_path
+		self.kb = knowledge
+		if self.use_case is not None:  # use case already set -- update restricted knowledge
+			self.use_case_knowledge = knowledge[self.use_case]
+
+	def reload_knowledge(self, rules=None, dysplasia_mappings=None, cin_mappings=None):
+		"""
+		Reload hand-crafted rules and/or mappings and swap them w/ the current ones
+
+		Params:
+			rules (str): path to hand-crafted rules file (or None to keep the current rules)
+			dysplasia_mappings (str): path to dysplasia mappings file (or None to keep the current mappings)
+			cin_mappings (str): path to cin mappings file (or None to keep the current mappings)
+
+		Returns: None
+		"""
+
+		knowledge = self.build_knowledge(rules, dysplasia_mappings, cin_mappings)
+		self.set_knowledge(knowledge, rules, dysplasia_mappings, cin_mappings)
+
+	def restrict2use_case(self, use_case):
 		"""
 		Restrict hand crafted rules to the considered use-case
 
@@ -123,39 +209,38 @@ class NERD(object):
 		Returns: the updated rules, candidates, and mappings
 		"""
 
-		# restrict hand crafted rules
-		self.use_case_rules = self.rules[use_case]
-		self.use_case_dysplasia = self.dysplasia[use_case]
+		# restrict knowledge to the use case
+		self.use_case = use_case
+		self.use_case_knowledge = self.kb[use_case]
 		self.use_case_ad_hoc_linking = self.ad_hoc_linking[use_case]
 		self.use_case_ad_hoc_post_processing = self.ad_hoc_post_processing[use_case]
-		# remove triggers within PhraseMatcher
-		for use_case_patterns in self.patterns.values():
-			for trigger in use_case_patterns.keys():
-				if trigger in self.matcher:  # trigger found within PhraseMatcher -- remove it
-					self.matcher.remove(trigger)
-		# add triggers within PhraseMatcher for the specified use case
-		for trigger, candidates in self.patterns[use_case].items():
-			self.matcher.add(trigger, None, *candidates)
 
-	def expand_entity_mentions(self, doc):
+	def expand_entity_mentions(self, doc, knowledge=None):
 		"""
 		Expand entity mentions relying on hand-crafted rules
 
 		Params:
 			doc (spacy.tokens.doc.Doc): text processed w/ spaCy models
+			knowledge (dict): use case knowledge (rules, matcher, mappings) -- if None, use the current use case knowledge
 
 		Returns: a new set of entities for doc
 		"""
 
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
+		if knowledge is None:  # use case not set yet -- keep entity mentions as they are
+			return doc
+		use_case_rules = knowledge['rules']
+		matcher = knowledge['matcher']
 		spans = list()
 		# loop over restricted entities and expand entity mentions based on hand-crafted rules
 		for ent in doc.ents:
 			# identify triggers for current entity mention
-			triggers = [trigger for trigger in self.use_case_rules.keys() if (trigger in ent.text)]
+			triggers = [trigger for trigger in use_case_rules.keys() if (trigger in ent.text)]
 			if triggers:  # current entity presents a trigger
 				# keep longest trigger as candidate trigger - e.g., adenocarcinoma instead of carcinoma
 				trigger = max(triggers, key=len)
-				candidates, location, mode = self.use_case_rules[trigger]
+				candidates, location, mode = use_case_rules[trigger]
 				# check whether the entity mention contains any rule's candidate and exclude those candidates already contained within the entity mention
 				target_candidates = [candidate for candidate in candidates if (candidate not in ent.text)]
 				# search target candidates within preceding, subsequent or both tokens
@@ -163,7 +248,7 @@ class NERD(object):
 					if mode == 'EXACT':  # candidates are matched by exact matching immediately preceding tokens  
 						spans = self.pre_exact_match(doc, ent, target_candidates, spans)
 					elif mode == 'LOOSE':  # candidates are matched by finding matches within preceding tokens
-						spans = self.pre_loose_match(doc, ent, trigger, target_candidates, spans)
+						spans = self.pre_loose_match(doc, ent, trigger, target_candidates, spans, matcher)
 					else:  # wrong or mispelled mode - return exception
 						print("The mode is wrong or misspelled in the rules.txt file")
 						raise Exception
@@ -171,7 +256,7 @@ class NERD(object):
 					if mode == 'EXACT':  # candidates are matched by exact matching immediately subsequent tokens
 						spans = self.post_exact_match(doc, ent, target_candidates, spans)
 					elif mode == 'LOOSE':  # candidates are matched by finding matches within subsequent tokens
-						spans = self.post_loose_match(doc, ent, trigger, target_candidates, spans)
+						spans = self.post_loose_match(doc, ent, trigger, target_candidates, spans, matcher)
 					else:  # wrong or mispelled mode - return exception
 						print("The mode is wrong or misspelled in the rules.txt file")
 						raise Exception
@@ -180,8 +265,8 @@ class NERD(object):
 						spans = self.pre_exact_match(doc, ent, target_candidates, spans)
 						spans = self.post_exact_match(doc, ent, target_candidates, spans)	
 					elif mode == 'LOOSE':  # candidates are matched by finding matches within preceding and subsequent tokens
-						spans = self.pre_loose_match(doc, ent, trigger, target_candidates, spans)
-						spans = self.post_loose_match(doc, ent, trigger, target_candidates, spans)
+						spans = self.pre_loose_match(doc, ent, trigger, target_candidates, spans, matcher)
+						spans = self.post_loose_match(doc, ent, trigger, target_candidates, spans, matcher)
 					else:  # wrong or mispelled mode - return exception
 						print("The mode is wrong or misspelled in the rules.txt file")
 						raise Exception
@@ -290,7 +375,7 @@ class NERD(object):
 		else:  # recursive case
 			return self.skip_post_punct(doc, ix+1)
 
-	def pre_loose_match(self, doc, ent, trigger, candidates, spans):
+	def pre_loose_match(self, doc, ent, trigger, candidates, spans, matcher):
 		"""
 		Perform loose matching between entity mention and preceding candidates and return the extended span (i.e., entity mention + candidate)
 
@@ -300,6 +385,7 @@ class NERD(object):
 			trigger (string): token triggered for the entity mention
 			candidates (list(string)): list of candidates associated to the trigger
 			spans (list(list)): list of span ranges [start, end]
+			matcher (spacy.matcher.PhraseMatcher): PhraseMatcher storing the use case triggers
 
 		Returns: the list of expanded preceding spans given the entity mentions 
 		"""
@@ -308,9 +394,9 @@ class NERD(object):
 		ix = self.get_pre_tokens(ent)  # returns previous token index if not token.is_punct == True, otherwise None
 		if type(ix) == int:  
 			# perform matching over doc and return matches
-			matches = self.matcher(doc)
+			matches = matcher(doc)
 			for m_id, m_start, m_end in matches:
-				if self.matcher.vocab.strings[m_id] != trigger:  # match w/ different trigger
+				if matcher.vocab.strings[m_id] != trigger:  # match w/ different trigger
 					continue
 				if (m_start < ix) or (m_end > ent.start):  # match out of bounds
 					continue
@@ -344,7 +430,7 @@ class NERD(object):
 		else:  # return index of the first token in sentence
 			return sent_ix
 
-	def post_loose_match(self, doc, ent, trigger, candidates, spans):
+	def post_loose_match(self, doc, ent, trigger, candidates, spans, matcher):
 		"""
 		Perform loose matching between entity mention and subsequent candidates and return the extended span (i.e., entity mention + candidate)
 
@@ -354,6 +440,7 @@ class NERD(object):
 			trigger (string): token triggered for the entity mention
 			candidates (list(string)): list of candidates associated to the trigger
 			spans (list(list)): list of span ranges [start, end]
+			matcher (spacy.matcher.PhraseMatcher): PhraseMatcher storing the use case triggers
 
 		Returns: the list of expanded subsequent spans given the entity mentions 
 		"""
@@ -362,9 +449,9 @@ class NERD(object):
 		ix = self.get_post_tokens(ent)
 		if type(ix) == int:  # returns next token index if not token.is_punct == True, otherwise None
 			# perform matching over doc and return matches
-			matches = self.matcher(doc)
+			matches = matcher(doc)
 			for m_id, m_start, m_end in matches:
-				if self.matcher.vocab.strings[m_id] != trigger:  # match w/ different trigger
+				if matcher.vocab.strings[m_id] != trigger:  # match w/ different trigger
 					continue
 				if (m_start < ent.end) or (m_end > ix):  # match out of bounds
 					continue
@@ -419,23 +506,101 @@ class NERD(object):
 				merged_spans.append(current)
 		return merged_spans
 
-	def extract_entity_mentions(self, text, keep_negated=False):
+	def extract_entity_mentions(self, text, keep_negated=False, knowledge=None):
 		"""
 		Extract entity mentions identified within text.
 
 		Params:
 			text (str): text to be processed.
 			keep_negated (bool): keep negated entity mentions
+			knowledge (dict): use case knowledge used to expand entity mentions -- if None, use the current use case knowledge
 
 		Returns: a list of named/unnamed detected entity mentions
 		"""
 
-		doc = self.nlp(text)
+		if knowledge is None:  # process text w/ the whole pipeline
+			doc = self.nlp(text)
+		else:  # expand entity mentions w/ the given knowledge and then detect negations
+			doc = self.nlp(text, disable=['expand_entities', 'negex'])
+			doc = self.negex(self.expand_entity_mentions(doc, knowledge))
 		if keep_negated:  # keep negated mentions
 			return [mention for mention in doc.ents]
 		else: 
 			return [mention for mention in doc.ents if mention._.negex is False]
 
+	def extract_batch_entity_mentions(self, texts, keep_negated=False, knowledge=None, batch_size=32):
+		"""
+		Extract entity mentions identified within texts -- texts are processed in batches w/ spaCy
+
+		Params:
+			texts (list(str)): texts to be processed
+			keep_negated (bool): keep negated entity mentions
+			knowledge (dict): use case knowledge used to expand entity mentions -- if None, use the current use case knowledge
+			batch_size (int): number of texts processed by spaCy at once
+
+		Returns: a list containing, for each text, the list of named/unnamed detected entity mentions
+		"""
+
+		if knowledge is None:  # process texts w/ the whole pipeline
+			docs = self.nlp.pipe(texts, batch_size=batch_size)
+		else:  # expand entity mentions w/ the given knowledge and then detect negations
+			docs = (self.negex(self.expand_entity_mentions(doc, knowledge)) for doc in self.nlp.pipe(texts, batch_size=batch_size, disable=['expand_entities', 'negex']))
+		if keep_negated:  # keep negated mentions
+			return [[mention for mention in doc.ents] for doc in docs]
+		else:
+			return [[mention for mention in doc.ents if mention._.negex is False] for doc in docs]
+
+	def split_sentences(self, text):
+		"""
+		Split text into sentences -- sentences end w/ '.', ';', '!', or '?' followed by whitespaces
+
+		Params:
+			text (str): text to be split
+
+		Returns: the list of sentences
+		"""
+
+		return [sentence for sentence in self.sentence_regex.split(text) if sentence]
+
+	def link_sentences(self, texts, labels, sim_thr=0.7, debug=False, knowledge=None, batch_size=32):
+		"""
+		Extract and link entity mentions sentence by sentence -- only sentences missing from the sentence cache are processed
+
+		Params:
+			texts (list(str)): texts to be processed
+			labels (list(spacy.token.span.Span)): list of concept labels from reference ontology
+			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge storing the sentence cache -- if None, use the current use case knowledge
+			batch_size (int): number of sentences processed by spaCy at once
+
+		Returns: a list containing, for each text, the list of [mention, concept label] pairs before post processing
+		"""
+
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
+		cache = knowledge['sentences']
+
+		text_keys = [[(sentence, sim_thr, debug) for sentence in self.split_sentences(text)] for text in texts]
+		keys = list(dict.fromkeys(itertools.chain.from_iterable(text_keys)))
+		entries = cache.get(keys, labels)
+		misses = [key for key in keys if key not in entries]
+		print('sentence cache: {} unique sentences, {} hits -- {} hits, {} misses overall'.format(len(keys), len(keys) - len(misses), cache.hits, cache.misses))
+		if misses:  # extract mentions (keeping negated ones) and link non-negated mentions for missing sentences
+			batch_mentions = self.extract_batch_entity_mentions([key[0] for key in misses], keep_negated=True, knowledge=knowledge, batch_size=batch_size)
+			# link non-negated mentions from all the missing sentences at once
+			linked = iter(self.batch_link_mentions(
+				[[mention] for mentions in batch_mentions for mention in mentions if not mention._.negex], labels, sim_thr, debug, knowledge))
+			computed = dict()
+			for key, mentions in zip(misses, batch_mentions):
+				computed[key] = [[mention.text, mention._.negex, [] if mention._.negex else next(linked)] for mention in mentions]
+			cache.put(computed, labels)
+			entries.update(computed)
+		# assemble the [mention, concept label] pairs of each text from its sentences -- negated mentions are discarded
+		return [
+			[m_and_c for key in keys for _, negated, mentions_and_concepts in entries[key] if not negated for m_and_c in mentions_and_concepts]
+			for keys in text_keys]
+
 	def text_similarity(self, mention, label):
 		"""
 		Compute different similarity measures between entity mention and concept label
@@ -460,6 +625,7 @@ class NERD(object):
 			sim_names += ['gpm']
 
 		if self.biofast_model:  # compute FastText sim scores
+			from sklearn.metrics.pairwise import cosine_similarity
 			fasttext_scores = cosine_similarity(
 				[self.biofast_model.get_sentence_vector(mention.text)], [self.biofast_model.get_sentence_vector(label[0].text)]
 			)
@@ -467,6 +633,8 @@ class NERD(object):
 			sim_names += ['fasttext']
 
 		if self.bert_model:  # compute Bert sim scores
+			import torch
+			from sklearn.metrics.pairwise import cosine_similarity
 			tokens = utils.assign_gpu(self.bert_tokenizer(mention.text, return_tensors="pt"), self.gpu)  # get tokens
 			embs = self.bert_model(**tokens)[0]  # get BERT last layer hidden states
 			pooled_mention = torch.mean(embs, 1).cpu().detach().numpy()  # compute pooling to obtain mention embedding
@@ -484,6 +652,106 @@ class NERD(object):
 			raise Exception
 		return sim_scores, sim_names
 
+	def word2vec_similarity(self, mentions, labels):
+		"""
+		Compute word2vec sim scores between entity mentions and concept labels -- scores match those of spaCy similarity
+
+		Params:
+			mentions (list(spacy.tokens.span.Span)): entity mentions extracted from text
+			labels (list(spacy.tokens.doc.Doc)): concept labels from ontology
+
+		Returns: a (mentions x labels) matrix of sim scores
+		"""
+
+		mention_vectors = np.array([mention.vector for mention in mentions], dtype='float32').reshape(len(mentions), -1)
+		label_vectors = np.array([label.vector for label in labels], dtype='float32').reshape(len(labels), -1)
+		norms = np.outer(np.linalg.norm(mention_vectors, axis=1), np.linalg.norm(label_vectors, axis=1))
+		# mentions or labels w/o vectors get zero similarity
+		scores = np.divide(mention_vectors.dot(label_vectors.T), norms, out=np.zeros(norms.shape, dtype='float32'), where=norms > 0)
+		# mentions and labels sharing the same tokens are fully similar
+		label_orths = dict()
+		for j, label in enumerate(labels):
+			label_orths.setdefault(tuple(token.orth for token in label), []).append(j)
+		for i, mention in enumerate(mentions):
+			for j in label_orths.get(tuple(token.orth for token in mention), []):
+				scores[i, j] = 1.0
+		return scores
+
+	def bert_embeddings(self, mentions, batch_size=64):
+		"""
+		Compute BERT embeddings of entity mentions w/ mean pooling over (non-padding) tokens
+
+		Params:
+			mentions (list(spacy.tokens.span.Span)): entity mentions extracted from text
+			batch_size (int): number of mentions processed by BERT at once
+
+		Returns: a (mentions x hidden size) matrix of mention embeddings
+		"""
+
+		import torch
+		pooled_mentions = []
+		with torch.no_grad():
+			for i in range(0, len(mentions), batch_size):
+				tokens = utils.assign_gpu(self.bert_tokenizer([mention.text for mention in mentions[i:i+batch_size]], return_tensors="pt", padding=True), self.gpu)  # get tokens w/ padding
+				embs = self.bert_model(**tokens)[0]  # get BERT last layer hidden states
+				exp_attention_mask = tokens['attention_mask'].unsqueeze(-1).expand(embs.size())  # broadcast attention mask to embs.size
+				pooled_mentions.append((torch.sum(embs * exp_attention_mask, 1) / exp_attention_mask.sum(1)).cpu().numpy())  # compute pooling -- exp_attention_mask compute proper average (no [PAD])
+		return np.concatenate(pooled_mentions)
+
+	def score_tensor(self, mentions, labels):
+		"""
+		Compute the sim scores between entity mentions and concept labels for each considered method
+
+		Params:
+			mentions (list(spacy.tokens.span.Span)): entity mentions extracted from text
+			labels (dict(label: [spacy.tokens.doc.Doc] | [np.array(728)] | [spacy.tokens.doc.Doc, np.array(728)])): concept labels from reference ontology
+
+		Returns: a (mentions x labels x methods) tensor of sim scores
+		"""
+
+		ldata = list(labels.values())
+		scores = []
+		if self.biow2v:  # compute word2vec sim scores
+			scores.append(self.word2vec_similarity(mentions, [label[0] for label in ldata]))
+
+		if self.gpm:  # compute string matching sim scores
+			scores.append(np.array([[self.gpm.normalized_similarity(mention.text, label[0].text) for label in ldata] for mention in mentions]))
+
+		if self.biofast_model:  # compute FastText sim scores
+			from sklearn.metrics.pairwise import cosine_similarity
+			scores.append(cosine_similarity(
+				[self.biofast_model.get_sentence_vector(mention.text) for mention in mentions], [self.biofast_model.get_sentence_vector(label[0].text) for label in ldata]))
+
+		if self.bert_model:  # compute Bert sim scores
+			from sklearn.metrics.pairwise import cosine_similarity
+			scores.append(cosine_similarity(self.bert_embeddings(mentions), [label[0] if len(label) == 1 else label[1] for label in ldata]))
+
+		if len(scores) == 0:
+			print('No semantic matching method selected.\nPlease select any combination of: "biow2v", "str_match", "biofast", and "biobert"')
+			raise Exception
+		return np.stack(scores, axis=-1)
+
+	def associate_mentions2candidates(self, mentions, labels, sim_thr=0.7):
+		"""
+		Associate entity mentions to candidate concept labels -- sim scores are normalized per mention and method and combined w/ combSUM in one pass
+
+		Params:
+			mentions (list(spacy.tokens.span.Span)): entity mentions extracted from text
+			labels (dict(label: [spacy.tokens.doc.Doc] | [np.array(728)] | [spacy.tokens.doc.Doc, np.array(728)])): concept labels from reference ontology
+			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+
+		Returns: a list containing, for each mention, the candidate ontology concept (or None)
+		"""
+
+		if not mentions:  # no mention to link
+			return []
+		# build the (mentions x labels x methods) score tensor
+		scores = self.score_tensor(mentions, labels)
+		# normalize scores over labels for each mention and method and perform combSUM over methods
+		comb_scores = combsum(scores, self.normalizers[self.norm])
+		# keep labels w/ highest comb_score
+		return select_candidates(comb_scores, list(labels.keys()), sim_thr)
+
 	def associate_mention2candidate(self, mention, labels, sim_thr=0.7):
 		"""
 		Associate entity mention to candidate concept label
@@ -496,23 +764,45 @@ class NERD(object):
 		Returns: candidate ontology concept (or None)
 		"""
 
-		# perform sim scores between entity mention and onto labels
-		scores_and_labels = {lid: self.text_similarity(mention, ldata)[0] for lid, ldata in labels.items()}
-		# get scores and ids
-		scores = np.array(list(scores_and_labels.values()))
-		labels = list(scores_and_labels.keys())
-		# set normalizers for sim methods
-		norms = {i: MinMaxNormalizer(scores[:, i]) for i in range(0, scores.shape[1])}
-		# perform combSUM over scores w/ norms
-		comb_scores = np.array([norms[i](scores[:, i]) for i in range(0, scores.shape[1])]).sum(axis=0)
-		if np.argwhere(comb_scores >= sim_thr).size != 0:  # return (mention, label) pair
-			# keep label w/ highest comb_score
-			label = labels[np.argsort(-comb_scores[:])[0]]
-			return [[mention.text, label]]
-		else:  # return (mention, None) pair
+		pending = getattr(self.local, 'pending', None)
+		if pending is not None:  # batched linking -- collect mention and defer its linking
+			pending.setdefault(mention.text, mention)
 			return [[mention.text, None]]
+		linked = getattr(self.local, 'linked', None)
+		if linked is not None and mention.text in linked:  # batched linking -- return linked label
+			return [[mention.text, linked[mention.text]]]
+		return [[mention.text, self.associate_mentions2candidates([mention], labels, sim_thr)[0]]]
+
+	def batch_link_mentions(self, batch_mentions, labels, sim_thr=0.7, debug=False, knowledge=None):
+		"""
+		Link entity mentions from a batch of texts -- mentions requiring similarity-based linking are collected across the batch and linked at once
+
+		Params:
+			batch_mentions (list(list(spacy.token.span.Span))): list containing, for each text, the list of entity mentions
+			labels (list(spacy.token.span.Span)): list of concept labels from reference ontology
+			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge used for ad hoc linking -- if None, use the current use case knowledge
+
+		Returns: a list containing, for each text, the list of [mention, concept label] pairs
+		"""
+
+		# run ad hoc linking once to collect the mentions requiring similarity-based linking
+		self.local.pending = dict()
+		try:
+			for mentions in batch_mentions:
+				self.link_mentions(mentions, labels, sim_thr, debug, knowledge)
+			pending = self.local.pending
+		finally:
+			self.local.pending = None
+		# link collected mentions w/ one score tensor
+		self.local.linked = dict(zip(pending.keys(), self.associate_mentions2candidates(list(pending.values()), labels, sim_thr)))
+		try:  # run ad hoc linking again w/ linked mentions
+			return [self.link_mentions(mentions, labels, sim_thr, debug, knowledge) for mentions in batch_mentions]
+		finally:
+			self.local.linked = None
 
-	def link_mentions_to_concepts(self, mentions, labels, use_case_ontology, sim_thr=0.7, raw=False, debug=False):
+	def link_mentions_to_concepts(self, mentions, labels, use_case_ontology, sim_thr=0.7, raw=False, debug=False, knowledge=None):
 		"""
 		Link identified entity mentions to ontology concepts 
 
@@ -523,15 +813,54 @@ class NERD(object):
 			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
 			raw (bool): whether to return concepts within semantic areas or mentions+concepts
 			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge used for ad hoc linking -- if None, use the current use case knowledge
 
 		Returns: a dict of identified ontology concepts {semantic_area: [iri, mention, label], ...}
 		"""
 
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
 		# link mentions to concepts
-		mentions_and_concepts = [self.use_case_ad_hoc_linking(mention, labels, sim_thr, debug) for mention in mentions]
-		mentions_and_concepts = list(itertools.chain.from_iterable(mentions_and_concepts))
+		mentions_and_concepts = self.link_mentions(mentions, labels, sim_thr, debug, knowledge)
+		# post process mentions and store concepts
+		return self.assemble_concepts(mentions_and_concepts, use_case_ontology, raw, knowledge)
+
+	def link_mentions(self, mentions, labels, sim_thr=0.7, debug=False, knowledge=None):
+		"""
+		Link identified entity mentions to ontology concept labels w/ the ad hoc linking functions of the use case
+
+		Params:
+			mentions (list(spacy.token.span.Span)): list of entity mentions extracted from text
+			labels (list(spacy.token.span.Span)): list of concept labels from reference ontology
+			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge used for ad hoc linking -- if None, use the current use case knowledge
+
+		Returns: a list of [mention, concept label] pairs
+		"""
+
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
+		mentions_and_concepts = [knowledge['ad_hoc_linking'](mention, labels, sim_thr, debug, knowledge) for mention in mentions]
+		return list(itertools.chain.from_iterable(mentions_and_concepts))
+
+	def assemble_concepts(self, mentions_and_concepts, use_case_ontology, raw=False, knowledge=None):
+		"""
+		Post process the [mention, concept label] pairs of a report and map them to ontology concepts
+
+		Params:
+			mentions_and_concepts (list(list(str))): list of mentions and concept labels extracted from report
+			use_case_ontology (pandas DataFrame): reference ontology restricted to the use case considered
+			raw (bool): whether to return concepts within semantic areas or mentions+concepts
+			knowledge (dict): use case knowledge used for post processing -- if None, use the current use case knowledge
+
+		Returns: a dict of identified ontology concepts {semantic_area: [iri, mention, label], ...}
+		"""
+
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
 		# post process mentions and concepts based on the considered use case
-		mentions_and_concepts = self.use_case_ad_hoc_post_processing(mentions_and_concepts)
+		mentions_and_concepts = knowledge['ad_hoc_post_processing'](mentions_and_concepts)
 		# extract linked data from ontology
 		linked_data = [(mention_and_concept[0], use_case_ontology.loc[use_case_ontology['label'].str.lower() == mention_and_concept[1]][['iri', 'label', 'semantic_area_label']].values[0].tolist()) for mention_and_concept in mentions_and_concepts if mention_and_concept[1] is not None]
 		# filter out linked data 'semantic_area_label' == None
@@ -547,7 +876,7 @@ class NERD(object):
 
 	# COLON SPECIFIC LINKING FUNCTIONS
 
-	def ad_hoc_colon_linking(self, mention, labels, sim_thr=0.7, debug=False):
+	def ad_hoc_colon_linking(self, mention, labels, sim_thr=0.7, debug=False, knowledge=None):
 		"""
 		Perform set of colon ad hoc linking functions 
 
@@ -556,12 +885,13 @@ class NERD(object):
 			labels (list(spacy.token.span.Span)): list of concept labels from reference ontology
 			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
 			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge storing dysplasia and cin mappings -- if None, use the current use case knowledge
 
 		Returns: matched ontology concept label(s)
 		"""
 
 		if 'dysplasia' in mention.text:  # mention contains 'dysplasia'
-			return self.link_colon_dysplasia(mention)
+			return self.link_colon_dysplasia(mention, knowledge)
 		elif 'carcinoma' in mention.text:  # mention contains 'carcinoma'
 			return self.link_colon_adenocarcinoma(mention)
 		elif 'hyperplastic' in mention.text:  # mention contains 'hyperplastic'
@@ -576,19 +906,22 @@ class NERD(object):
 			return self.associate_mention2candidate(mention, labels, sim_thr)
 			# return [[mention.text, None]]
 
-	def link_colon_dysplasia(self, mention):
+	def link_colon_dysplasia(self, mention, knowledge=None):
 		"""
 		Identify (when possible) the colon dysplasia grade and link the dysplasia mention to the correct concept 
 		
 		Params:
 			mention (spacy.tokens.span.Span): (dysplasia) entity mention extracted from text
+			knowledge (dict): use case knowledge storing dysplasia mappings -- if None, use the current use case knowledge
 		
 		Returns: matched ontology concept label(s)
 		"""
 		
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
 		dysplasia_mention = mention.text
 		# identify dysplasia grades within mention
-		grades = [self.use_case_dysplasia[trigger] for trigger in self.use_case_dysplasia.keys() if trigger in dysplasia_mention]
+		grades = [knowledge['dysplasia'][trigger] for trigger in knowledge['dysplasia'].keys() if trigger in dysplasia_mention]
 		grades = set(itertools.chain.from_iterable(grades))
 		if grades:  # at least one dysplasia grade identified
 			return [[dysplasia_mention, grade] for grade in grades]
@@ -739,7 +1072,7 @@ class NERD(object):
 
 	# CERVIX SPECIFIC LINKING FUNCTIONS
 
-	def ad_hoc_cervix_linking(self, mention, labels, sim_thr=0.7, debug=False):
+	def ad_hoc_cervix_linking(self, mention, labels, sim_thr=0.7, debug=False, knowledge=None):
 		"""
 		Perform set of cervix ad hoc linking functions 
 
@@ -748,14 +1081,15 @@ class NERD(object):
 			labels (list(spacy.token.span.Span)): list of concept labels from reference ontology
 			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
 			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge storing dysplasia and cin mappings -- if None, use the current use case knowledge
 
 		Returns: matched ontology concept label(s)
 		"""
 
 		if 'dysplasia' in mention.text or 'squamous intraepithelial lesion' in mention.text:  # mention contains 'dysplasia' or 'squamous intraepithelial lesion'
-			return self.link_cervix_dysplasia(mention)
+			return self.link_cervix_dysplasia(mention, knowledge)
 		elif re.search(r'\bcin\d*', mention.text) or re.search(r'sil\b', mention.text):  # mention contains 'cin' or 'sil'
-			return self.link_cervix_cin(mention)
+			return self.link_cervix_cin(mention, knowledge)
 		elif 'hpv' in mention.text:  # mention contains 'hpv'
 			return self.link_cervix_hpv(mention, labels, sim_thr)
 		elif 'infection' in mention.text:  # mention contains 'infection'
@@ -771,38 +1105,44 @@ class NERD(object):
 		else:  # none of the ad hoc functions was required -- perform similarity-based linking
 			return self.associate_mention2candidate(mention, labels, sim_thr)
 
-	def link_cervix_dysplasia(self, mention):
+	def link_cervix_dysplasia(self, mention, knowledge=None):
 		"""
 		Identify (when possible) the cervix dysplasia grade and link the dysplasia mention to the correct concept 
 		
 		Params:
 			mention (spacy.tokens.span.Span): (dysplasia) entity mention extracted from text
+			knowledge (dict): use case knowledge storing dysplasia mappings -- if None, use the current use case knowledge
 
 		Returns: matched ontology concept label(s)
 		"""
 		
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
 		dysplasia_mention = mention.text
 		# identify dysplasia grades within mention
-		grades = [self.use_case_dysplasia[trigger] for trigger in self.use_case_dysplasia.keys() if trigger in dysplasia_mention]
+		grades = [knowledge['dysplasia'][trigger] for trigger in knowledge['dysplasia'].keys() if trigger in dysplasia_mention]
 		grades = set(itertools.chain.from_iterable(grades))
 		if grades:  # at least one dysplasia grade identified
 			return [[dysplasia_mention, grade] for grade in grades]
 		else:  # no dysplasia grades identified - map to simple CIN
 			return [[dysplasia_mention, 'cervical intraepithelial neoplasia']]
 
-	def link_cervix_cin(self, mention):
+	def link_cervix_cin(self, mention, knowledge=None):
 		"""
 		Identify (when possible) the cervix cin/sil grade and link the cin/sil mention to the correct concept 
 		
 		Params:
 			mention (spacy.tokens.span.Span): (cin) entity mention extracted from text
+			knowledge (dict): use case knowledge storing cin mappings -- if None, use the current use case knowledge
 		
 		Returns: matched ontology concept label(s)
 		"""
 		
+		if knowledge is None:  # use the current use case knowledge
+			knowledge = self.use_case_knowledge
 		cin_mention = mention.text
 		# identify cin/sil grades within mention
-		grades = [self.cin[trigger] for trigger in self.cin.keys() if trigger in cin_mention]
+		grades = [knowledge['cin'][trigger] for trigger in knowledge['cin'].keys() if trigger in cin_mention]
 		if grades:  # at least one cin/sil grade identified
 			return [[cin_mention, grade] for grade in grades]
 		else:  # no cin/sil grades identified - map to simple cin/sil
@@ -1019,7 +1359,7 @@ class NERD(object):
 
 	# LUNG SPECIFIC LINKING FUNCTIONS
 
-	def ad_hoc_lung_linking(self, mention, labels, sim_thr=0.7, debug=False):
+	def ad_hoc_lung_linking(self, mention, labels, sim_thr=0.7, debug=False, knowledge=None):
 		"""
 		Perform set of lung ad hoc linking functions
 
@@ -1028,6 +1368,7 @@ class NERD(object):
 			labels (list(spacy.token.span.Span)): list of concept labels from reference ontology
 			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
 			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge storing dysplasia and cin mappings -- if None, use the current use case knowledge
 
 		Returns: matched ontology concept label(s)
 		"""
@@ -1284,6 +1625,7 @@ class NERD(object):
 			proc_labels.append([self.nlp(label) for label in labels])
 
 		if self.bert_model:  # process onto concepts for BERT
+			import torch
 			tokens = utils.assign_gpu(self.bert_tokenizer(labels, return_tensors="pt", padding=True), self.gpu)  # get tokens w/ padding
 			embs = self.bert_model(**tokens)[0]  # get BERT last layer hidden states
 			exp_attention_mask = tokens['attention_mask'].unsqueeze(-1).expand(embs.size())  # broadcast attention mask to embs.size
@@ -1329,7 +1671,7 @@ class NERD(object):
 
 	# AOEC SPECIFIC FUNCTIONS
 
-	def aoec_entity_linking(self, reports, onto_proc, use_case_ontology, labels, use_case, sim_thr=0.7, raw=False, debug=False):
+	def aoec_entity_linking(self, reports, onto_proc, use_case_ontology, labels, use_case, sim_thr=0.7, raw=False, debug=False, knowledge=None, whole_doc=False):
 		"""
 		Perform entity linking over translated AOEC reports
 		
@@ -1342,31 +1684,43 @@ class NERD(object):
 			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
 			raw (bool): whether to return concepts within semantic areas or mentions+concepts
 			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge -- if None, the knowledge of use_case available at call time is used throughout
+			whole_doc (bool): whether to process texts as whole documents even when the sentence cache is enabled -- e.g., for rules crossing sentence boundaries
 			
 		Returns: a dict containing the linked concepts for each report w/o distinction between 'nlp' and 'struct' concepts
 		"""
 		
-		concepts = dict()
-		# loop over AOEC reports and perform linking
-		for rid, rdata in tqdm(reports.items()):
-			concepts[rid] = dict()
-
+		if knowledge is None:  # keep the knowledge available at call time -- reloads do not affect the current call
+			knowledge = self.kb[use_case]
+		texts = []
+		for rdata in reports.values():
 			# sanitize diagnosis
 			diagnosis = utils.en_sanitize_record(rdata['diagnosis_nlp'], use_case)
-			# extract entity mentions from diagnosis
-			diagnosis = self.extract_entity_mentions(diagnosis)
-
 			# sanitize materials
 			materials = utils.en_sanitize_record(rdata['materials'], use_case)
 			if use_case == 'colon':  # consider 'polyp' as a stopwords in materials @smarchesin TODO: what about the other use cases?
 				materials = re.sub('polyp[s]?(\s|$)+', ' ', materials)
-			# extract entity mentions from materials
-			materials = self.extract_entity_mentions(materials)
+			texts.append((diagnosis, materials))
+		# group reports by sanitized (diagnosis, materials) -- each unique pair is processed once
+		unique_texts, text_ixs = utils.dedup_texts(texts, verbose=debug)
+		unique_concepts = []
+		if knowledge['sentences'] and not whole_doc:  # process texts sentence by sentence
+			sentence_mcs = self.link_sentences(list(itertools.chain.from_iterable(unique_texts)), labels, sim_thr, debug, knowledge)
+			for ix in range(len(unique_texts)):
+				# combine diagnosis and materials mentions and link 'nlp' concepts
+				unique_concepts.append(self.assemble_concepts(sentence_mcs[2 * ix] + sentence_mcs[2 * ix + 1], use_case_ontology, raw, knowledge))
+		else:  # process texts as whole documents
+			for diagnosis, materials in tqdm(unique_texts):
+				# extract entity mentions from diagnosis and materials and combine them
+				mentions = self.extract_entity_mentions(diagnosis, knowledge=knowledge) + self.extract_entity_mentions(materials, knowledge=knowledge)
+				# link 'nlp' concepts
+				unique_concepts.append(self.link_mentions_to_concepts(mentions, labels, use_case_ontology, sim_thr, raw, debug, knowledge))
 
-			# combine diagnosis and materials mentions
-			mentions = diagnosis + materials
-			# link and store 'nlp' concepts
-			nlp_concepts = self.link_mentions_to_concepts(mentions, labels, use_case_ontology, sim_thr, raw, debug)
+		concepts = dict()
+		# loop over AOEC reports and store linked concepts
+		for (rid, rdata), text_ix in zip(reports.items(), text_ixs):
+			# get 'nlp' concepts of the report text
+			nlp_concepts = utils.copy_concepts(unique_concepts[text_ix])
 			if raw:  # keep 'nlp' concepts for debugging purposes
 				concepts[rid] = nlp_concepts
 			else:  # merge 'nlp' and 'struct' concepts
@@ -1381,7 +1735,7 @@ class NERD(object):
 
 	# RADBOUD SPECIFIC FUNCTIONS
 
-	def radboud_entity_linking(self, reports, use_case_ontology, labels, use_case, sim_thr=0.7, raw=False, debug=False):
+	def radboud_entity_linking(self, reports, use_case_ontology, labels, use_case, sim_thr=0.7, raw=False, debug=False, knowledge=None, whole_doc=False):
 		"""
 		Perform entity linking over translated and processed Radboud reports
 
@@ -1393,20 +1747,34 @@ class NERD(object):
 			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
 			raw (bool): whether to return concepts within semantic areas or mentions+concepts
 			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge -- if None, the knowledge of use_case available at call time is used throughout
+			whole_doc (bool): whether to process texts as whole documents even when the sentence cache is enabled -- e.g., for rules crossing sentence boundaries
 
 		Returns: a dict containing the linked concepts for each report w/ list of associated slides
 		"""
 		
+		if knowledge is None:  # keep the knowledge available at call time -- reloads do not affect the current call
+			knowledge = self.kb[use_case]
+		# group reports by sanitized conclusions -- each unique text is processed once
+		unique_texts, text_ixs = utils.dedup_texts([utils.en_sanitize_record(rdata['diagnosis'], use_case) for rdata in reports.values()], verbose=debug)
+		if knowledge['sentences'] and not whole_doc:  # process conclusions sentence by sentence and link concepts
+			unique_concepts = [
+				self.assemble_concepts(mentions_and_concepts, use_case_ontology, raw, knowledge)
+				for mentions_and_concepts in self.link_sentences(unique_texts, labels, sim_thr, debug, knowledge)]
+		else:  # process conclusions as whole documents
+			unique_concepts = []
+			for text in tqdm(unique_texts):
+				# extract entity mentions from conclusions
+				mentions = self.extract_entity_mentions(text, knowledge=knowledge)
+				# link concepts from conclusions
+				unique_concepts.append(self.link_mentions_to_concepts(mentions, labels, use_case_ontology, sim_thr, raw, debug, knowledge))
+
 		concepts = dict()
-		# loop over Radboud processed reports and perform linking
-		for rid, rdata in tqdm(reports.items()):
+		# loop over Radboud processed reports and store linked concepts
+		for (rid, rdata), text_ix in zip(reports.items(), text_ixs):
 			concepts[rid] = dict()
-			# extract entity mentions from conclusions
-			mentions = self.extract_entity_mentions(utils.en_sanitize_record(rdata['diagnosis'], use_case))
-			# link and store concepts from conclusions
-			nlp_concepts = self.link_mentions_to_concepts(mentions, labels, use_case_ontology, sim_thr, raw, debug)
 			# assign conclusion concepts to concepts dict
-			concepts[rid]['concepts'] = nlp_concepts
+			concepts[rid]['concepts'] = utils.copy_concepts(unique_concepts[text_ix])
 			# assign slide ids to concepts dict if present
 			if 'slide_ids' in rdata:
 				concepts[rid]['slide_ids'] = rdata['slide_ids']
@@ -1415,7 +1783,7 @@ class NERD(object):
 
 	# GENERAL-PURPOSE FUNCTIONS
 
-	def entity_linking(self, reports, use_case_ontology, labels, use_case, sim_thr=0.7, raw=False, debug=False):
+	def entity_linking(self, reports, use_case_ontology, labels, use_case, sim_thr=0.7, raw=False, debug=False, knowledge=None, batch_size=32, whole_doc=False):
 		"""
 		Perform entity linking over translated and processed reports
 
@@ -1427,18 +1795,91 @@ class NERD(object):
 			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
 			raw (bool): whether to return concepts within semantic areas or mentions+concepts
 			debug (bool): whether to keep flags for debugging
+			knowledge (dict): use case knowledge -- if None, the knowledge of use_case available at call time is used throughout
+			batch_size (int): number of reports processed by spaCy at once
+			whole_doc (bool): whether to process texts as whole documents even when the sentence cache is enabled -- e.g., for rules crossing sentence boundaries
 
 		Returns: a dict containing the linked concepts for each report
 		"""
 
+		if knowledge is None:  # keep the knowledge available at call time -- reloads do not affect the current call
+			knowledge = self.kb[use_case]
+		# group reports by sanitized text -- each unique text is processed once
+		unique_texts, text_ixs = utils.dedup_texts([utils.en_sanitize_record(rdata['text'], use_case) for rdata in reports.values()], verbose=debug)
+		if knowledge['sentences'] and not whole_doc:  # process unique texts sentence by sentence and link concepts
+			unique_concepts = [
+				self.assemble_concepts(mentions_and_concepts, use_case_ontology, raw, knowledge)
+				for mentions_and_concepts in self.link_sentences(unique_texts, labels, sim_thr, debug, knowledge, batch_size)]
+		else:  # process unique texts as whole documents
+			# extract entity mentions from unique texts in batches
+			batch_mentions = self.extract_batch_entity_mentions(unique_texts, knowledge=knowledge, batch_size=batch_size)
+			# link mentions from unique texts at once and assemble concepts
+			unique_concepts = [
+				self.assemble_concepts(mentions_and_concepts, use_case_ontology, raw, knowledge)
+				for mentions_and_concepts in self.batch_link_mentions(batch_mentions, labels, sim_thr, debug, knowledge)]
 		concepts = dict()
-		# loop over translated and processed reports and perform linking
-		for rid, rdata in tqdm(reports.items()):
-			concepts[rid] = dict()
-			# extract entity mentions from text
-			mentions = self.extract_entity_mentions(utils.en_sanitize_record(rdata['text'], use_case))
-			# link and store concepts from text
-			concepts[rid] = self.link_mentions_to_concepts(mentions, labels, use_case_ontology, sim_thr, raw, debug)
+		# loop over translated and processed reports and fan concepts out to the reports sharing the same text
+		for rid, text_ix in zip(reports.keys(), text_ixs):
+			concepts[rid] = utils.copy_concepts(unique_concepts[text_ix])
 
 		# return concepts divided per diagnosis
 		return concepts
+
+	def multi_entity_linking(self, reports, use_cases, sim_thr=0.7, raw=False, debug=False, batch_size=32, whole_doc=False):
+		"""
+		Perform entity linking over translated and processed reports for several use cases -- each sanitized text is parsed w/ spaCy once
+		and its entity mentions are expanded and linked w/ the knowledge of each use case requiring it
+
+		Params:
+			reports (dict): target reports for each use case -- i.e., {use_case: {rid: report}}
+			use_cases (dict): ontology data, processed ontology concepts, and knowledge for each use case -- i.e., {use_case: (use_case_ontology, labels, knowledge)}
+			sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+			raw (bool): whether to return concepts within semantic areas or mentions+concepts
+			debug (bool): whether to keep flags for debugging
+			batch_size (int): number of texts processed by spaCy at once
+			whole_doc (bool): whether to process texts as whole documents even when the sentence cache is enabled -- e.g., for rules crossing sentence boundaries
+
+		Returns: a dict containing the linked concepts for each use case and report -- i.e., {use_case: {rid: concepts}}
+		"""
+
+		concepts = dict()
+		if not whole_doc:  # use cases w/ the sentence cache enabled are processed sentence by sentence -- they do not share whole document parses
+			for use_case in [use_case for use_case in reports.keys() if use_cases[use_case][2]['sentences']]:
+				use_case_ontology, labels, knowledge = use_cases[use_case]
+				concepts[use_case] = self.entity_linking(
+					reports[use_case], use_case_ontology, labels, use_case, sim_thr, raw, debug=debug, knowledge=knowledge, batch_size=batch_size)
+			reports = {use_case: use_case_reports for use_case, use_case_reports in reports.items() if use_case not in concepts}
+
+		# sanitize texts w/ the replacements of each use case -- use cases sharing the same sanitized text share its parse
+		targets = [(use_case, rid) for use_case, use_case_reports in reports.items() for rid in use_case_reports.keys()]
+		unique_texts, text_ixs = utils.dedup_texts([utils.en_sanitize_record(reports[use_case][rid]['text'], use_case) for use_case, rid in targets], verbose=debug)
+		text_use_cases = [[] for _ in unique_texts]
+		for (use_case, _), text_ix in zip(targets, text_ixs):
+			if use_case not in text_use_cases[text_ix]:
+				text_use_cases[text_ix].append(use_case)
+
+		use_case_mentions = {use_case: ([], []) for use_case in reports.keys()}
+		docs = self.nlp.pipe(unique_texts, batch_size=batch_size, disable=['expand_entities', 'negex'])
+		for text_ix, doc in enumerate(tqdm(docs, total=len(unique_texts))):
+			ents = doc.ents
+			for use_case in text_use_cases[text_ix]:
+				knowledge = use_cases[use_case][2]
+				# restore the mentions found by NER -- mentions expanded w/ the rules of other use cases are discarded
+				doc.ents = ents
+				# expand entity mentions w/ use case rules and detect negations
+				doc = self.negex(self.expand_entity_mentions(doc, knowledge))
+				use_case_mentions[use_case][0].append(text_ix)
+				use_case_mentions[use_case][1].append([mention for mention in doc.ents if mention._.negex is False])
+
+		unique_concepts = [dict() for _ in unique_texts]
+		for use_case, (ixs, batch_mentions) in use_case_mentions.items():
+			use_case_ontology, labels, knowledge = use_cases[use_case]
+			# link non-negated mentions of the use case at once and assemble concepts
+			for text_ix, mentions_and_concepts in zip(ixs, self.batch_link_mentions(batch_mentions, labels, sim_thr, debug, knowledge)):
+				unique_concepts[text_ix][use_case] = self.assemble_concepts(mentions_and_concepts, use_case_ontology, raw, knowledge)
+
+		concepts.update({use_case: dict() for use_case in reports.keys()})
+		# fan concepts out to the reports sharing the same text
+		for (use_case, rid), text_ix in zip(targets, text_ixs):
+			concepts[use_case][rid] = utils.copy_concepts(unique_concepts[text_ix][use_case])
+		return concepts
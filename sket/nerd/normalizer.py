@@ -2,12 +2,15 @@ import numpy as np
 
 
 class StandardizationNormalizer(object):
-	# apply standard deviation normalization
-	def __init__(self, scores):
-		self.mean = np.mean(scores)
-		self.std = np.std(scores)
+	# apply standard deviation normalization -- when axis is set, normalize along axis (e.g., over labels for each mention and method)
+	def __init__(self, scores, axis=None):
+		self.axis = axis
+		self.mean = np.mean(scores, axis=axis, keepdims=axis is not None)
+		self.std = np.std(scores, axis=axis, keepdims=axis is not None)
 
 	def __call__(self, scores):
+		if self.axis is not None:  # vectorized normalization -- constant slices are set to zero
+			return np.divide(scores - self.mean, self.std, out=np.zeros(scores.shape), where=self.std > 0)
 		if self.std > 0:
 			return (scores - self.mean) / self.std
 		else:
@@ -15,12 +18,15 @@ class StandardizationNormalizer(object):
 
 
 class MinMaxNormalizer(object):
-	# apply minmax normalization
-	def __init__(self, scores):
-		self.min = np.min(scores)
-		self.max = np.max(scores)
+	# apply minmax normalization -- when axis is set, normalize along axis (e.g., over labels for each mention and method)
+	def __init__(self, scores, axis=None):
+		self.axis = axis
+		self.min = np.min(scores, axis=axis, keepdims=axis is not None)
+		self.max = np.max(scores, axis=axis, keepdims=axis is not None)
 
 	def __call__(self, scores):
+		if self.axis is not None:  # vectorized normalization -- constant slices are set to zero
+			return np.divide(scores - self.min, self.max - self.min, out=np.zeros(scores.shape), where=(self.max - self.min) > 0)
 		if (self.max - self.min) > 0:
 			return (scores - self.min) / (self.max - self.min)
 		else:
@@ -29,8 +35,19 @@ class MinMaxNormalizer(object):
 
 class IdentityNormalizer(object):
 	# apply identify normalization
-	def __init__(self):
+	def __init__(self, scores=None, axis=None):
 		pass
 
 	def __call__(self, scores):
 		return scores
+
+
+def combsum(scores, norm=MinMaxNormalizer):
+	# normalize (mentions x labels x methods) scores over labels for each mention and method and sum them over methods (combSUM)
+	return norm(scores, axis=1)(scores).sum(axis=-1)
+
+
+def select_candidates(comb_scores, candidates, sim_thr):
+	# keep the candidate w/ highest comb_score for each mention -- None when comb_score is lower than sim_thr
+	best = comb_scores.argmax(axis=1)
+	return [candidates[ix] if comb_scores[i, ix] >= sim_thr else None for i, ix in enumerate(best)]
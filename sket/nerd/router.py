@@ -0,0 +1,77 @@
+from spacy.matcher import PhraseMatcher
+
+
+class UseCaseRouter(object):
+
+	def __init__(self, nlp, vocabularies, min_ratio=0.5):
+		"""
+		Build the PhraseMatcher storing the keywords of each use case -- keywords are matched in a single pass over the tokenized text
+
+		Params:
+			nlp (spacy.lang): spaCy model -- only its vocab and tokenizer are used
+			vocabularies (dict): keywords for each use case -- i.e., {use_case: list(str)}
+			min_ratio (float): route reports to the use cases scoring at least min_ratio times the top score
+
+		Returns: None
+		"""
+
+		self.nlp = nlp
+		self.min_ratio = min_ratio
+		self.use_cases = list(vocabularies.keys())
+		# map each keyword to the use cases sharing it
+		self.keywords = dict()
+		for use_case, keywords in vocabularies.items():
+			for keyword in keywords:
+				keyword = keyword.lower().strip()
+				if keyword:  # skip empty keywords
+					self.keywords.setdefault(keyword, set()).add(use_case)
+		# keywords shared by several use cases are less discriminative -- split their weight among use cases
+		self.weights = {keyword: 1 / len(use_cases) for keyword, use_cases in self.keywords.items()}
+		# use keywords as match ids -- match ids are mapped back to use cases w/ self.keywords
+		self.matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+		for keyword in self.keywords.keys():
+			self.matcher.add(keyword, None, nlp.make_doc(keyword))
+
+	def route(self, texts, batch_size=1000):
+		"""
+		Score texts on keyword hits and route them to the likely use case(s)
+
+		Params:
+			texts (list(str)): texts to route
+			batch_size (int): number of texts tokenized at once
+
+		Returns: a list containing, for each text, the routing decision {use_cases, confidence, scores, keywords}
+		"""
+
+		decisions = []
+		for doc in self.nlp.tokenizer.pipe(texts, batch_size=batch_size):
+			# keep distinct keywords -- repeated keywords do not dominate scores
+			keywords = sorted(set(self.nlp.vocab.strings[m_id] for m_id, _, _ in self.matcher(doc)))
+			scores = {use_case: 0.0 for use_case in self.use_cases}
+			for keyword in keywords:
+				for use_case in self.keywords[keyword]:
+					scores[use_case] += self.weights[keyword]
+			decisions.append(self.decide(scores, keywords))
+		return decisions
+
+	def decide(self, scores, keywords):
+		"""
+		Route text to the use cases scoring at least self.min_ratio times the top score
+
+		Params:
+			scores (dict): keyword score for each use case
+			keywords (list(str)): keywords matched within text
+
+		Returns: the routing decision {use_cases, confidence, scores, keywords} -- use_cases is empty when no keyword is matched
+		"""
+
+		total = sum(scores.values())
+		if not total:  # no keyword matched -- text cannot be routed
+			return {'use_cases': [], 'confidence': {use_case: 0.0 for use_case in scores.keys()}, 'scores': scores, 'keywords': keywords}
+		top = max(scores.values())
+		use_cases = sorted([use_case for use_case, score in scores.items() if score >= self.min_ratio * top], key=lambda use_case: -scores[use_case])
+		return {
+			'use_cases': use_cases,
+			'confidence': {use_case: round(score / total, 4) for use_case, score in scores.items()},
+			'scores': {use_case: round(score, 4) for use_case, score in scores.items()},
+			'keywords': keywords}
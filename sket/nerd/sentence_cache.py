@@ -0,0 +1,69 @@
+import threading
+
+from collections import OrderedDict
+
+
+class SentenceCache(object):
+
+	def __init__(self, max_size=100000):
+		"""
+		Set the LRU cache storing the mentions (w/ negation flags) and linked concepts of sentences
+
+		Params:
+			max_size (int): max number of cached sentences -- least recently used sentences are evicted first
+
+		Returns: None
+		"""
+
+		self.max_size = max_size
+		self.lock = threading.Lock()
+		self.entries = OrderedDict()
+		# concept labels used to link cached sentences -- entries are dropped when labels change (e.g., ontology reloads)
+		self.labels = None
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, keys, labels):
+		"""
+		Get the cached entries for the given keys
+
+		Params:
+			keys (iterable(tuple)): sentence keys
+			labels (list(spacy.tokens.doc.Doc)): concept labels used for linking
+
+		Returns: a dict of {key: entry} containing cache hits only
+		"""
+
+		hits = dict()
+		with self.lock:
+			if labels is not self.labels:  # concept labels changed -- drop entries linked w/ the previous labels
+				self.entries.clear()
+				self.labels = labels
+			for key in keys:
+				if key in self.entries:  # mark entry as recently used
+					self.entries.move_to_end(key)
+					hits[key] = self.entries[key]
+				else:
+					self.misses += 1
+			self.hits += len(hits)
+		return hits
+
+	def put(self, entries, labels):
+		"""
+		Add entries to the cache -- least recently used entries are evicted when the cache is full
+
+		Params:
+			entries (dict): dict of {key: entry}
+			labels (list(spacy.tokens.doc.Doc)): concept labels used for linking
+
+		Returns: None
+		"""
+
+		with self.lock:
+			if labels is not self.labels:  # entries linked w/ outdated labels -- do not cache them
+				return
+			for key, entry in entries.items():
+				self.entries[key] = entry
+				self.entries.move_to_end(key)
+			while len(self.entries) > self.max_size:  # evict least recently used entries
+				self.entries.popitem(last=False)
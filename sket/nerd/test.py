@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from sket.nerd.sentence_cache import SentenceCache
+from sket.nerd.normalizer import MinMaxNormalizer, StandardizationNormalizer, IdentityNormalizer, combsum, select_candidates
+
+
+def per_mention_link(scores, labels, sim_thr):
+	# former linking -- scores normalized and combined one mention at a time
+	linked, comb = [], []
+	for mention_scores in scores:
+		norms = {i: MinMaxNormalizer(mention_scores[:, i]) for i in range(0, mention_scores.shape[1])}
+		comb_scores = np.array([norms[i](mention_scores[:, i]) for i in range(0, mention_scores.shape[1])]).sum(axis=0)
+		comb.append(comb_scores)
+		if np.argwhere(comb_scores >= sim_thr).size != 0:
+			linked.append(labels[np.argsort(-comb_scores[:])[0]])
+		else:
+			linked.append(None)
+	return linked, np.array(comb)
+
+
+def test_combsum_matches_per_mention_linking():
+	rng = np.random.default_rng(0)
+	# (mentions x labels x methods) scores -- the last mention has a constant method
+	scores = rng.random((6, 8, 3))
+	scores[-1, :, 1] = 0.5
+	labels = ['label_' + str(i) for i in range(8)]
+	for sim_thr in [0.5, 1.5, 2.5, 3.0]:
+		linked, comb = per_mention_link(scores, labels, sim_thr)
+		assert np.allclose(combsum(scores), comb)
+		assert select_candidates(combsum(scores), labels, sim_thr) == linked
+
+
+def test_minmax_normalizer_axis():
+	scores = np.array([[[1.0, 2.0], [3.0, 2.0], [5.0, 2.0]]])
+	normalized = MinMaxNormalizer(scores, axis=1)(scores)
+	# each (mention, method) slice is normalized on its own -- constant slices are set to zero
+	assert np.allclose(normalized[0, :, 0], [0.0, 0.5, 1.0])
+	assert np.allclose(normalized[0, :, 1], [0.0, 0.0, 0.0])
+	assert np.allclose(normalized[0, :, 0], MinMaxNormalizer(scores[0, :, 0])(scores[0, :, 0]))
+
+
+def test_standardization_normalizer_axis():
+	scores = np.array([[[1.0, 4.0], [3.0, 4.0]], [[2.0, 1.0], [6.0, 3.0]]])
+	normalized = StandardizationNormalizer(scores, axis=1)(scores)
+	assert np.allclose(normalized[0, :, 0], [-1.0, 1.0])
+	assert np.allclose(normalized[0, :, 1], [0.0, 0.0])
+	for i in range(2):
+		for j in range(2):
+			assert np.allclose(normalized[i, :, j], StandardizationNormalizer(scores[i, :, j])(scores[i, :, j]))
+
+
+def test_normalizers_constant_scores():
+	# constant scores w/o axis are set to zero as well
+	scores = np.array([0.3, 0.3, 0.3])
+	assert np.array_equal(MinMaxNormalizer(scores)(scores), np.zeros(3))
+	assert np.array_equal(StandardizationNormalizer(scores)(scores), np.zeros(3))
+	scores = np.full((2, 4, 2), 0.7)
+	assert np.array_equal(MinMaxNormalizer(scores, axis=1)(scores), np.zeros((2, 4, 2)))
+	assert np.array_equal(StandardizationNormalizer(scores, axis=1)(scores), np.zeros((2, 4, 2)))
+
+
+def test_identity_normalizer():
+	scores = np.array([[[0.2, 3.0], [0.4, 1.0]]])
+	assert IdentityNormalizer(scores, axis=1)(scores) is scores
+	assert np.allclose(combsum(scores, IdentityNormalizer), [[3.2, 1.4]])
+
+
+def test_select_candidates_threshold():
+	comb_scores = np.array([[0.2, 0.9, 0.4], [0.1, 0.3, 0.2]])
+	assert select_candidates(comb_scores, ['a', 'b', 'c'], 0.5) == ['b', None]
+	assert select_candidates(comb_scores, ['a', 'b', 'c'], 0.3) == ['b', 'b']
+
+
+def test_use_case_router():
+	spacy = pytest.importorskip('spacy')
+	from sket.nerd.router import UseCaseRouter
+
+	vocabularies = {
+		'colon': ['adenoma', 'colon', 'dysplasia'],
+		'cervix': ['cervix', 'koilocyte', 'dysplasia'],
+		'lung': ['lung', 'small cell carcinoma']}
+	router = UseCaseRouter(spacy.blank('en'), vocabularies, min_ratio=0.5)
+	# keywords shared by several use cases split their weight
+	assert router.weights['dysplasia'] == 0.5 and router.weights['adenoma'] == 1.0
+	colon, shared, multi, unrouted = router.route([
+		'Tubular ADENOMA of the colon, adenoma',  # case-insensitive, repeated keywords counted once
+		'low grade dysplasia',  # shared keyword
+		'Small cell carcinoma of the lung w/ dysplasia',  # multi-token keywords
+		'no findings'])
+	assert colon['use_cases'] == ['colon']
+	assert colon['keywords'] == ['adenoma', 'colon']
+	assert colon['scores'] == {'colon': 2.0, 'cervix': 0.0, 'lung': 0.0}
+	assert colon['confidence'] == {'colon': 1.0, 'cervix': 0.0, 'lung': 0.0}
+	assert sorted(shared['use_cases']) == ['cervix', 'colon']
+	assert shared['confidence'] == {'colon': 0.5, 'cervix': 0.5, 'lung': 0.0}
+	assert multi['use_cases'] == ['lung']
+	assert multi['scores'] == {'colon': 0.5, 'cervix': 0.5, 'lung': 2.0}
+	assert multi['confidence'] == {'colon': 0.1667, 'cervix': 0.1667, 'lung': 0.6667}
+	# texts w/o keywords are not routed
+	assert unrouted == {'use_cases': [], 'confidence': {'colon': 0.0, 'cervix': 0.0, 'lung': 0.0}, 'scores': {'colon': 0.0, 'cervix': 0.0, 'lung': 0.0}, 'keywords': []}
+
+
+def test_sentence_cache_lru_eviction():
+	labels = ['label']
+	cache = SentenceCache(max_size=2)
+	assert cache.get(['s1'], labels) == {}
+	cache.put({'s1': 1, 's2': 2}, labels)
+	# s1 becomes the most recently used entry -- s2 is evicted first
+	assert cache.get(['s1'], labels) == {'s1': 1}
+	cache.put({'s3': 3}, labels)
+	assert list(cache.entries.keys()) == ['s1', 's3']
+	assert cache.get(['s1', 's2', 's3'], labels) == {'s1': 1, 's3': 3}
+	assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_sentence_cache_labels_change():
+	labels, new_labels = ['label'], ['label']
+	cache = SentenceCache()
+	cache.get([], labels)
+	cache.put({'s1': 1}, labels)
+	# labels are compared by identity -- equal but distinct labels drop cached entries
+	assert cache.get(['s1'], new_labels) == {}
+	assert not cache.entries
+	# entries linked w/ outdated labels are not cached
+	cache.put({'s1': 1}, labels)
+	assert cache.get(['s1'], new_labels) == {}
+	cache.put({'s1': 1}, new_labels)
+	assert cache.get(['s1'], new_labels) == {'s1': 1}
@@ -3,8 +3,6 @@ import itertools
 import pandas as pd
 
 from collections import defaultdict
-from copy import deepcopy
-from owlready2 import IRIS
 
 from ..utils import utils
 
@@ -22,14 +20,12 @@ class OntoProc(object):
 		Returns: None
 		"""
 
-		if ontology_path:  # custom ontology path
-			self.ontology = owlready2.get_ontology(ontology_path).load()
-		else:  # default ontology path
-			self.ontology = owlready2.get_ontology('./sket/ont_proc/ontology/examode.owl').load()
-		if hierarchies_path:  # custom hierarchy relations path
-			self.hrels = utils.read_hierarchies(hierarchies_path)
-		else:  # default hierarchy relations path
-			self.hrels = utils.read_hierarchies('./sket/ont_proc/rules/hierarchy_relations.txt')
+		# set ontology and hierarchy relations file paths (custom or default)
+		self.ontology_path = ontology_path if ontology_path else './sket/ont_proc/ontology/examode.owl'
+		self.hierarchies_path = hierarchies_path if hierarchies_path else './sket/ont_proc/rules/hierarchy_relations.txt'
+		# load ontology within its own world -- reloading the ontology does not interfere w/ previously loaded versions
+		self.ontology = owlready2.World().get_ontology(self.ontology_path).load()
+		self.hrels = utils.read_hierarchies(self.hierarchies_path)
 		self.disease = {'colon': 'colon carcinoma', 'lung': 'lung cancer', 'cervix': 'cervical cancer', 'celiac': 'celiac disease'}
 
 	def restrict2use_case(self, use_case, limit=1000):
@@ -140,8 +136,8 @@ class OntoProc(object):
 		"""
 		
 		# convert iris into full ontology concepts
-		concept1 = IRIS[iri1]
-		concept2 = IRIS[iri2]
+		concept1 = self.ontology.world[iri1]
+		concept2 = self.ontology.world[iri2]
 		# get ancestors for both concepts
 		ancestors1 = self.get_ancestors([concept1], include_self)
 		ancestors2 = self.get_ancestors([concept2], include_self)
@@ -152,6 +148,23 @@ class OntoProc(object):
 		else:  # concept1 and concept2 are not hierarchically related
 			return None
 
+	def get_closure(self, iris, targets):
+		"""
+		Precompute the higher concepts between target iris and reference concepts -- the closure can be shipped to worker processes, which cannot access the ontology
+
+		Params:
+			iris (set(str)): target iris
+			targets (list(pair(str, bool))): reference concepts paired w/ include_self flag
+
+		Returns: an AncestorClosure instance answering get_higher_concept queries for target iris
+		"""
+
+		closure = dict()
+		for iri in iris:
+			for target, include_self in targets:
+				closure[(iri, target, include_self)] = self.get_higher_concept(iri1=iri, iri2=target, include_self=include_self)
+		return AncestorClosure(closure)
+
 	def merge_nlp_and_struct(self, nlp_concepts, struct_concepts):
 		"""
 		Merge the information extracted from 'nlp' and 'struct' sections
@@ -160,7 +173,7 @@ class OntoProc(object):
 			nlp_concepts (dict): the dictionary of linked concepts from 'nlp' section
 			struct_concepts (dict): the dictionary of linked concepts from 'struct' section
 		
-		Returns: a dict containing the linked concepts w/o distinction between 'nlp' and 'struct' concepts
+		Returns: a dict containing the linked concepts w/o distinction between 'nlp' and 'struct' concepts -- concepts are shared w/ input dicts, only the lists holding them are new
 		"""
 		
 		cconcepts = dict()
@@ -168,19 +181,48 @@ class OntoProc(object):
 		for sem_area in nlp_concepts.keys():
 			if nlp_concepts[sem_area] and struct_concepts[sem_area]:  # semantic area is not empty for both 'nlp' and 'struct' sections
 				# get all the possible combinations of 'nlp' and 'struct' concepts
-				combinations = list(itertools.product(nlp_concepts[sem_area], struct_concepts[sem_area]))
+				combinations = itertools.product(nlp_concepts[sem_area], struct_concepts[sem_area])
 				# return IRIs to be removed (hierarchically higher)
 				IRIs = {self.get_higher_concept(combination[0][0], combination[1][0]) for combination in combinations} - {None}
 				# remove under-specified concepts and store remaining concepts
-				cconcepts[sem_area] = deepcopy(nlp_concepts[sem_area])
-				cconcepts[sem_area].extend([concept for concept in struct_concepts[sem_area] if concept[0] not in [concept[0] for concept in nlp_concepts[sem_area]]])
-				# remove IRIs from cconcepts
-				cconcepts[sem_area] = [concept for concept in cconcepts[sem_area] if concept[0] not in IRIs]
+				nlp_iris = {concept[0] for concept in nlp_concepts[sem_area]}
+				cconcepts[sem_area] = [
+					concept for concept in itertools.chain(nlp_concepts[sem_area], [concept for concept in struct_concepts[sem_area] if concept[0] not in nlp_iris])
+					if concept[0] not in IRIs]
 			elif nlp_concepts[sem_area]:  # semantic area is not empty only for the 'nlp' section
-				cconcepts[sem_area] = deepcopy(nlp_concepts[sem_area])
+				cconcepts[sem_area] = list(nlp_concepts[sem_area])
 			elif struct_concepts[sem_area]:  # semantic area is not empty only for 'struct' section
-				cconcepts[sem_area] = deepcopy(struct_concepts[sem_area])
+				cconcepts[sem_area] = list(struct_concepts[sem_area])
 			else:  # semantic area is empty for both sections
 				cconcepts[sem_area] = list()
 		# return combined concepts
 		return cconcepts
+
+
+class AncestorClosure(object):
+
+	def __init__(self, closure):
+		"""
+		Set the precomputed higher concepts
+
+		Params:
+			closure (dict): higher concepts for each (iri1, iri2, include_self) query
+
+		Returns: None
+		"""
+
+		self.closure = closure
+
+	def get_higher_concept(self, iri1, iri2, include_self=False):
+		"""
+		Return the ontology concept that is more general (hierarchically higher) -- as computed by OntoProc
+
+		Params:
+			iri1 (str): the first iri considered
+			iri2 (str): the second iri considered
+			include_self (bool): whether to include current concept in the list of ancestors
+
+		Returns: the hierarchically higher concept's iri
+		"""
+
+		return self.closure[(iri1, iri2, include_self)]
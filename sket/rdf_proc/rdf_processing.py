@@ -1,11 +1,65 @@
+import io
 import os
 import hashlib
 import datetime
 import itertools
 
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from rdflib import Namespace, URIRef, Literal, Graph
 from rdflib.namespace import DC, RDF
 
+from .rdf_writer import RDFWriter
+
+# worker process state -- set once per worker by init_graph_worker
+worker_state = dict()
+
+
+def init_graph_worker(rdf_proc, onto_proc, use_case, hospital=None):
+	"""
+	Set the state shared by the report graphs built within the worker process
+
+	Params:
+		rdf_proc (RDFProc): instance of RDFProc class
+		onto_proc (AncestorClosure): the precomputed higher concepts used in place of OntologyProc
+		use_case (str): the use_case considered
+		hospital (str): considered hospital for ExaMode data -- if None, use the generic graph creation
+
+	Returns: None
+	"""
+
+	worker_state['rdf_proc'] = rdf_proc
+	worker_state['onto_proc'] = onto_proc
+	worker_state['use_case'] = use_case
+	if hospital == 'aoec':  # AOEC data
+		worker_state['create_graph'] = rdf_proc.aoec_create_graph
+	elif hospital == 'radboud':  # Radboud data
+		worker_state['create_graph'] = rdf_proc.radboud_create_graph
+	else:  # generic data
+		worker_state['create_graph'] = rdf_proc.create_graph
+
+
+def build_graph_chunk(chunk, rdf_formats, struct=False, debug=False):
+	"""
+	Build and serialize the report graphs within chunk -- runs within worker processes
+
+	Params:
+		chunk (list(tuple)): (rid, report data, report concepts) triples
+		rdf_formats (list(str)): rdf serialization formats
+		struct (bool): whether to return graphs structured as dict
+		debug (bool): whether to keep flags for debugging
+
+	Returns: the serialized chunk for each format and the list of dict graphs (if struct==True)
+	"""
+
+	rdf_graphs = []
+	struct_graphs = []
+	for rid, report_data, report_concepts in chunk:
+		rdf_graph, struct_graph = worker_state['create_graph'](rid, report_data, report_concepts, worker_state['onto_proc'], worker_state['use_case'], debug=debug)
+		rdf_graphs.append(rdf_graph)
+		if struct:
+			struct_graphs.append(struct_graph)
+	return worker_state['rdf_proc'].serialize_chunk(rdf_graphs, rdf_formats), struct_graphs
+
 
 class RDFProc(object):
 
@@ -18,26 +72,50 @@ class RDFProc(object):
 		Returns: None
 		"""
 
-		# set base IRI, namespace, gender, and age information
+		# set base IRI, namespace, gender, and age information -- IRIs are built once as rdflib terms
 		self.base_iri = 'https://w3id.org/examode/'
 		self.namespace = {'exa': Namespace('https://w3id.org/examode/ontology/'), 'dc': DC}
-		self.gender = {'M': 'http://purl.obolibrary.org/obo/NCIT_C46109', 'F': 'http://purl.obolibrary.org/obo/NCIT_C46110'}
+		self.gender = {'M': URIRef('http://purl.obolibrary.org/obo/NCIT_C46109'), 'F': URIRef('http://purl.obolibrary.org/obo/NCIT_C46110')}
 		self.age_set = {
-			'young': 'https://hpo.jax.org/app/browse/term/HP:0011462',
-			'middle': 'https://hpo.jax.org/app/browse/term/HP:0003596',
-			'late': 'https://hpo.jax.org/app/browse/term/HP:0003584'
+			'young': URIRef('https://hpo.jax.org/app/browse/term/HP:0011462'),
+			'middle': URIRef('https://hpo.jax.org/app/browse/term/HP:0003596'),
+			'late': URIRef('https://hpo.jax.org/app/browse/term/HP:0003584')
+		}
+
+		# set IRI prefixes for report resources
+		self.resource_iri = self.base_iri + 'resource/'
+		self.report_iri = self.resource_iri + 'report/'
+		self.patient_iri = self.resource_iri + 'patient/'
+		self.procedure_iri = self.resource_iri + 'procedure/'
+
+		# set predicates used within report graphs
+		self.predicates = {predicate: self.namespace['exa'][predicate] for predicate in [
+			'hasDiagnosisText', 'hasImage', 'hasBlockNumber', 'hasSlide', 'hasSlideId', 'hasClinicalCaseReport', 'hasAge', 'hasAgeOnset',
+			'hasGender', 'hasOutcome', 'detectedHumanPapillomaVirus', 'koylociteDetected', 'hasDysplasia', 'hasLocation', 'hasIntervention',
+			'hasTopography', 'hasTest']}
+		self.predicates['type'] = RDF.type
+		self.predicates['identifier'] = self.namespace['dc']['identifier']
+
+		# set classes used within report graphs
+		self.classes = {
+			'patient': URIRef('http://purl.obolibrary.org/obo/IDOMAL_0000603'),
+			'slide': URIRef('http://purl.obolibrary.org/obo/NCIT_C50178')
 		}
+		# set the higher concept queries issued by graph builders -- i.e., 'Outcome' and 'Polyp' (w/ include_self) concepts
+		self.higher_concepts = [('http://purl.obolibrary.org/obo/NCIT_C20200', False), ('http://purl.obolibrary.org/obo/MONDO_0021400', True)]
+		# set use-case ClinicalCaseReport classes
+		self.ccreports = {use_case: self.namespace['exa'][use_case.capitalize() + 'ClinicalCaseReport'] for use_case in ['colon', 'cervix', 'lung', 'celiac']}
 
 		# set predicates that associate Resource w/ Literal
-		self.predicate2literal = [
-			self.namespace['exa']['hasDiagnosisText'],
-			self.namespace['exa']['hasAge'],
-			self.namespace['exa']['hasImage'],
-			self.namespace['exa']['hasBlockNumber'],
-			self.namespace['exa']['hasSlideId'],
-			self.namespace['exa']['detectedHumanPapillomaVirus'],
-			self.namespace['exa']['koylociteDetected']
-		]
+		self.predicate2literal = {
+			self.predicates['hasDiagnosisText'],
+			self.predicates['hasAge'],
+			self.predicates['hasImage'],
+			self.predicates['hasBlockNumber'],
+			self.predicates['hasSlideId'],
+			self.predicates['detectedHumanPapillomaVirus'],
+			self.predicates['koylociteDetected']
+		}
 
 	# COMMON FUNCTIONS
 
@@ -115,32 +193,62 @@ class RDFProc(object):
 						pairs.append([outcomes[ix][0]])
 		return pairs
 
-	def serialize_report_graphs(self, graphs, output='stream', rdf_format='turtle'):
+	def build_report_graph(self, graphs):
 		"""
-		Serialize report graphs into rdf w/ specified format
+		Convert report graphs into a single rdflib graph
 
 		Params:
-			graphs (list(list(tuple))/list(tuple)): report graphs to be serialized
-			output (str): output path of the serialized graph - if output == 'stream' --> return streamed output
-			rdf_format (str): rdf serialization format
+			graphs (list(list(tuple))/list(tuple)): report graphs to be converted
 
-		Returns: the serialized rdf graph
+		Returns: the rdflib graph containing report graphs
 		"""
 
 		g = Graph()
 		# bind namespaces to given prefix
 		for px, ns in self.namespace.items():
 			g.bind(px, ns)
+		# cache IRIs converted into rdflib terms -- concept IRIs are shared across reports
+		terms = dict()
 		# loop over graphs and convert them into rdflib classes
 		for graph in graphs:
-			for triple in graph:
-				s = URIRef(triple[0])
-				p = triple[1]
-				if triple[1] in self.predicate2literal:
-					o = Literal(triple[2])
+			for s, p, o in graph:
+				if s not in terms:
+					terms[s] = URIRef(s)
+				if p in self.predicate2literal:
+					o = Literal(o)
 				else:
-					o = URIRef(triple[2])
-				g.add((s, p, o))
+					if o not in terms:
+						terms[o] = URIRef(o)
+					o = terms[o]
+				g.add((terms[s], p, o))
+		return g
+
+	@staticmethod
+	def load_graph(graph):
+		"""
+		Restore rdflib predicates within (s,p,o) triples loaded from JSON -- e.g., graph fragments retrieved from the report cache
+
+		Params:
+			graph (list(list)): [s, p, o] triples representing the report
+
+		Returns: the list of (s,p,o) triples representing the report
+		"""
+
+		return [(s, URIRef(p), o) for s, p, o in graph]
+
+	@staticmethod
+	def serialize_graph(g, output='stream', rdf_format='turtle'):
+		"""
+		Serialize rdflib graph into rdf w/ specified format
+
+		Params:
+			g (rdflib.Graph): graph to be serialized
+			output (str): output path of the serialized graph - if output == 'stream' --> return streamed output
+			rdf_format (str): rdf serialization format
+
+		Returns: the serialized rdf graph
+		"""
+
 		if output == 'stream':  # stream rdf graph to output 
 			# serialize graphs into predefined rdf format
 			return g.serialize(format=rdf_format)
@@ -151,6 +259,285 @@ class RDFProc(object):
 			print('rdf graph serialized to {} with {} format'.format(output, rdf_format))
 			return True
 
+	def serialize_report_graphs(self, graphs, output='stream', rdf_format='turtle'):
+		"""
+		Serialize report graphs into rdf w/ specified format -- w/ trig, each report is serialized as a named graph identified by the report IRI
+
+		Params:
+			graphs (list(list(tuple))): report graphs to be serialized
+			output (str): output path of the serialized graph - if output == 'stream' --> return streamed output
+			rdf_format (str): rdf serialization format
+
+		Returns: the serialized rdf graph
+		"""
+
+		if rdf_format == 'trig':  # write one named graph per report
+			return self.stream_report_graphs(graphs, output, rdf_format)
+		return self.serialize_graph(self.build_report_graph(graphs), output, rdf_format)
+
+	def serialize_report_graphs_formats(self, graphs, outputs, parallel=False):
+		"""
+		Serialize report graphs into several rdf formats -- triples are converted into rdflib terms once and every format is written from the same graph (trig reports are written as named graphs)
+
+		Params:
+			graphs (list(list(tuple))): report graphs to be serialized
+			outputs (dict): output path for each rdf serialization format - if output == 'stream' --> return streamed output
+			parallel (bool): whether to serialize each format in a separate thread
+
+		Returns: a dict containing the serialized rdf graph for each format
+		"""
+
+		if 'trig' in outputs:  # write one named graph per report w/o rdflib
+			outputs = dict(outputs)
+			serialized = {'trig': self.stream_report_graphs(graphs, outputs.pop('trig'), 'trig')}
+			if outputs:  # serialize remaining formats
+				serialized.update(self.serialize_report_graphs_formats(graphs, outputs, parallel=parallel))
+			return serialized
+
+		g = self.build_report_graph(graphs)
+		if parallel and len(outputs) > 1:  # serialize formats in parallel threads
+			# bind prefixes for every IRI beforehand -- serializers only read the shared graph
+			for term in set(itertools.chain.from_iterable(g)):
+				if type(term) == URIRef:
+					try:
+						g.namespace_manager.compute_qname(term)
+					except Exception:  # IRI cannot be split into namespace and local name
+						continue
+			with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+				serialized = {rdf_format: executor.submit(self.serialize_graph, g, output, rdf_format) for rdf_format, output in outputs.items()}
+				return {rdf_format: future.result() for rdf_format, future in serialized.items()}
+		else:  # serialize formats one after the other
+			return {rdf_format: self.serialize_graph(g, output, rdf_format) for rdf_format, output in outputs.items()}
+
+	def stream_report_graphs(self, graphs, output='stream', rdf_format='nt'):
+		"""
+		Serialize report graphs w/o building an rdflib graph -- each report graph is written as soon as it is received, keeping memory constant
+
+		Params:
+			graphs (iterable(list(tuple))): report graphs to be serialized -- can be a generator
+			output (str): output path of the serialized graph - if output == 'stream' --> return streamed output
+			rdf_format (str): rdf serialization format - i.e., nt, turtle, or trig
+
+		Returns: the serialized rdf graph
+		"""
+
+		writer = RDFWriter(output, rdf_format, self.namespace, self.predicate2literal)
+		try:
+			for graph in graphs:
+				writer.write_graph(graph)
+		finally:
+			serialized = writer.close()
+		return serialized
+
+	def serialize_chunk(self, graphs, rdf_formats):
+		"""
+		Serialize a chunk of report graphs w/o header -- chunks serialized w/ the same format can be concatenated after format_header
+
+		Params:
+			graphs (list(list(tuple))): report graphs to be serialized
+			rdf_formats (list(str)): rdf serialization formats - i.e., n3, nt, turtle, or trig
+
+		Returns: a dict containing the serialized chunk for each format
+		"""
+
+		serialized = dict()
+		for rdf_format in rdf_formats:
+			if rdf_format == 'n3':  # n3 documents can be concatenated as they are -- prefixes are redeclared w/ the same namespaces
+				serialized[rdf_format] = self.serialize_report_graphs(graphs, 'stream', rdf_format).decode('utf-8')
+			else:  # format report graphs one after the other
+				writer = RDFWriter(None, rdf_format, self.namespace, self.predicate2literal)
+				serialized[rdf_format] = ''.join([writer.format_graph(graph) for graph in graphs])
+		return serialized
+
+	def format_header(self, rdf_format):
+		"""
+		Format the header preceding serialized chunks
+
+		Params:
+			rdf_format (str): rdf serialization format - i.e., n3, nt, turtle, or trig
+
+		Returns: the formatted header
+		"""
+
+		if rdf_format == 'n3':  # prefixes are declared within each chunk
+			return ''
+		return RDFWriter(None, rdf_format, self.namespace, self.predicate2literal).format_header()
+
+	def parallel_report_graphs(self, reports, concepts, closure, use_case, outputs, hospital=None, struct=False, workers=None, chunk_size=1000, debug=False):
+		"""
+		Build and serialize report graphs over chunks within a pool of worker processes -- chunk outputs are concatenated, in order, into the final outputs
+
+		Params:
+			reports (dict): dict containing reports
+			concepts (dict): dict containing concepts extracted from reports
+			closure (AncestorClosure): the higher concepts precomputed for report diagnoses -- shipped once to each worker
+			use_case (str): the use_case considered
+			outputs (dict): output path for each rdf serialization format (n3, nt, turtle, or trig) - if output == 'stream' --> return streamed output
+			hospital (str): considered hospital for ExaMode data -- if None, use the generic graph creation
+			struct (bool): whether to return graphs structured as dict
+			workers (int): number of worker processes -- if None, use the number of processors
+			chunk_size (int): number of reports within each chunk
+			debug (bool): whether to keep flags for debugging
+
+		Returns: a dict containing the serialized rdf graph for each format and the list of dict graphs (if struct==True)
+		"""
+
+		if not set(outputs.keys()).issubset({'n3', 'nt', 'turtle', 'trig'}):  # raise exception
+			print('provide correct format: "n3", "nt", "turtle", or "trig".')
+			raise Exception
+
+		rdf_formats = list(outputs.keys())
+		# split reports into chunks
+		rids = list(reports.keys())
+		chunks = [[(rid, reports[rid], concepts[rid]) for rid in rids[i:i+chunk_size]] for i in range(0, len(rids), chunk_size)]
+
+		# open outputs and write headers
+		outs = dict()
+		for rdf_format, output in outputs.items():
+			if output == 'stream':  # serialize graphs in memory
+				outs[rdf_format] = io.StringIO()
+			else:  # serialize graphs to file
+				os.makedirs(os.path.dirname(output), exist_ok=True)
+				outs[rdf_format] = open(output, 'w', encoding='utf-8')
+			outs[rdf_format].write(self.format_header(rdf_format))
+
+		struct_graphs = []
+		try:
+			with ProcessPoolExecutor(max_workers=workers, initializer=init_graph_worker, initargs=(self, closure, use_case, hospital)) as executor:
+				# concatenate chunk outputs as soon as they are available -- map preserves chunk order
+				for serialized, struct_chunk in executor.map(build_graph_chunk, chunks, itertools.repeat(rdf_formats), itertools.repeat(struct), itertools.repeat(debug)):
+					for rdf_format, chunk in serialized.items():
+						outs[rdf_format].write(chunk)
+					struct_graphs += struct_chunk
+		finally:
+			serialized = dict()
+			for rdf_format, out in outs.items():
+				if outputs[rdf_format] == 'stream':  # return serialized graphs -- as UTF-8 bytes, like rdflib serializers
+					serialized[rdf_format] = out.getvalue().encode('utf-8')
+				else:  # graphs stored to file
+					serialized[rdf_format] = True
+					print('rdf graphs serialized to {} with {} format'.format(outputs[rdf_format], rdf_format))
+				out.close()
+		if struct:  # return both rdf and dict graphs
+			return serialized, struct_graphs
+		else:
+			return serialized
+
+	def get_diagnoses(self, concepts):
+		"""
+		Get the diagnosis concepts found within reports -- i.e., the concepts graph builders issue higher concept queries for
+
+		Params:
+			concepts (dict): dict containing concepts extracted from reports
+
+		Returns: the set of diagnosis iris
+		"""
+
+		diagnoses = set()
+		for report_concepts in concepts.values():
+			if 'concepts' in report_concepts:  # Radboud concepts
+				report_concepts = report_concepts['concepts']
+			diagnoses.update([diagnosis[0] for diagnosis in report_concepts['Diagnosis']])
+		return diagnoses
+
+	@staticmethod
+	def read_trig_graphs(dataset):
+		"""
+		Read named graphs from a trig dataset file written by RDFWriter -- graphs are read one at a time
+
+		Params:
+			dataset (str): trig dataset file path
+
+		Returns: a generator of (graph name, serialized graph) pairs
+		"""
+
+		with open(dataset, 'r', encoding='utf-8') as f:
+			name = None
+			block = []
+			for line in f:
+				if name is None:  # outside named graphs
+					if line.startswith('<') and line.endswith('> {\n'):  # named graph starts
+						name = line[1:-4]
+						block = [line]
+				else:  # within named graph
+					block.append(line)
+					if line == '}\n':  # named graph ends
+						yield name, ''.join(block) + '\n'
+						name = None
+
+	def update_trig_dataset(self, graphs, dataset):
+		"""
+		Incrementally update a trig dataset w/ report graphs -- each report is a named graph identified by the report IRI: new reports are appended and only changed reports are replaced
+
+		Params:
+			graphs (iterable(list(tuple))): report graphs to be stored
+			dataset (str): trig dataset path - if dataset ends w/ '.trig' --> single dataset file, otherwise --> directory w/ one file per report
+
+		Returns: a dict containing the number of added, replaced, and unchanged reports
+		"""
+
+		writer = RDFWriter(None, 'trig', self.namespace, self.predicate2literal)
+		# format report graphs as named graphs
+		named_graphs = dict()
+		for graph in graphs:
+			named_graphs[writer.graph_name(graph)] = writer.format_graph(graph)
+		stats = {'added': 0, 'replaced': 0, 'unchanged': 0}
+
+		if not dataset.endswith('.trig'):  # dataset is a directory w/ one file per report
+			os.makedirs(dataset, exist_ok=True)
+			for name, named_graph in named_graphs.items():
+				# name file after the report IRI hash -- IRIs are not valid file names
+				g_fpath = os.path.join(dataset, hashlib.md5(name.encode()).hexdigest() + '.trig')
+				named_graph = writer.format_header() + named_graph
+				if os.path.exists(g_fpath):  # report already stored
+					with open(g_fpath, 'r', encoding='utf-8') as f:
+						if f.read() == named_graph:  # report did not change
+							stats['unchanged'] += 1
+							continue
+					stats['replaced'] += 1
+				else:  # new report
+					stats['added'] += 1
+				# write report to a temporary file and then replace the old one
+				with open(g_fpath + '.tmp', 'w', encoding='utf-8') as f:
+					f.write(named_graph)
+				os.replace(g_fpath + '.tmp', g_fpath)
+			print('trig dataset {} updated: {}'.format(dataset, stats))
+			return stats
+
+		# dataset is a single file
+		replaced = set()
+		if os.path.exists(dataset):  # compare stored reports w/ the new ones
+			for name, named_graph in self.read_trig_graphs(dataset):
+				if name in named_graphs:
+					if named_graphs[name] == named_graph:  # report did not change -- skip it
+						stats['unchanged'] += 1
+						named_graphs[name] = None
+					else:  # report changed
+						replaced.add(name)
+			stats['replaced'] = len(replaced)
+		else:  # create dataset
+			os.makedirs(os.path.dirname(dataset) or '.', exist_ok=True)
+			with open(dataset, 'w', encoding='utf-8') as f:
+				f.write(writer.format_header())
+
+		if replaced:  # rewrite dataset replacing changed reports only
+			with open(dataset + '.tmp', 'w', encoding='utf-8') as out:
+				with open(dataset, 'r', encoding='utf-8') as f:  # copy header
+					for line in f:
+						if line.startswith('<'):
+							break
+						out.write(line)
+				for name, named_graph in self.read_trig_graphs(dataset):
+					out.write(named_graphs[name] if name in replaced else named_graph)
+			os.replace(dataset + '.tmp', dataset)
+		# append new reports
+		added = [named_graph for name, named_graph in named_graphs.items() if named_graph is not None and name not in replaced]
+		stats['added'] = len(added)
+		with open(dataset, 'a', encoding='utf-8') as f:
+			f.write(''.join(added))
+		print('trig dataset {} updated: {}'.format(dataset, stats))
+		return stats
+
 	# AOEC SPECIFIC FUNCTIONS
 
 	def aoec_create_graph(self, rid, report_data, report_concepts, onto_proc, use_case, debug=False):
@@ -178,33 +565,33 @@ class RDFProc(object):
 		# create report data-related triples
 
 		# build the IRI for the resource
-		resource = self.base_iri + 'resource/'
+		resource = self.resource_iri
 
 		# build the IRI for the given report
-		report = resource + 'report/' + hrid
+		report = self.report_iri + hrid
 		struct_graph['ReportURL'] = report
 
 		# build the IRI for the use-case ClinicalCaseReport
-		use_case_ccreport = self.namespace['exa'][use_case.capitalize() + 'ClinicalCaseReport']
+		use_case_ccreport = self.ccreports[use_case] if use_case in self.ccreports else self.namespace['exa'][use_case.capitalize() + 'ClinicalCaseReport']
 		struct_graph['ClinicalCase'] = use_case_ccreport
 
 		# generate report data-related triples
-		rdf_graph.append((report, RDF.type, use_case_ccreport))
-		rdf_graph.append((report, self.namespace['dc']['identifier'], hrid))
+		rdf_graph.append((report, self.predicates['type'], use_case_ccreport))
+		rdf_graph.append((report, self.predicates['identifier'], hrid))
 		if report_data['diagnosis_nlp']:  # textual diagnosis is present within report data
-			rdf_graph.append((report, self.namespace['exa']['hasDiagnosisText'], report_data['diagnosis_nlp']))
+			rdf_graph.append((report, self.predicates['hasDiagnosisText'], report_data['diagnosis_nlp']))
 			struct_graph['hasDiagnosisText'] = report_data['diagnosis_nlp']
 		if 'image' in report_data:  # report belongs to v2
-			rdf_graph.append((report, self.namespace['exa']['hasImage'], report_data['image']))
+			rdf_graph.append((report, self.predicates['hasImage'], report_data['image']))
 		if 'internalid' in report_data:  # report belongs to v2
-			rdf_graph.append((report, self.namespace['exa']['hasBlockNumber'], report_data['internalid']))
+			rdf_graph.append((report, self.predicates['hasBlockNumber'], report_data['internalid']))
 			struct_graph['hasBlockNumber'] = report_data['internalid']
 		else:  # report belongs to v1
 			if len(rid.split('_')) == 1:  # no internalid specified - set to 1
-				rdf_graph.append((report, self.namespace['exa']['hasBlockNumber'], '1'))
+				rdf_graph.append((report, self.predicates['hasBlockNumber'], '1'))
 				struct_graph['hasBlockNumber'] = '1'
 			else:
-				rdf_graph.append((report, self.namespace['exa']['hasBlockNumber'], rid.split('_')[1]))
+				rdf_graph.append((report, self.predicates['hasBlockNumber'], rid.split('_')[1]))
 				struct_graph['hasBlockNumber'] = rid.split('_')[1]
 
 		# create patient-related triples
@@ -214,15 +601,15 @@ class RDFProc(object):
 		# generate patient id hashing the first part of the 'rid' field
 		pid = hashlib.md5(rid.split('_')[0].encode()).hexdigest()
 		# build the IRI for the patient
-		patient = self.base_iri + 'resource/patient/' + pid
+		patient = self.patient_iri + pid
 		struct_graph['patient']['PatientURL'] = patient
 
 		# generate patient-related triples
-		rdf_graph.append((patient, RDF.type, 'http://purl.obolibrary.org/obo/IDOMAL_0000603'))
-		struct_graph['patient']['a'] = 'http://purl.obolibrary.org/obo/IDOMAL_0000603'
+		rdf_graph.append((patient, self.predicates['type'], self.classes['patient']))
+		struct_graph['patient']['a'] = str(self.classes['patient'])
 
 		# associate report to patient
-		rdf_graph.append((patient, self.namespace['exa']['hasClinicalCaseReport'], report))
+		rdf_graph.append((patient, self.predicates['hasClinicalCaseReport'], report))
 		# associate age to patient
 		age = None
 		if 'age' in report_data:  # age data is present within report_data
@@ -231,23 +618,23 @@ class RDFProc(object):
 			age = self.compute_age(report_data['birth_date'], report_data['visit_date'])
 		if age:  # age found within current report
 			# associate age to report
-			rdf_graph.append((patient, self.namespace['exa']['hasAge'], age))
+			rdf_graph.append((patient, self.predicates['hasAge'], age))
 			struct_graph['patient']['hasAge'] = age
 
 			# convert age to age set and associate to report
 			if age < 40:  # young 
-				rdf_graph.append((patient, self.namespace['exa']['hasAgeOnset'], self.age_set['young']))
-				struct_graph['patient']['hasAgeOnset'] = self.age_set['young']
+				rdf_graph.append((patient, self.predicates['hasAgeOnset'], self.age_set['young']))
+				struct_graph['patient']['hasAgeOnset'] = str(self.age_set['young'])
 			elif 40 <= age < 60:  # middle
-				rdf_graph.append((patient, self.namespace['exa']['hasAgeOnset'], self.age_set['middle']))
-				struct_graph['patient']['hasAgeOnset'] = self.age_set['middle']
+				rdf_graph.append((patient, self.predicates['hasAgeOnset'], self.age_set['middle']))
+				struct_graph['patient']['hasAgeOnset'] = str(self.age_set['middle'])
 			else:  # late
-				rdf_graph.append((patient, self.namespace['exa']['hasAgeOnset'], self.age_set['late']))
-				struct_graph['patient']['hasAgeOnset'] = self.age_set['late']
+				rdf_graph.append((patient, self.predicates['hasAgeOnset'], self.age_set['late']))
+				struct_graph['patient']['hasAgeOnset'] = str(self.age_set['late'])
 		# associate gender to patient
 		if report_data['gender']:  # gender data is present within report_data
-			rdf_graph.append((patient, self.namespace['exa']['hasGender'], self.gender[report_data['gender']]))
-			struct_graph['patient']['hasGender'] = self.gender[report_data['gender']]
+			rdf_graph.append((patient, self.predicates['hasGender'], self.gender[report_data['gender']]))
+			struct_graph['patient']['hasGender'] = str(self.gender[report_data['gender']])
 			struct_graph['patient']['hasGenderLiteral'] = report_data['gender']
 
 		# create report concept-related triples
@@ -318,17 +705,17 @@ class RDFProc(object):
 			outcomes_struct['OutcomeURL'] = resource_outcome
 
 			# attach outcome instance to graph
-			rdf_graph.append((report, self.namespace['exa']['hasOutcome'], resource_outcome))
+			rdf_graph.append((report, self.predicates['hasOutcome'], resource_outcome))
 			# specify what the resource_outcome is
 			if use_case == 'cervix':
 				if pair[0] == ontology_hpv:  # outcome is hpv infection
-					rdf_graph.append((resource_outcome, self.namespace['exa']['detectedHumanPapillomaVirus'], pair[0]))
+					rdf_graph.append((resource_outcome, self.predicates['detectedHumanPapillomaVirus'], pair[0]))
 					outcomes_struct['detectedHumanPapillomaVirus'] = pair[0]
 				if pair[0] == ontology_koilocyte:  # outcome is koilocyte
-					rdf_graph.append((resource_outcome, self.namespace['exa']['koylociteDetected'], pair[0]))
+					rdf_graph.append((resource_outcome, self.predicates['koylociteDetected'], pair[0]))
 					outcomes_struct['koylociteDetected'] = pair[0]
 			else:  # regular outcome
-				rdf_graph.append((resource_outcome, RDF.type, pair[0]))
+				rdf_graph.append((resource_outcome, self.predicates['type'], pair[0]))
 				outcomes_struct['a'] = pair[0]
 
 			if use_case == 'colon' and len(pair) > 1:  # target outcome has associated dysplasia
@@ -336,7 +723,7 @@ class RDFProc(object):
 
 				for dysplasia_outcome in pair[1:]:
 					# specify the associated dysplasia
-					rdf_graph.append((resource_outcome, self.namespace['exa']['hasDysplasia'], dysplasia_outcome))
+					rdf_graph.append((resource_outcome, self.predicates['hasDysplasia'], dysplasia_outcome))
 					outcomes_struct['hasDysplasia'].append(dysplasia_outcome)
 
 			# 'Anatomical'-related triples
@@ -344,7 +731,7 @@ class RDFProc(object):
 			outcomes_struct['hasLocation'] = []
 			# specify the anatomical location associated to target outcome
 			for location in report_locations:  # @smarchesin TODO: correct? we might link multiple locations to the same outcome
-				rdf_graph.append((resource_outcome, self.namespace['exa']['hasLocation'], location))
+				rdf_graph.append((resource_outcome, self.predicates['hasLocation'], location))
 				outcomes_struct['hasLocation'].append(location)
 
 			# 'Procedure'-related triples
@@ -355,19 +742,19 @@ class RDFProc(object):
 				intervention_struct = {}
 
 				# build the IRI for the identified procedure
-				resource_procedure = resource + 'procedure/' + hrid + '/' + str(report_outcome_n) + '.' + str(ix+1)
+				resource_procedure = self.procedure_iri + hrid + '/' + str(report_outcome_n) + '.' + str(ix+1)
 				# attach procedure instance to graph
-				rdf_graph.append((resource_outcome, self.namespace['exa']['hasIntervention'], resource_procedure))
+				rdf_graph.append((resource_outcome, self.predicates['hasIntervention'], resource_procedure))
 				intervention_struct['InterventionURL'] = resource_procedure
 
 				# specify what the resource_procedure is
-				rdf_graph.append((resource_procedure, RDF.type, procedure))
+				rdf_graph.append((resource_procedure, self.predicates['type'], procedure))
 				intervention_struct['a'] = procedure
 
 				intervention_struct['hasTopography'] = []
 				# specify the anatomical location associated to target procedure
 				for location in report_locations:  # @smarchesin TODO: correct? we might associate multiple locations to the same procedure
-					rdf_graph.append((resource_procedure, self.namespace['exa']['hasTopography'], location))
+					rdf_graph.append((resource_procedure, self.predicates['hasTopography'], location))
 					intervention_struct['hasTopography'].append(location)
 
 				outcomes_struct['hasIntervention'].append(intervention_struct)
@@ -377,7 +764,7 @@ class RDFProc(object):
 			outcomes_struct['hasTest'] = []
 			if use_case != 'cervix':
 				for test in report_tests:  # @smarchesin TODO: is it correct? in this way we can associate multiple tests to the same outcome
-					rdf_graph.append((resource_outcome, self.namespace['exa']['hasTest'], test))
+					rdf_graph.append((resource_outcome, self.predicates['hasTest'], test))
 					outcomes_struct['hasTest'].append(test)
 
 			struct_graph['hasOutcome'].append(outcomes_struct)
@@ -412,38 +799,38 @@ class RDFProc(object):
 		# create report data-related triples
 
 		# build the IRI for the resource
-		resource = self.base_iri + 'resource/'
+		resource = self.resource_iri
 
 		# build the IRI for the given report
-		report = resource + 'report/' + hrid
+		report = self.report_iri + hrid
 		struct_graph['ReportURL'] = report
 
 		# build the IRI for the use-case ClinicalCaseReport
-		use_case_ccreport = self.namespace['exa'][use_case.capitalize() + 'ClinicalCaseReport']
+		use_case_ccreport = self.ccreports[use_case] if use_case in self.ccreports else self.namespace['exa'][use_case.capitalize() + 'ClinicalCaseReport']
 		struct_graph['ClinicalCase'] = use_case_ccreport
 
 		# generate report data-related triples
-		rdf_graph.append((report, RDF.type, use_case_ccreport))
-		rdf_graph.append((report, self.namespace['dc']['identifier'], hrid))
+		rdf_graph.append((report, self.predicates['type'], use_case_ccreport))
+		rdf_graph.append((report, self.predicates['identifier'], hrid))
 		# store conclusion text from radboud report
 		diagnosis = report_data['diagnosis']
 		if diagnosis:  # textual diagnosis is present within conclusions
-			rdf_graph.append((report, self.namespace['exa']['hasDiagnosisText'], diagnosis))
+			rdf_graph.append((report, self.predicates['hasDiagnosisText'], diagnosis))
 			struct_graph['hasDiagnosisText'] = diagnosis
 
 		if 'slide_ids' in report_data:
 			struct_graph['slides'] = []
 
 			# set ontology 'Slide Device'
-			ontology_slide = 'http://purl.obolibrary.org/obo/NCIT_C50178'
+			ontology_slide = self.classes['slide']
 			# generate report slide-related triples
 			for slide_id in report_data['slide_ids']:
 				slide = {}
-				rdf_graph.append((report + '/slide/' + slide_id, RDF.type, ontology_slide))
-				slide['a'] = ontology_slide
-				rdf_graph.append((report + '/slide/' + slide_id, self.namespace['exa']['hasSlideId'], slide_id))
+				rdf_graph.append((report + '/slide/' + slide_id, self.predicates['type'], ontology_slide))
+				slide['a'] = str(ontology_slide)
+				rdf_graph.append((report + '/slide/' + slide_id, self.predicates['hasSlideId'], slide_id))
 				slide['hasSlideId'] = slide_id
-				rdf_graph.append((report, self.namespace['exa']['hasSlide'], report + '/slide/' + slide_id))
+				rdf_graph.append((report, self.predicates['hasSlide'], report + '/slide/' + slide_id))
 				slide['hasSlide'] = report + '/slide/' + slide_id
 				struct_graph['slides'].append(slide)
 
@@ -454,15 +841,15 @@ class RDFProc(object):
 		# generate patient id hashing the first part of the 'rid' field (up to P00000###)
 		pid = hashlib.md5('_'.join(rid.split('_')[0:3]).encode()).hexdigest()
 		# build the IRI for the patient
-		patient = self.base_iri + 'resource/patient/' + pid
+		patient = self.patient_iri + pid
 		struct_graph['patient']['PatientURL'] = patient
 
 		# generate patient-related triples
-		rdf_graph.append((patient, RDF.type, 'http://purl.obolibrary.org/obo/IDOMAL_0000603'))
-		struct_graph['patient']['a'] = 'http://purl.obolibrary.org/obo/IDOMAL_0000603'
+		rdf_graph.append((patient, self.predicates['type'], self.classes['patient']))
+		struct_graph['patient']['a'] = str(self.classes['patient'])
 
 		# associate report to patient
-		rdf_graph.append((patient, self.namespace['exa']['hasClinicalCaseReport'], report))
+		rdf_graph.append((patient, self.predicates['hasClinicalCaseReport'], report))
 
 		# create report concept-related triples
 
@@ -533,17 +920,17 @@ class RDFProc(object):
 			outcomes_struct['OutcomeURL'] = resource_outcome
 
 			# attach outcome instance to graph
-			rdf_graph.append((report, self.namespace['exa']['hasOutcome'], resource_outcome))
+			rdf_graph.append((report, self.predicates['hasOutcome'], resource_outcome))
 			# specify what the resource_outcome is
 			if use_case == 'cervix':
 				if pair[0] == ontology_hpv:  # outcome is hpv infection
-					rdf_graph.append((resource_outcome, self.namespace['exa']['detectedHumanPapillomaVirus'], pair[0]))
+					rdf_graph.append((resource_outcome, self.predicates['detectedHumanPapillomaVirus'], pair[0]))
 					outcomes_struct['detectedHumanPapillomaVirus'] = pair[0]
 				if pair[0] == ontology_koilocyte:  # outcome is koilocyte
-					rdf_graph.append((resource_outcome, self.namespace['exa']['koylociteDetected'], pair[0]))
+					rdf_graph.append((resource_outcome, self.predicates['koylociteDetected'], pair[0]))
 					outcomes_struct['koylociteDetected'] = pair[0]
 			else:  # regular outcome
-				rdf_graph.append((resource_outcome, RDF.type, pair[0]))
+				rdf_graph.append((resource_outcome, self.predicates['type'], pair[0]))
 				outcomes_struct['a'] = pair[0]
 
 			if use_case == 'colon' and len(pair) > 1:  # target outcome has associated dysplasia
@@ -551,7 +938,7 @@ class RDFProc(object):
 
 				for dysplasia_outcome in pair[1:]:
 					# specify the associated dysplasia
-					rdf_graph.append((resource_outcome, self.namespace['exa']['hasDysplasia'], dysplasia_outcome))
+					rdf_graph.append((resource_outcome, self.predicates['hasDysplasia'], dysplasia_outcome))
 					outcomes_struct['hasDysplasia'].append(dysplasia_outcome)
 
 			# 'Anatomical'-related triples
@@ -559,7 +946,7 @@ class RDFProc(object):
 			outcomes_struct['hasLocation'] = []
 			# specify the anatomical location associated to target outcome
 			for location in report_locations:  # @smarchesin TODO: correct? we might link multiple locations to the same outcome
-				rdf_graph.append((resource_outcome, self.namespace['exa']['hasLocation'], location))
+				rdf_graph.append((resource_outcome, self.predicates['hasLocation'], location))
 				outcomes_struct['hasLocation'].append(location)
 
 			# 'Procedure'-related triples
@@ -570,19 +957,19 @@ class RDFProc(object):
 				intervention_struct = {}
 
 				# build the IRI for the identified procedure
-				resource_procedure = resource + 'procedure/' + hrid + '/' + str(report_outcome_n) + '.' + str(ix+1)
+				resource_procedure = self.procedure_iri + hrid + '/' + str(report_outcome_n) + '.' + str(ix+1)
 				# attach procedure instance to graph
-				rdf_graph.append((resource_outcome, self.namespace['exa']['hasIntervention'], resource_procedure))
+				rdf_graph.append((resource_outcome, self.predicates['hasIntervention'], resource_procedure))
 				intervention_struct['InterventionURL'] = resource_procedure
 
 				# specify what the resource_procedure is
-				rdf_graph.append((resource_procedure, RDF.type, procedure))
+				rdf_graph.append((resource_procedure, self.predicates['type'], procedure))
 				intervention_struct['a'] = procedure
 
 				intervention_struct['hasTopography'] = []
 				# specify the anatomical location associated to target procedure
 				for location in report_locations:  # @smarchesin TODO: correct? we might link multiple locations to the same procedure
-					rdf_graph.append((resource_procedure, self.namespace['exa']['hasTopography'], location))
+					rdf_graph.append((resource_procedure, self.predicates['hasTopography'], location))
 					intervention_struct['hasTopography'].append(location)
 
 				outcomes_struct['hasIntervention'].append(intervention_struct)
@@ -592,7 +979,7 @@ class RDFProc(object):
 			outcomes_struct['hasTest'] = []
 			if use_case != 'cervix':
 				for test in report_tests:  # @smarchesin TODO: correct? we might link multiple tests to the same outcome
-					rdf_graph.append((resource_outcome, self.namespace['exa']['hasTest'], test))
+					rdf_graph.append((resource_outcome, self.predicates['hasTest'], test))
 					outcomes_struct['hasTest'].append(test)
 
 			struct_graph['hasOutcome'].append(outcomes_struct)
@@ -627,23 +1014,23 @@ class RDFProc(object):
 		# create report data-related triples
 
 		# build the IRI for the resource
-		resource = self.base_iri + 'resource/'
+		resource = self.resource_iri
 
 		# build the IRI for the given report
-		report = resource + 'report/' + hrid
+		report = self.report_iri + hrid
 		struct_graph['ReportURL'] = report
 
 		# build the IRI for the use-case ClinicalCaseReport
-		use_case_ccreport = self.namespace['exa'][use_case.capitalize() + 'ClinicalCaseReport']
+		use_case_ccreport = self.ccreports[use_case] if use_case in self.ccreports else self.namespace['exa'][use_case.capitalize() + 'ClinicalCaseReport']
 		struct_graph['ClinicalCase'] = use_case_ccreport
 
 		# generate report data-related triples
-		rdf_graph.append((report, RDF.type, use_case_ccreport))
-		rdf_graph.append((report, self.namespace['dc']['identifier'], hrid))
+		rdf_graph.append((report, self.predicates['type'], use_case_ccreport))
+		rdf_graph.append((report, self.predicates['identifier'], hrid))
 		# store text from report
 		diagnosis = report_data['text']
 		if diagnosis:  # textual diagnosis is present within conclusions
-			rdf_graph.append((report, self.namespace['exa']['hasDiagnosisText'], diagnosis))
+			rdf_graph.append((report, self.predicates['hasDiagnosisText'], diagnosis))
 			struct_graph['hasDiagnosisText'] = diagnosis
 
 		# create patient-related triples
@@ -653,36 +1040,36 @@ class RDFProc(object):
 		# generate patient id
 		pid = 'p_' + rid
 		# build the IRI for the patient
-		patient = self.base_iri + 'resource/patient/' + pid
+		patient = self.patient_iri + pid
 		struct_graph['patient']['PatientURL'] = patient
 
 		# generate patient-related triples
-		rdf_graph.append((patient, RDF.type, 'http://purl.obolibrary.org/obo/IDOMAL_0000603'))
-		struct_graph['patient']['a'] = 'http://purl.obolibrary.org/obo/IDOMAL_0000603'
+		rdf_graph.append((patient, self.predicates['type'], self.classes['patient']))
+		struct_graph['patient']['a'] = str(self.classes['patient'])
 
 		# associate report to patient
-		rdf_graph.append((patient, self.namespace['exa']['hasClinicalCaseReport'], report))
+		rdf_graph.append((patient, self.predicates['hasClinicalCaseReport'], report))
 		# associate age to patient
 		age = report_data['age']
 		if age:  # age found within current report
 			# associate age to report
-			rdf_graph.append((patient, self.namespace['exa']['hasAge'], age))
+			rdf_graph.append((patient, self.predicates['hasAge'], age))
 			struct_graph['patient']['hasAge'] = age
 
 			# convert age to age set and associate to report
 			if age < 40:  # young
-				rdf_graph.append((patient, self.namespace['exa']['hasAgeOnset'], self.age_set['young']))
-				struct_graph['patient']['hasAgeOnset'] = self.age_set['young']
+				rdf_graph.append((patient, self.predicates['hasAgeOnset'], self.age_set['young']))
+				struct_graph['patient']['hasAgeOnset'] = str(self.age_set['young'])
 			elif 40 <= age < 60:  # middle
-				rdf_graph.append((patient, self.namespace['exa']['hasAgeOnset'], self.age_set['middle']))
-				struct_graph['patient']['hasAgeOnset'] = self.age_set['middle']
+				rdf_graph.append((patient, self.predicates['hasAgeOnset'], self.age_set['middle']))
+				struct_graph['patient']['hasAgeOnset'] = str(self.age_set['middle'])
 			else:  # late
-				rdf_graph.append((patient, self.namespace['exa']['hasAgeOnset'], self.age_set['late']))
-				struct_graph['patient']['hasAgeOnset'] = self.age_set['late']
+				rdf_graph.append((patient, self.predicates['hasAgeOnset'], self.age_set['late']))
+				struct_graph['patient']['hasAgeOnset'] = str(self.age_set['late'])
 		# associate gender to patient
 		if report_data['gender']:  # gender data is present within report_data
-			rdf_graph.append((patient, self.namespace['exa']['hasGender'], self.gender[report_data['gender']]))
-			struct_graph['patient']['hasGender'] = self.gender[report_data['gender']]
+			rdf_graph.append((patient, self.predicates['hasGender'], self.gender[report_data['gender']]))
+			struct_graph['patient']['hasGender'] = str(self.gender[report_data['gender']])
 			struct_graph['patient']['hasGenderLiteral'] = report_data['gender']
 
 		# create report concept-related triples
@@ -754,17 +1141,17 @@ class RDFProc(object):
 			outcomes_struct['OutcomeURL'] = resource_outcome
 
 			# attach outcome instance to graph
-			rdf_graph.append((report, self.namespace['exa']['hasOutcome'], resource_outcome))
+			rdf_graph.append((report, self.predicates['hasOutcome'], resource_outcome))
 			# specify what the resource_outcome is
 			if use_case == 'cervix':
 				if pair[0] == ontology_hpv:  # outcome is hpv infection
-					rdf_graph.append((resource_outcome, self.namespace['exa']['detectedHumanPapillomaVirus'], pair[0]))
+					rdf_graph.append((resource_outcome, self.predicates['detectedHumanPapillomaVirus'], pair[0]))
 					outcomes_struct['detectedHumanPapillomaVirus'] = pair[0]
 				if pair[0] == ontology_koilocyte:  # outcome is koilocyte
-					rdf_graph.append((resource_outcome, self.namespace['exa']['koylociteDetected'], pair[0]))
+					rdf_graph.append((resource_outcome, self.predicates['koylociteDetected'], pair[0]))
 					outcomes_struct['koylociteDetected'] = pair[0]
 			else:  # regular outcome
-				rdf_graph.append((resource_outcome, RDF.type, pair[0]))
+				rdf_graph.append((resource_outcome, self.predicates['type'], pair[0]))
 				outcomes_struct['a'] = pair[0]
 
 			if use_case == 'colon' and len(pair) > 1:  # target outcome has associated dysplasia
@@ -772,7 +1159,7 @@ class RDFProc(object):
 
 				for dysplasia_outcome in pair[1:]:
 					# specify the associated dysplasia
-					rdf_graph.append((resource_outcome, self.namespace['exa']['hasDysplasia'], dysplasia_outcome))
+					rdf_graph.append((resource_outcome, self.predicates['hasDysplasia'], dysplasia_outcome))
 					outcomes_struct['hasDysplasia'].append(dysplasia_outcome)
 
 			# 'Anatomical'-related triples
@@ -780,7 +1167,7 @@ class RDFProc(object):
 			outcomes_struct['hasLocation'] = []
 			# specify the anatomical location associated to target outcome
 			for location in report_locations:  # @smarchesin TODO: correct? we might link multiple locations to the same outcome
-				rdf_graph.append((resource_outcome, self.namespace['exa']['hasLocation'], location))
+				rdf_graph.append((resource_outcome, self.predicates['hasLocation'], location))
 				outcomes_struct['hasLocation'].append(location)
 
 			# 'Procedure'-related triples
@@ -791,19 +1178,19 @@ class RDFProc(object):
 				intervention_struct = {}
 
 				# build the IRI for the identified procedure
-				resource_procedure = resource + 'procedure/' + hrid + '/' + str(report_outcome_n) + '.' + str(ix+1)
+				resource_procedure = self.procedure_iri + hrid + '/' + str(report_outcome_n) + '.' + str(ix+1)
 				# attach procedure instance to graph
-				rdf_graph.append((resource_outcome, self.namespace['exa']['hasIntervention'], resource_procedure))
+				rdf_graph.append((resource_outcome, self.predicates['hasIntervention'], resource_procedure))
 				intervention_struct['InterventionURL'] = resource_procedure
 
 				# specify what the resource_procedure is
-				rdf_graph.append((resource_procedure, RDF.type, procedure))
+				rdf_graph.append((resource_procedure, self.predicates['type'], procedure))
 				intervention_struct['a'] = procedure
 
 				intervention_struct['hasTopography'] = []
 				# specify the anatomical location associated to target procedure
 				for location in report_locations:  # @smarchesin TODO: correct? we might link multiple locations to the same procedure
-					rdf_graph.append((resource_procedure, self.namespace['exa']['hasTopography'], location))
+					rdf_graph.append((resource_procedure, self.predicates['hasTopography'], location))
 					intervention_struct['hasTopography'].append(location)
 
 				outcomes_struct['hasIntervention'].append(intervention_struct)
@@ -813,7 +1200,7 @@ class RDFProc(object):
 			outcomes_struct['hasTest'] = []
 			if use_case != 'cervix':
 				for test in report_tests:  # @smarchesin TODO: correct? we might link multiple tests to the same outcome
-					rdf_graph.append((resource_outcome, self.namespace['exa']['hasTest'], test))
+					rdf_graph.append((resource_outcome, self.predicates['hasTest'], test))
 					outcomes_struct['hasTest'].append(test)
 
 			struct_graph['hasOutcome'].append(outcomes_struct)
@@ -0,0 +1,196 @@
+import io
+import os
+import re
+
+from rdflib.namespace import RDF, XSD
+
+
+class RDFWriter(object):
+
+	def __init__(self, output='stream', rdf_format='nt', namespaces=None, predicate2literal=None):
+		"""
+		Open the output and write the header required by the rdf serialization format
+
+		Params:
+			output (str): output path of the serialized graphs - if output == 'stream' --> serialize graphs in memory, if output is None --> only format graphs
+			rdf_format (str): rdf serialization format - i.e., nt, turtle, or trig
+			namespaces (dict): prefix-namespace pairs used to abbreviate predicates (turtle and trig only)
+			predicate2literal (list): predicates that associate Resource w/ Literal
+
+		Returns: None
+		"""
+
+		if rdf_format not in ['nt', 'turtle', 'trig']:  # raise exception
+			print('provide correct format: "nt", "turtle", or "trig".')
+			raise Exception
+
+		self.output = output
+		self.rdf_format = rdf_format
+		self.namespaces = {px: str(ns) for px, ns in namespaces.items()} if namespaces else dict()
+		self.predicate2literal = set(str(predicate) for predicate in predicate2literal) if predicate2literal else set()
+		# set regex to check whether local names can be abbreviated w/ prefixes
+		self.local_name_regex = re.compile('^[A-Za-z_][A-Za-z0-9_-]*$')
+
+		if output is None:  # format graphs only
+			self.out = None
+			return
+		if output == 'stream':  # serialize graphs in memory
+			self.out = io.StringIO()
+		else:  # serialize graphs to file
+			os.makedirs(os.path.dirname(output), exist_ok=True)
+			self.out = open(output, 'w', encoding='utf-8')
+		self.out.write(self.format_header())
+
+	def format_header(self):
+		"""
+		Format the header required by the rdf serialization format -- i.e., prefixes for turtle and trig
+
+		Returns: the formatted header
+		"""
+
+		if self.rdf_format == 'nt':  # N-Triples does not support prefixes
+			return ''
+		return ''.join(['@prefix ' + px + ': <' + ns + '> .\n' for px, ns in self.namespaces.items()]) + '\n'
+
+	@staticmethod
+	def format_iri(iri):
+		"""
+		Format IRI as N-Triples/Turtle IRI reference
+
+		Params:
+			iri (str): the IRI
+
+		Returns: the formatted IRI
+		"""
+
+		return '<' + str(iri) + '>'
+
+	@staticmethod
+	def format_literal(value):
+		"""
+		Format value as N-Triples/Turtle literal -- datatypes match those assigned by rdflib.Literal
+
+		Params:
+			value (str/int/float/bool): the literal value
+
+		Returns: the formatted literal
+		"""
+
+		if type(value) == bool:  # boolean literal
+			return '"' + ('true' if value else 'false') + '"^^<' + str(XSD.boolean) + '>'
+		elif type(value) == int:  # integer literal
+			return '"' + str(value) + '"^^<' + str(XSD.integer) + '>'
+		elif type(value) == float:  # double literal
+			return '"' + repr(value) + '"^^<' + str(XSD.double) + '>'
+		else:  # plain literal
+			value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+			return '"' + value + '"'
+
+	def format_predicate(self, predicate):
+		"""
+		Format predicate -- predicates are abbreviated w/ prefixes when possible (turtle and trig only)
+
+		Params:
+			predicate (str): the predicate IRI
+
+		Returns: the formatted predicate
+		"""
+
+		if self.rdf_format == 'nt':  # N-Triples does not support abbreviations
+			return self.format_iri(predicate)
+		if predicate == str(RDF.type):  # abbreviate rdf:type
+			return 'a'
+		for px, ns in self.namespaces.items():
+			if predicate.startswith(ns) and self.local_name_regex.match(predicate[len(ns):]):  # abbreviate predicate w/ prefix
+				return px + ':' + predicate[len(ns):]
+		return self.format_iri(predicate)
+
+	@staticmethod
+	def graph_name(graph):
+		"""
+		Get the name of the report graph -- i.e., the IRI of the report
+
+		Params:
+			graph (list(tuple)): (s, p, o) triples representing the report
+
+		Returns: the report IRI
+		"""
+
+		for s, p, o in graph:
+			if str(p) == str(RDF.type) and str(o).endswith('ClinicalCaseReport'):  # report triple
+				return str(s)
+		# no report triple -- use the first subject
+		return str(graph[0][0])
+
+	def format_object(self, predicate, obj):
+		"""
+		Format object as literal or IRI depending on predicate
+
+		Params:
+			predicate (str): the predicate IRI
+			obj (str/int/float/bool): the object
+
+		Returns: the formatted object
+		"""
+
+		if predicate in self.predicate2literal:  # object is a literal
+			return self.format_literal(obj)
+		else:  # object is a resource
+			return self.format_iri(obj)
+
+	def format_graph(self, graph):
+		"""
+		Format report graph -- triples are grouped by subject (turtle and trig only) and, for trig, wrapped within a graph named after the report
+
+		Params:
+			graph (list(tuple)): (s, p, o) triples representing the report
+
+		Returns: the formatted report graph
+		"""
+
+		if self.rdf_format == 'nt':  # format one triple per line
+			return ''.join([self.format_iri(s) + ' ' + self.format_iri(str(p)) + ' ' + self.format_object(str(p), o) + ' .\n' for s, p, o in graph])
+
+		# group triples by subject keeping their order
+		subjects = dict()
+		for s, p, o in graph:
+			subjects.setdefault(str(s), []).append((str(p), o))
+		indent = '    ' if self.rdf_format == 'trig' else ''
+		block = []
+		for s, pos in subjects.items():
+			pos = [self.format_predicate(p) + ' ' + self.format_object(p, o) for p, o in pos]
+			block.append(indent + self.format_iri(s) + ' ' + (' ;\n' + indent + '    ').join(pos) + ' .\n')
+		if self.rdf_format == 'trig':  # wrap report triples within a graph named after the report
+			return self.format_iri(self.graph_name(graph)) + ' {\n' + '\n'.join(block) + '}\n\n'
+		else:
+			return '\n'.join(block) + '\n'
+
+	def write_graph(self, graph):
+		"""
+		Write report graph as soon as it is received
+
+		Params:
+			graph (list(tuple)): (s, p, o) triples representing the report
+
+		Returns: None
+		"""
+
+		self.out.write(self.format_graph(graph))
+
+	def close(self):
+		"""
+		Close the output
+
+		Returns: the serialized graphs (as UTF-8 bytes, like rdflib serializers) when output == 'stream' or True otherwise
+		"""
+
+		if self.out is None:  # nothing to close
+			return True
+		if self.output == 'stream':  # return serialized graphs
+			serialized = self.out.getvalue().encode('utf-8')
+			self.out.close()
+			return serialized
+		else:  # close file
+			self.out.close()
+			print('rdf graphs streamed to {} with {} format'.format(self.output, self.rdf_format))
+			return True
@@ -0,0 +1,164 @@
+import os
+
+from rdflib import Graph, ConjunctiveGraph
+from rdflib.compare import isomorphic
+
+from sket.rdf_proc.rdf_processing import RDFProc
+from sket.utils.report_cache import ReportCache
+
+
+def sample_graphs(rdf_proc, n=3):
+	"""
+	Build sample report graphs as (s, p, o) triples
+
+	Params:
+		rdf_proc (RDFProc): the RDF processor
+		n (int): number of report graphs
+
+	Returns: the list of report graphs
+	"""
+
+	exa = rdf_proc.namespace['exa']
+	dc = rdf_proc.namespace['dc']
+	graphs = []
+	for i in range(n):
+		report = rdf_proc.base_iri + 'resource/report/r_' + str(i)
+		patient = rdf_proc.base_iri + 'resource/patient/p_' + str(i)
+		graphs.append([
+			(report, exa['hasDiagnosisText'], 'diagnosis "' + str(i) + '" \\ with\nnew lines'),
+			(report, dc['identifier'], rdf_proc.base_iri + 'resource/identifier/r_' + str(i)),
+			(patient, exa['hasAge'], 40 + i),
+			(patient, exa['detectedHumanPapillomaVirus'], i % 2 == 0),
+			(patient, exa['hasClinicalCaseReport'], report)
+		])
+	return graphs
+
+
+def parse(data, rdf_format):
+	"""
+	Parse serialized graphs w/ rdflib -- named graphs are merged into a single graph
+
+	Params:
+		data (str/bytes): serialized graphs
+		rdf_format (str): rdf serialization format
+
+	Returns: the parsed graph
+	"""
+
+	if rdf_format == 'trig':  # trig requires a graph supporting contexts
+		cg = ConjunctiveGraph()
+		cg.parse(data=data, format=rdf_format)
+		g = Graph()
+		for triple in cg.triples((None, None, None)):
+			g.add(triple)
+		return g
+	g = Graph()
+	g.parse(data=data, format=rdf_format)
+	return g
+
+
+def test_stream_report_graphs():
+	rdf_proc = RDFProc()
+	graphs = sample_graphs(rdf_proc)
+	reference = rdf_proc.build_report_graph(graphs)
+	for rdf_format in ['nt', 'turtle', 'trig']:
+		# stream graphs from a generator to make sure no list is required
+		streamed = rdf_proc.stream_report_graphs((graph for graph in graphs), 'stream', rdf_format)
+		assert isomorphic(parse(streamed, rdf_format), reference)
+
+
+def test_stream_serialization_returns_bytes():
+	rdf_proc = RDFProc()
+	graphs = sample_graphs(rdf_proc)
+	# streamed outputs are bytes for every format -- w/ and w/o rdflib
+	for rdf_format in ['n3', 'nt', 'turtle', 'trig']:
+		assert type(rdf_proc.serialize_report_graphs(graphs, 'stream', rdf_format)) == bytes
+	for rdf_format in ['nt', 'turtle', 'trig']:
+		assert type(rdf_proc.stream_report_graphs(graphs, 'stream', rdf_format)) == bytes
+
+
+def test_stream_report_graphs_to_file(tmp_path):
+	rdf_proc = RDFProc()
+	graphs = sample_graphs(rdf_proc)
+	output = str(tmp_path / 'graphs' / 'reports.nt')
+	assert rdf_proc.stream_report_graphs(graphs, output, 'nt')
+	with open(output, 'r', encoding='utf-8') as f:
+		assert isomorphic(parse(f.read(), 'nt'), rdf_proc.build_report_graph(graphs))
+
+
+def test_stream_report_graphs_trig_named_graphs():
+	rdf_proc = RDFProc()
+	graphs = sample_graphs(rdf_proc)
+	cg = ConjunctiveGraph()
+	cg.parse(data=rdf_proc.stream_report_graphs(graphs, 'stream', 'trig'), format='trig')
+	# each report is a named graph identified by the report IRI
+	names = set(str(context.identifier) for context in cg.contexts() if len(context) > 0)
+	assert names == set(graph[0][0] for graph in graphs)
+
+
+def test_update_trig_dataset(tmp_path):
+	rdf_proc = RDFProc()
+	graphs = sample_graphs(rdf_proc)
+	for dataset in [str(tmp_path / 'dataset.trig'), str(tmp_path / 'dataset')]:
+		assert rdf_proc.update_trig_dataset(graphs[:2], dataset) == {'added': 2, 'replaced': 0, 'unchanged': 0}
+		# change the second report and add a new one
+		changed = [graphs[0], graphs[1][:-1], graphs[2]]
+		assert rdf_proc.update_trig_dataset(changed, dataset) == {'added': 1, 'replaced': 1, 'unchanged': 1}
+		# read the whole dataset
+		cg = ConjunctiveGraph()
+		if dataset.endswith('.trig'):
+			cg.parse(dataset, format='trig')
+		else:
+			for fname in sorted(os.listdir(dataset)):
+				cg.parse(os.path.join(dataset, fname), format='trig')
+		g = Graph()
+		for triple in cg.triples((None, None, None)):
+			g.add(triple)
+		assert isomorphic(g, rdf_proc.build_report_graph(changed))
+
+
+class Closure(object):
+
+	def get_higher_concept(self, iri1, iri2, include_self=False):
+		"""
+		Mock precomputed higher concepts -- diagnoses are all outcomes
+
+		Returns: the hierarchically higher concept's iri
+		"""
+
+		return iri2 if not include_self else None
+
+
+def test_parallel_report_graphs():
+	rdf_proc = RDFProc()
+	reports = {str(i): {'text': 'diagnosis ' + str(i), 'age': 30 + i, 'gender': 'F'} for i in range(10)}
+	concepts = {str(i): {
+		'Procedure': [['http://purl.obolibrary.org/obo/NCIT_C15189', 'biopsy']], 'Anatomical Location': [],
+		'Test': [], 'Diagnosis': [['http://purl.obolibrary.org/obo/MONDO_0005161', 'hpv']]} for i in range(10)}
+	graphs = [rdf_proc.create_graph(rid, reports[rid], concepts[rid], Closure(), 'cervix')[0] for rid in reports]
+	serialized = rdf_proc.parallel_report_graphs(reports, concepts, Closure(), 'cervix', {'nt': 'stream', 'trig': 'stream'}, workers=2, chunk_size=3)
+	# chunk outputs are concatenated in report order
+	assert serialized['nt'] == rdf_proc.stream_report_graphs(graphs, 'stream', 'nt')
+	assert serialized['trig'] == rdf_proc.stream_report_graphs(graphs, 'stream', 'trig')
+
+
+def test_cached_report_graphs(tmp_path):
+	rdf_proc = RDFProc()
+	graphs = sample_graphs(rdf_proc)
+	cache = ReportCache(str(tmp_path / 'cache.db'))
+	cache.put('graph', {'r_' + str(i): graph for i, graph in enumerate(graphs)})
+	hits = cache.get(['r_' + str(i) for i in range(len(graphs))], 'graph')
+	cached = [rdf_proc.load_graph(hits['r_' + str(i)]) for i in range(len(graphs))]
+	cache.close()
+	assert isomorphic(rdf_proc.build_report_graph(cached), rdf_proc.build_report_graph(graphs))
+
+
+def test_struct_graph_plain_strings():
+	rdf_proc = RDFProc()
+	report = {'text': 'diagnosis', 'age': 70, 'gender': 'M'}
+	concepts = {'Procedure': [], 'Anatomical Location': [], 'Test': [], 'Diagnosis': [['http://purl.obolibrary.org/obo/MONDO_0005161', 'hpv']]}
+	_, struct_graph = rdf_proc.create_graph('r1', report, concepts, Closure(), 'cervix')
+	# patient classes, age onsets, and genders are returned as plain strings
+	for key, value in [('a', 'http://purl.obolibrary.org/obo/IDOMAL_0000603'), ('hasAgeOnset', 'https://hpo.jax.org/app/browse/term/HP:0003584'), ('hasGender', 'http://purl.obolibrary.org/obo/NCIT_C46109')]:
+		assert type(struct_graph['patient'][key]) == str
+		assert struct_graph['patient'][key] == value
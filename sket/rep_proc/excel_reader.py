@@ -0,0 +1,270 @@
+import os
+import hashlib
+import datetime
+import importlib.util
+import pandas as pd
+
+from collections import namedtuple
+
+
+def has_pyarrow():
+	"""
+	Check whether pyarrow (required by the ingest cache) is available
+
+	Returns: True if pyarrow is available, False otherwise
+	"""
+
+	return importlib.util.find_spec('pyarrow') is not None
+
+
+def ingest_path(fpath, sheet, header, producer, ingest_dir='./dataset/ingested/'):
+	"""
+	Get the ingest cache file path of a workbook sheet -- i.e., the hash of the workbook content plus sheet, header, and producer
+
+	Params:
+		fpath (str): workbook file path
+		sheet (str/int): name or index of the sheet to use
+		header (int): row index used as header
+		producer (str): parser that produced the cached sheet (e.g., 'pandas' or 'openpyxl') -- parsers can infer different dtypes, so their sheets are cached apart
+		ingest_dir (str): ingest cache directory
+
+	Returns: the Feather file path
+	"""
+
+	digest = hashlib.md5()
+	with open(fpath, 'rb') as f:
+		for block in iter(lambda: f.read(1 << 20), b''):  # hash workbook in blocks
+			digest.update(block)
+	key = digest.hexdigest() + '|' + str(sheet) + '|' + str(header) + '|' + producer
+	return ingest_dir + hashlib.md5(key.encode('utf-8')).hexdigest() + '.feather'
+
+
+def read_ingested(path):
+	"""
+	Read cached workbook sheet w/ memory mapping
+
+	Params:
+		path (str): Feather file path
+
+	Returns: the cached sheet as pandas DataFrame -- None if not cached
+	"""
+
+	if not os.path.isfile(path):  # sheet not cached
+		return None
+	import pyarrow.feather as feather  # imported only when needed
+	return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def write_ingested(dataset, path):
+	"""
+	Cache workbook sheet as Feather file -- sheets that Arrow cannot represent (e.g., columns mixing numbers and strings) are not cached
+
+	Params:
+		dataset (pandas DataFrame): the parsed sheet
+		path (str): Feather file path
+
+	Returns: True if the sheet has been cached, False otherwise
+	"""
+
+	import pyarrow.feather as feather  # imported only when needed
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	try:  # write to a temporary file and move it in place -- interrupted runs never leave partial files
+		feather.write_feather(dataset, path + '.tmp')
+	except Exception as e:
+		print('unable to cache sheet as Feather file: {}'.format(e))
+		if os.path.isfile(path + '.tmp'):
+			os.remove(path + '.tmp')
+		return False
+	os.replace(path + '.tmp', path)
+	return True
+
+
+def is_empty(value):
+	"""
+	Check whether a streamed value comes from an empty cell -- i.e., NaN
+
+	Params:
+		value (any): streamed value
+
+	Returns: True if value is NaN, False otherwise
+	"""
+
+	return type(value) == float and value != value
+
+
+def scan_columns(fpath, sheet=0, header=0):
+	"""
+	Scan a xlsx sheet to get the kind of each column -- streamed values are then converted as pandas.read_excel converts column dtypes
+
+	Params:
+		fpath (str): xlsx file path
+		sheet (str/int): name or index of the sheet to use
+		header (int): row index used as header
+
+	Returns: a list containing, for each column, 'float' (numbers w/ empty cells or fractional numbers -- i.e., float64 columns), 'datetime' (dates w/ or w/o empty cells -- i.e., datetime64 columns), or None (values kept as they are)
+	"""
+
+	rows = iter_xlsx(fpath, sheet, header)
+	columns = next(rows)
+	# keep track of the kinds of values found within each column
+	numbers, dates, gaps, fractions = [True] * len(columns), [True] * len(columns), [False] * len(columns), [False] * len(columns)
+	last = -1
+	for ix, values in rows:
+		if ix > last + 1:  # rows w/ all empty cells have been skipped -- pandas sets their cells to NaN before dropping them
+			gaps = [True] * len(columns)
+		last = ix
+		for cix, value in enumerate(values):
+			if is_empty(value):  # empty cell
+				gaps[cix] = True
+				continue
+			numbers[cix] = numbers[cix] and type(value) in [int, float]
+			dates[cix] = dates[cix] and isinstance(value, datetime.datetime)
+			fractions[cix] = fractions[cix] or type(value) == float
+	kinds = []
+	for cix in range(len(columns)):
+		if numbers[cix] and (gaps[cix] or fractions[cix]):  # int columns w/ empty cells become float columns
+			kinds.append('float')
+		elif dates[cix] and not numbers[cix]:  # datetime columns w/ empty cells contain NaT
+			kinds.append('datetime')
+		else:  # int, text, and mixed columns
+			kinds.append(None)
+	return kinds
+
+
+def convert_values(values, kinds):
+	"""
+	Convert streamed values based on column kinds -- as pandas.read_excel does
+
+	Params:
+		values (list): row values
+		kinds (list(str)): column kinds -- as returned by scan_columns
+
+	Returns: the converted row values
+	"""
+
+	converted = []
+	for value, kind in zip(values, kinds):
+		if kind == 'float':  # float64 column
+			value = float(value)
+		elif kind == 'datetime':  # datetime64 column
+			value = pd.NaT if is_empty(value) else pd.Timestamp(value)
+		converted.append(value)
+	return converted
+
+
+def iter_xlsx(fpath, sheet=0, header=0):
+	"""
+	Stream the rows of a xlsx sheet w/ openpyxl read-only mode -- rows are read one at a time and the workbook is never fully loaded
+
+	Params:
+		fpath (str): xlsx file path
+		sheet (str/int): name or index of the sheet to use
+		header (int): row index used as header
+
+	Returns: a generator yielding the header (list of column names) first and then (row index, row values) pairs -- rows w/ all empty cells are skipped, empty cells are set to NaN, and integral floats are set to int (as in pandas.read_excel)
+	"""
+
+	import openpyxl  # imported only when needed
+
+	header = int(header)
+	wb = openpyxl.load_workbook(fpath, read_only=True, data_only=True)
+	try:
+		if type(sheet) == int:  # sheet passed as index
+			ws = wb.worksheets[sheet]
+		else:  # sheet passed as name
+			ws = wb[sheet]
+		rows = ws.iter_rows(values_only=True)
+
+		columns = None
+		for ix, row in enumerate(rows):
+			if ix < header:  # skip rows before header
+				continue
+			if columns is None:  # set column names -- unnamed and duplicated columns are renamed as in pandas.read_excel
+				columns = []
+				for cix, column in enumerate(row):
+					column = 'Unnamed: ' + str(cix) if column is None else column
+					if column in columns:  # duplicated column
+						dups = 1
+						while str(column) + '.' + str(dups) in columns:
+							dups += 1
+						column = str(column) + '.' + str(dups)
+					columns.append(column)
+				yield columns
+				continue
+			if all(value is None for value in row):  # remove rows w/ na
+				continue
+			# pad (or trim) row to header length and set empty cells to NaN
+			values = [float('nan') if value is None else int(value) if type(value) == float and value.is_integer() else value for value in row[:len(columns)]]
+			values += [float('nan')] * (len(columns) - len(values))
+			yield ix - header - 1, values
+		if columns is None:  # empty sheet
+			yield []
+	finally:  # read-only workbooks keep the file open until closed
+		wb.close()
+
+
+class ExcelDataset(object):
+
+	def __init__(self, fpath, sheet=0, header=0):
+		"""
+		Set a xlsx sheet read lazily -- it exposes the subset of the pandas DataFrame interface used to process reports (i.e., itertuples)
+
+		Params:
+			fpath (str): xlsx file path
+			sheet (str/int): name or index of the sheet to use
+			header (int): row index used as header
+
+		Returns: None
+		"""
+
+		self.fpath = fpath
+		self.sheet = sheet
+		self.header = header
+		# set the (lazily scanned) column kinds
+		self.kinds = None
+
+	@property
+	def columns(self):
+		"""
+		Get the column names of the sheet
+
+		Returns: the list of column names
+		"""
+
+		rows = iter_xlsx(self.fpath, self.sheet, self.header)
+		columns = next(rows)
+		rows.close()
+		return columns
+
+	def itertuples(self, index=True, name='Pandas'):
+		"""
+		Stream rows as namedtuples -- field names (and renaming of invalid identifiers) and values match pandas.DataFrame.itertuples over pandas.read_excel:
+		int columns w/ empty cells yield floats and datetime columns yield Timestamps (NaT for empty cells) -- columns are scanned once before streaming rows
+
+		Params:
+			index (bool): whether to return the row index as the first field
+			name (str): namedtuple name
+
+		Returns: a generator over rows
+		"""
+
+		if self.kinds is None:  # scan columns -- memory depends on the number of columns, not on the sheet size
+			self.kinds = scan_columns(self.fpath, self.sheet, self.header)
+		rows = iter_xlsx(self.fpath, self.sheet, self.header)
+		columns = next(rows)
+		fields = (['Index'] if index else []) + [str(column) for column in columns]
+		row_tuple = namedtuple(name, fields, rename=True)
+		for ix, values in rows:
+			values = convert_values(values, self.kinds)
+			yield row_tuple(*([ix] + values if index else values))
+
+	def to_frame(self):
+		"""
+		Read the sheet into a pandas DataFrame -- rows are streamed w/ openpyxl read-only mode and column dtypes are inferred by pandas
+
+		Returns: the sheet as pandas DataFrame
+		"""
+
+		rows = iter_xlsx(self.fpath, self.sheet, self.header)
+		columns = next(rows)
+		return pd.DataFrame([values for _, values in rows], columns=columns)
@@ -4,14 +4,15 @@ import string
 import re
 import json
 import uuid
-import copy
 import roman
+import threading
 
 from tqdm import tqdm
 from copy import deepcopy
 from collections import defaultdict
-from transformers import MarianMTModel, MarianTokenizer
 
+from . import excel_reader
+from .excel_reader import ExcelDataset
 from ..utils import utils
 
 
@@ -36,14 +37,11 @@ class ReportProc(object):
 		else:  # no report fields file provided
 			self.fields = utils.read_report_fields('./sket/rep_proc/rules/report_fields.txt')
 
-		if src_lang != 'en':  # set NMT model
-			self.nmt_name = 'Helsinki-NLP/opus-mt-' + src_lang + '-en'
-			self.tokenizer = MarianTokenizer.from_pretrained(self.nmt_name)
-			self.nmt = MarianMTModel.from_pretrained(self.nmt_name)
-		else:  # no NMT model required
-			self.nmt_name = None
-			self.tokenizer = None
-			self.nmt = None
+		# set lock and cache for NMT models -- one (tokenizer, model) pair per source language, loaded once and never modified
+		self.nmt_lock = threading.Lock()
+		self.translators = dict()
+		# set NMT model (if required)
+		self.update_nmt(src_lang)
 
 		# build regex for bullet patterns
 		self.en_roman_regex = re.compile('((?<=(^i-ii(\s|:|\.)))|(?<=(^i-iii(\s|:|\.)))|(?<=(^ii-iii(\s|:|\.)))|(?<=(^i-iv(\s|:|\.)))|(?<=(^ii-iv(\s|:|\.)))|(?<=(^iii-iv(\s|:|\.)))|(?<=(^i and ii(\s|:|\.)))|(?<=(^i and iii(\s|:|\.)))|(?<=(^ii and iii(\s|:|\.)))|(?<=(^i and iv(\s|:|\.)))|(?<=(^ii and iv(\s|:|\.)))|(?<=(^iii and iv(\s|:|\.)))|(?<=(^i(\s|:|\.)))|(?<=(^ii(\s|:|\.)))|(?<=(^iii(\s|:|\.)))|(?<=(^iv(\s|:|\.)))|(?<=(\si-ii(\s|:|\.)))|(?<=(\si-iii(\s|:|\.)))|(?<=(\sii-iii(\s|:|\.)))|(?<=(\si-iv(\s|:|\.)))|(?<=(\sii-iv(\s|:|\.)))|(?<=(\siii-iv(\s|:|\.)))|(?<=(\si and ii(\s|:|\.)))|(?<=(\si and iii(\s|:|\.)))|(?<=(\sii and iii(\s|:|\.)))|(?<=(\si and iv(\s|:|\.)))|(?<=(\sii and iv(\s|:|\.)))|(?<=(\siii and iv(\s|:|\.)))|(?<=(\si(\s|:|\.)))|(?<=(\sii(\s|:|\.)))|(?<=(\siii(\s|:|\.)))|(?<=(\siv(\s|:|\.))))(.*?)((?=(\si+(\s|:|\.|-)))|(?=(\siv(\s|:|\.|-)))|(?=($)))')
@@ -75,15 +73,34 @@ class ReportProc(object):
 		Returns: None
 		"""
 
+		self.src_lang = src_lang
 		if src_lang != 'en':  # update NMT model
 			self.nmt_name = 'Helsinki-NLP/opus-mt-' + src_lang + '-en'
-			self.tokenizer = MarianTokenizer.from_pretrained(self.nmt_name)
-			self.nmt = MarianMTModel.from_pretrained(self.nmt_name)
+			self.tokenizer, self.nmt = self.get_translator(src_lang)
 		else:  # no NMT model required
 			self.nmt_name = None
 			self.tokenizer = None
 			self.nmt = None
 
+	def get_translator(self, src_lang):
+		"""
+		Get (and cache) the NMT model for the given source language
+
+		Params:
+			src_lang (str): considered source language
+
+		Returns: the (tokenizer, model) pair used to translate from src_lang to English or None when src_lang == 'en'
+		"""
+
+		if src_lang == 'en':  # no NMT model required
+			return None
+		with self.nmt_lock:
+			if src_lang not in self.translators:  # load NMT model -- import transformers only when translation is required
+				from transformers import MarianMTModel, MarianTokenizer
+				nmt_name = 'Helsinki-NLP/opus-mt-' + src_lang + '-en'
+				self.translators[src_lang] = (MarianTokenizer.from_pretrained(nmt_name), MarianMTModel.from_pretrained(nmt_name))
+			return self.translators[src_lang]
+
 	def update_report_fields(self, fields_path):
 		"""
 		Update report fields changing current ones
@@ -98,7 +115,7 @@ class ReportProc(object):
 
 	def load_dataset(self, reports_path, sheet, header): 
 		"""
-		Load reports dataset
+		Load reports dataset -- when pyarrow is available, the parsed sheet is cached once as Feather file keyed by the workbook content hash and read back w/ memory mapping on later runs
 
 		Params:
 			reports_path (str): reports.xlsx fpath
@@ -108,32 +125,91 @@ class ReportProc(object):
 		Returns: the loaded dataset
 		"""
 
-		if reports_path.split('.')[-1] == 'xlsx':  # requires openpyxl engine
-			dataset = pd.read_excel(io=reports_path, sheet_name=sheet, header=header, engine='openpyxl')
-		else:
-			dataset = pd.read_excel(io=reports_path, sheet_name=sheet, header=header)
+		# get ingest cache file path
+		ingested = excel_reader.ingest_path(reports_path, sheet, header, 'pandas') if excel_reader.has_pyarrow() else None
+		dataset = excel_reader.read_ingested(ingested) if ingested else None
+		if dataset is None:  # parse workbook
+			if reports_path.split('.')[-1] == 'xlsx':  # requires openpyxl engine
+				dataset = pd.read_excel(io=reports_path, sheet_name=sheet, header=header, engine='openpyxl')
+			else:
+				dataset = pd.read_excel(io=reports_path, sheet_name=sheet, header=header)
+			if ingested:  # cache parsed sheet
+				excel_reader.write_ingested(dataset, ingested)
 		# remove rows w/ na
 		dataset.dropna(axis=0, how='all', inplace=True)
 
 		return dataset
 
-	def translate_text(self, text):
+	def stream_dataset(self, reports_path, sheet, header):
+		"""
+		Load reports dataset lazily -- xlsx sheets are read row by row w/ openpyxl read-only mode, while xls sheets fall back to load_dataset.
+		When pyarrow is available, xlsx sheets are converted once into Feather files keyed by the workbook content hash and read back w/ memory mapping on later runs
+
+		Params:
+			reports_path (str): reports.xlsx fpath
+			sheet (str): name of the excel sheet to use
+			header (int): row index used as header
+
+		Returns: the dataset -- rows are read when iterating over dataset.itertuples() unless the sheet is cached
+		"""
+
+		if reports_path.split('.')[-1] != 'xlsx':  # xls files are not supported by openpyxl
+			return self.load_dataset(reports_path, sheet, header)
+		if not excel_reader.has_pyarrow():  # stream rows
+			return ExcelDataset(reports_path, sheet, header)
+
+		# get ingest cache file path
+		ingested = excel_reader.ingest_path(reports_path, sheet, header, 'openpyxl')
+		dataset = excel_reader.read_ingested(ingested)
+		if dataset is None:  # convert sheet once -- rows are read w/ openpyxl read-only mode
+			dataset = ExcelDataset(reports_path, sheet, header).to_frame()
+			excel_reader.write_ingested(dataset, ingested)
+		# remove rows w/ na
+		dataset.dropna(axis=0, how='all', inplace=True)
+		return dataset
+
+	def translate_text(self, text, translator=None):
 		"""
 		Translate text from source to destination -- text is lower-cased before and after translation
 
 		Params:
 			text (str): target text
+			translator (tuple): (tokenizer, model) pair used for translation -- if None, use the current NMT model
 
 		Returns: translated text
 		"""
 
+		tokenizer, nmt = translator if translator else (self.tokenizer, self.nmt)
 		if type(text) == str:
-			trans_text = self.nmt.generate(**self.tokenizer(text.lower(), return_tensors="pt", padding=True))[0]
-			trans_text = self.tokenizer.decode(trans_text, skip_special_tokens=True)
+			trans_text = nmt.generate(**tokenizer(text.lower(), return_tensors="pt", padding=True))[0]
+			trans_text = tokenizer.decode(trans_text, skip_special_tokens=True)
 		else:
 			trans_text = ''
 		return trans_text.lower()
 
+	def translate_batch_text(self, texts, translator=None, batch_size=16):
+		"""
+		Translate texts from source to destination in batches -- texts are lower-cased before and after translation
+
+		Params:
+			texts (list(str)): target texts
+			translator (tuple): (tokenizer, model) pair used for translation -- if None, use the current NMT model
+			batch_size (int): number of texts translated at once
+
+		Returns: translated texts
+		"""
+
+		tokenizer, nmt = translator if translator else (self.tokenizer, self.nmt)
+		trans_texts = [''] * len(texts)
+		# translate only str texts -- the others are mapped to empty strings as in self.translate_text()
+		ixs = [ix for ix, text in enumerate(texts) if type(text) == str]
+		for i in tqdm(range(0, len(ixs), batch_size)):
+			batch_ixs = ixs[i:i+batch_size]
+			outputs = nmt.generate(**tokenizer([texts[ix].lower() for ix in batch_ixs], return_tensors="pt", padding=True))
+			for ix, output in zip(batch_ixs, outputs):
+				trans_texts[ix] = tokenizer.decode(output, skip_special_tokens=True).lower()
+		return trans_texts
+
 	# AOEC SPECIFIC FUNCTIONS
 
 	def aoec_process_data(self, dataset):
@@ -244,22 +320,25 @@ class ReportProc(object):
 
 		return reports
 
-	def aoec_translate_reports(self, reports):
+	def aoec_translate_reports(self, reports, translator=None):
 		"""
 		Translate processed reports
 
 		Params:
 			reports (dict): processed reports
+			translator (tuple): (tokenizer, model) pair used for translation -- if None, use the current NMT model
 
 		Returns: translated reports
 		"""
 
-		trans_reports = copy.deepcopy(reports)
+		trans_reports = dict()
 		print('translate text')
-		# translate text
-		for rid, report in tqdm(trans_reports.items()):
-			trans_reports[rid]['diagnosis_nlp'] = self.translate_text(report['diagnosis_nlp'])
-			trans_reports[rid]['materials'] = self.translate_text(report['materials'])
+		# translate text -- translated reports share untranslated fields w/ processed reports
+		for rid, report in tqdm(reports.items()):
+			trans_reports[rid] = dict(
+				report,
+				diagnosis_nlp=self.translate_text(report['diagnosis_nlp'], translator),
+				materials=self.translate_text(report['materials'], translator))
 		return trans_reports
 
 	# RADBOUD SPECIFIC FUNCTIONS
@@ -295,18 +374,22 @@ class ReportProc(object):
 			sections['whole'] = conclusions
 			return sections
 
-	def radboud_process_data(self, dataset, debug=False):
+	def radboud_process_data(self, dataset, debug=False, use_case=None):
 		"""
 		Read Radboud reports and extract the required fields
 
 		Params:
 			dataset (pandas DataFrame): target dataset
 			debug (bool): whether to keep flags for debugging
+			use_case (str): considered use case -- if None, use the current use case
 
 
 		Returns: a dict containing the required report fields
 		"""
 
+		if not use_case:  # use the current use case
+			use_case = self.use_case
+
 		proc_reports = dict()
 		skipped_reports = []
 		unsplitted_reports = 0
@@ -318,7 +401,7 @@ class ReportProc(object):
 				# deepcopy rdata to avoid removing elements from input reports
 				raw_conclusions = report.Conclusion
 				# split conclusions into sections
-				conclusions = self.radboud_split_conclusions(utils.nl_sanitize_record(raw_conclusions.lower(), self.use_case))
+				conclusions = self.radboud_split_conclusions(utils.nl_sanitize_record(raw_conclusions.lower(), use_case))
 				pid = '_'.join(rid.split('_')[:-1])  # remove block and slide ids from report id - keep patient id
 				related_ids = [rel_id for rel_id in report_conc_keys.keys() if pid in rel_id]  # get all the ids related to the current patient
 				# get block ids from related_ids
@@ -487,16 +570,20 @@ class ReportProc(object):
 			print(skipped_reports)
 		return proc_reports
 
-	def radboud_process_data_v2(self, dataset):
+	def radboud_process_data_v2(self, dataset, use_case=None):
 		"""
 		Read Radboud reports and extract the required fields (v2 used for anonymized datasets)
 
 		Params:
 			dataset (pandas DataFrame): target dataset
+			use_case (str): considered use case -- if None, use the current use case
 
 		Returns: a dict containing the required report fields
 		"""
 
+		if not use_case:  # use the current use case
+			use_case = self.use_case
+
 		proc_reports = dict()
 		for report in tqdm(dataset.itertuples()):
 			if 'Microscopy' in report._fields:  # first batch of Radboud reports
@@ -505,7 +592,7 @@ class ReportProc(object):
 				rid = str(report._3).strip() + '_A'  # '_A' stands for anonymized report
 			if report.Conclusion:  # split conclusions and associate to each block the corresponding conclusion
 				# split conclusions into sections
-				conclusions = self.radboud_split_conclusions(utils.nl_sanitize_record(report.Conclusion.lower(), self.use_case))
+				conclusions = self.radboud_split_conclusions(utils.nl_sanitize_record(report.Conclusion.lower(), use_case))
 
 				if 'whole' in conclusions:  # unable to split conclusions - either single conclusion or not appropriately specified
 					# create block id
@@ -527,21 +614,22 @@ class ReportProc(object):
 						proc_reports[bid]['diagnosis'] = conclusions[cid]
 		return proc_reports
 
-	def radboud_translate_reports(self, reports):
+	def radboud_translate_reports(self, reports, translator=None):
 		"""
 		Translate processed reports
 
 		Params:
 			reports (dict): processed reports
+			translator (tuple): (tokenizer, model) pair used for translation -- if None, use the current NMT model
 
 		Returns: translated reports
 		"""
 
-		trans_reports = copy.deepcopy(reports)
+		trans_reports = dict()
 		print('translate text')
-		# translate text
-		for rid, report in tqdm(trans_reports.items()):
-			trans_reports[rid]['diagnosis'] = self.translate_text(report['diagnosis'])
+		# translate text -- translated reports share untranslated fields w/ processed reports
+		for rid, report in tqdm(reports.items()):
+			trans_reports[rid] = dict(report, diagnosis=self.translate_text(report['diagnosis'], translator))
 		return trans_reports
 
 	# GENERAL-PURPOSE FUNCTIONS
@@ -556,14 +644,8 @@ class ReportProc(object):
 		Returns: a list containing dataset report(s)
 		"""
 
-		if dataset.split('.')[-1] == 'xlsx':  # read input file as xlsx object
-			ds = pd.read_excel(io=dataset, header=0, engine='openpyxl')
-		else:  # read input file as xls object
-			ds = pd.read_excel(io=dataset, header=0)
-
-		reports = []
-		for report in tqdm(ds.itertuples(index=False)):  # convert raw dataset into list containing report(s)
-			reports.append({field: report[ix] for ix, field in enumerate(report._fields)})
+		# convert raw dataset into list containing report(s)
+		reports = list(tqdm(self.iter_xls_reports(dataset)))
 		# return report(s)
 		return reports
 
@@ -604,24 +686,118 @@ class ReportProc(object):
 		# return report(s)
 		return reports
 
-	def process_data(self, dataset, debug=False):
+	def iter_xls_reports(self, dataset):
+		"""
+		Stream reports from xls file
+
+		Params:
+			dataset (str): target dataset
+
+		Returns: a generator over dataset report(s)
+		"""
+
+		if dataset.split('.')[-1] == 'xlsx':  # stream rows w/ openpyxl read-only mode
+			ds = ExcelDataset(dataset)
+		else:  # read input file as xls object
+			ds = pd.read_excel(io=dataset, header=0)
+
+		for report in ds.itertuples(index=False):  # convert rows into reports one at a time
+			yield dict(zip(report._fields, report))
+
+	def iter_reports(self, source):
+		"""
+		Stream reports from source -- JSON, JSON Lines (one report per line), xls, or xlsx file, stream dict, or iterable of reports
+
+		Params:
+			source (str/dict/iterable(dict)): target source
+
+		Returns: a generator over source report(s)
+		"""
+
+		if type(source) == str:  # source passed as input file
+			ext = source.split('.')[-1]
+			if ext == 'json':  # read input file as JSON object
+				reports = self.read_json_reports(source)
+			elif ext == 'jsonl':  # read input file one report at a time
+				reports = utils.iter_jsonl(source)
+			elif ext == 'xlsx' or ext == 'xls':  # read input file as xlsx or xls object
+				reports = self.iter_xls_reports(source)
+			else:  # raise exception
+				print('Format required for input: JSON, JSONL, xls, or xlsx.')
+				raise Exception
+		elif type(source) == dict:  # source passed as stream dict
+			reports = self.read_stream_reports(source)
+		else:  # source passed as iterable of reports
+			reports = source
+
+		for report in reports:
+			yield report
+
+	def process_report(self, report, fields=None):
+		"""
+		Extract the required fields from report
+
+		Params:
+			report (dict): target report
+			fields (tuple): report fields to consider -- if None, use the current report fields
+
+		Returns: the report id and the processed report
+		"""
+
+		if fields is None:  # use the current report fields
+			fields = self.fields
+
+		# shallow copy report to avoid removing elements from input reports
+		report = dict(report)
+		if 'id' in report:
+			rid = report.pop('id')  # use provided id
+		else:
+			rid = str(uuid.uuid4())  # generate uuid
+
+		if 'age' in report:  # get age from report
+			age = report.pop('age')
+		else:  # set age to None
+			age = None
+
+		if 'gender' in report:  # get gender from report
+			gender = report.pop('gender')
+		else:  # set gender to None
+			gender = None
+
+		if fields:  # report fields specified -- restrict to fields
+			rfields = [field for field in report.keys() if field in fields]
+		else:  # report fields not specified -- keep report fields
+			rfields = [field for field in report.keys()]
+		report_fields = [report[field] if report[field].endswith('.') else report[field] + '.' for field in rfields]
+		text = ' '.join(report_fields)
+
+		# return processed report
+		return rid, {'text': text, 'age': age, 'gender': gender}
+
+	def process_data(self, dataset, debug=False, fields=None):
 		"""
 		Read reports and extract the required fields
 
 		Params:
 			dataset (dict): target dataset
 			debug (bool): whether to keep flags for debugging
+			fields (tuple): report fields to consider -- if None, use the current report fields
 
 		Returns: a dict containing the required report fields
 		"""
 
+		if fields is None:  # use the current report fields
+			fields = self.fields
+
 		if type(dataset) == str:  # dataset passed as input file
 			if dataset.split('.')[-1] == 'json':  # read input file as JSON object
 				reports = self.read_json_reports(dataset)
+			elif dataset.split('.')[-1] == 'jsonl':  # read input file as JSON Lines -- one report per line
+				reports = utils.iter_jsonl(dataset)
 			elif dataset.split('.')[-1] == 'xlsx' or dataset.split('.')[-1] == 'xls':  # read input file as xlsx or xls object
 				reports = self.read_xls_reports(dataset)
 			else:  # raise exception
-				print('Format required for input: JSON, xls, or xlsx.')
+				print('Format required for input: JSON, JSONL, xls, or xlsx.')
 				raise Exception
 		else:  # dataset passed as stream dict
 			reports = self.read_stream_reports(dataset)
@@ -629,45 +805,26 @@ class ReportProc(object):
 		proc_reports = {}
 		# process reports and concat fields
 		for report in reports:
-			if 'id' in report:
-				rid = report.pop('id')  # use provided id
-			else:
-				rid = str(uuid.uuid4())  # generate uuid
-
-			if 'age' in report:  # get age from report
-				age = report.pop('age')
-			else:  # set age to None
-				age = None
-
-			if 'gender' in report:  # get gender from report
-				gender = report.pop('gender')
-			else:  # set gender to None
-				gender = None
-
-			if self.fields:  # report fields specified -- restrict to self.fields
-				fields = [field for field in report.keys() if field in self.fields]
-			else:  # report fields not specified -- keep report fields
-				fields = [field for field in report.keys()]
-			report_fields = [report[field] if report[field].endswith('.') else report[field] + '.' for field in fields]
-			text = ' '.join(report_fields)
-
-			# prepare processed report
-			proc_reports[rid] = {'text': text, 'age': age, 'gender': gender}
+			rid, proc_report = self.process_report(report, fields)
+			proc_reports[rid] = proc_report
 		return proc_reports
 
-	def translate_reports(self, reports):
+	def translate_reports(self, reports, translator=None, batch_size=None):
 		"""
 		Translate reports
 
 		Params:
 			reports (dict): reports
+			translator (tuple): (tokenizer, model) pair used for translation -- if None, use the current NMT model
+			batch_size (int): number of reports translated at once -- if None, translate one report at a time
 
 		Returns: translated reports
 		"""
 
-		trans_reports = copy.deepcopy(reports)
 		print('translate text')
-		# translate text
-		for rid, report in tqdm(trans_reports.items()):
-			trans_reports[rid]['text'] = self.translate_text(report['text'])
-		return trans_reports
+		if batch_size:  # translate text in batches
+			trans_texts = self.translate_batch_text([report['text'] for report in reports.values()], translator, batch_size)
+		else:  # translate text one report at a time
+			trans_texts = (self.translate_text(report['text'], translator) for report in tqdm(reports.values()))
+		# translated reports share untranslated fields w/ processed reports
+		return {rid: dict(report, text=trans_text) for (rid, report), trans_text in zip(reports.items(), trans_texts)}
@@ -0,0 +1,22 @@
+import datetime
+import openpyxl
+import pandas as pd
+
+from sket.rep_proc.excel_reader import ExcelDataset
+
+
+def test_excel_dataset_matches_read_excel(tmp_path):
+	fpath = str(tmp_path / 'gaps.xlsx')
+	wb = openpyxl.Workbook()
+	ws = wb.active
+	ws.append(['id', 'num', 'date', 'text', 'mixed', 'flt'])
+	ws.append([1, 10, datetime.datetime(2020, 1, 1), 'a', 1, 1.5])
+	ws.append([2, None, None, None, 'x', 2.0])
+	ws.append([None, None, None, None, None, None])
+	ws.append([3, 30, datetime.datetime(2020, 1, 3), 'c', None, 3.25])
+	wb.save(fpath)
+	# streamed rows match pandas rows -- values, types, and empty cells (NaN/NaT)
+	expected = [tuple(row) for row in pd.read_excel(fpath).dropna(axis=0, how='all').itertuples(index=False)]
+	streamed = [tuple(row) for row in ExcelDataset(fpath).itertuples(index=False)]
+	assert [[type(value) for value in row] for row in streamed] == [[type(value) for value in row] for row in expected]
+	assert [[str(value) for value in row] for row in streamed] == [[str(value) for value in row] for row in expected]
@@ -1,13 +1,24 @@
 import os
+import copy
+import hashlib
+import time
 import uuid
-import json
+import threading
 
+from collections import namedtuple
 from .rep_proc.report_processing import ReportProc
 from .ont_proc.ontology_processing import OntoProc
 from .nerd.nerd import NERD
+from .nerd.router import UseCaseRouter
 from .rdf_proc.rdf_processing import RDFProc
 
 from .utils import utils
+from .utils.results_db import ResultsDB
+from .utils.report_cache import ReportCache
+
+
+# immutable (use case, language, fields) context used by a pipeline run -- neither reloads nor concurrent runs affect it
+PipelineContext = namedtuple('PipelineContext', ['use_case', 'knowledge', 'onto_proc', 'onto', 'onto_terms', 'src_lang', 'translator', 'fields'])
 
 
 class SKET(object):
@@ -17,7 +28,8 @@ class SKET(object):
             use_case, src_lang,
             biospacy="en_core_sci_sm", biow2v=True, biofast=None, biobert=None, str_match=False, gpu=None, rules=None, dysplasia_mappings=None, cin_mappings=None,
             ontology_path=None, hierarchies_path=None,
-            fields_path=None
+            fields_path=None,
+            pretty_json=False, results_db=None, report_cache=None, sentence_cache=None, whole_doc=False
     ):
         """
         Load SKET components
@@ -36,17 +48,36 @@ class SKET(object):
                 rules (str): hand-crafted rules file path
                 dysplasia_mappings (str): dysplasia mappings file path
                 cin_mappings (str): cin mappings file path
+                sentence_cache (int): max number of sentences cached for each use case -- if None, reports are processed as whole documents
+                whole_doc (bool): whether to process reports as whole documents even when the sentence cache is enabled -- e.g., for rules crossing sentence boundaries
             OntoProc:
                 ontology_path (str): ontology.owl file path
                 hierarchies_path (str): hierarchy relations file path
             ReportProc:
                 fields_path (str): report fields file path
+            Outputs:
+                pretty_json (bool): whether to store reports, concepts, labels, and JSON graphs as pretty-printed JSON instead of JSON Lines
+                results_db (str): SQLite database file path used to store reports, concepts, labels, and provenance -- if None, no database is used
+                report_cache (str): SQLite file path used to cache per-report translations, concepts, labels, and graph fragments -- if None, no cache is used
 
         Returns: None
         """
 
+        # set the extension of JSON outputs -- JSON Lines (one compact record per report) unless pretty-printed JSON is requested
+        self.json_ext = '.json' if pretty_json else '.jsonl'
+        # set the (optional) results database
+        self.results_db = ResultsDB(results_db) if results_db else None
+        # set the (optional) report cache -- reports already annotated w/ the same configuration skip translation and NERD
+        self.report_cache = ReportCache(report_cache) if report_cache else None
+        # cache knowledge source hashes for each (file path, modification time)
+        self.hashes = dict()
+
         # load Named Entity Recognition and Disambiguation (NERD)
-        self.nerd = NERD(biospacy, biow2v, str_match, biofast, biobert, rules, dysplasia_mappings, cin_mappings, gpu)
+        self.nerd = NERD(biospacy, biow2v, str_match, biofast, biobert, rules, dysplasia_mappings, cin_mappings, gpu, sentence_cache)
+        # set whether reports are processed as whole documents -- applies to every pipeline
+        self.whole_doc = whole_doc
+        # keep track of the models used by SKET -- stored as provenance
+        self.models = self.nerd_models(biospacy, biofast, biobert, str_match)
         # load Ontology Processing (OntoProc)
         self.onto_proc = OntoProc(ontology_path, hierarchies_path)
         # load Report Processing (ReportProc)
@@ -98,6 +129,16 @@ class SKET(object):
         self.onto = self.onto_proc.restrict2use_case(use_case)
         # restrict concept preferred terms (i.e., labels) given the use case
         self.onto_terms = self.nerd.process_ontology_concepts([term.lower() for term in self.onto['label'].tolist()])
+        # cache restricted onto concepts and preferred terms for each prepared use case
+        self.use_cases = {use_case: (self.onto, self.onto_terms)}
+
+        # set lock to swap knowledge atomically and lock to serialize knowledge updates (i.e., use case changes and reloads)
+        self.lock = threading.Lock()
+        self.update_lock = threading.Lock()
+        # keep track of knowledge source files to reload only the changed ones
+        self.sources = self.get_sources()
+        # set the (lazily built) use case routers along w/ the knowledge they were built from
+        self.routers = dict()
 
     def update_nerd(
             self,
@@ -118,10 +159,32 @@ class SKET(object):
         Returns: None
         """
 
-        # update nerd model
-        self.nerd = NERD(biospacy, biofast, biobert, str_match, rules, dysplasia_mappings, cin_mappings, gpu)
+        # update nerd model -- word2vec matching, sentence cache, and normalization are carried over from the current model
+        self.nerd = NERD(
+            biospacy=biospacy, biow2v=self.nerd.biow2v, str_match=str_match, biofast=biofast, biobert=biobert,
+            rules=rules, dysplasia_mappings=dysplasia_mappings, cin_mappings=cin_mappings, gpu=gpu,
+            sentence_cache=self.nerd.sentence_cache, norm=self.nerd.norm)
         # restrict hand-crafted rules and mappings based on current use case
         self.nerd.restrict2use_case(self.use_case)
+        # update the models used by SKET -- they feed report cache keys and provenance
+        self.models = self.nerd_models(biospacy, biofast, biobert, str_match)
+
+    def nerd_models(self, biospacy, biofast, biobert, str_match):
+        """
+        Get the models (and model settings) used by NERD
+
+        Params:
+            biospacy (str): full spaCy pipeline for biomedical data
+            biofast (str): biomedical fasttext model
+            biobert (str): biomedical bert model
+            str_match (bool): string matching
+
+        Returns: a dict of {model: value}
+        """
+
+        return {
+            'biospacy': biospacy, 'biow2v': self.nerd.biow2v, 'biofast': biofast, 'biobert': biobert, 'str_match': str_match,
+            'sentences': bool(self.nerd.sentence_cache) and not self.whole_doc, 'norm': self.nerd.norm}
 
     def update_usecase(self, use_case):
         """
@@ -133,19 +196,168 @@ class SKET(object):
         Returns: None
         """
 
+        # get restricted onto concepts and preferred terms for the given use case
+        onto, onto_terms = self.prepare_use_case(use_case)
+        with self.lock:
+            # set use case
+            self.use_case = use_case
+            # update report processing
+            self.rep_proc.update_usecase(self.use_case)
+            # restrict hand-crafted rules and mappings based on use case
+            self.nerd.restrict2use_case(use_case)
+            # set restricted onto concepts and preferred terms
+            self.onto, self.onto_terms = onto, onto_terms
+
+    def prepare_use_case(self, use_case):
+        """
+        Restrict onto concepts and preferred terms to the given use case -- results are cached and reused by subsequent calls
+
+        Params:
+            use_case (str): considered use case
+
+        Returns: the restricted onto concepts and the processed preferred terms
+        """
+
         if use_case not in ['colon', 'cervix', 'lung']:  # raise exception
             print('current supported use cases are: "colon", "cervix", and "lung"')
             raise Exception
-        # set use case
-        self.use_case = use_case
-        # update report processing
-        self.rep_proc.update_usecase(self.use_case)
-        # restrict hand-crafted rules and mappings based on use case
-        self.nerd.restrict2use_case(use_case)
-        # restrict onto concepts to the given use case
-        self.onto = self.onto_proc.restrict2use_case(use_case)
-        # restrict concept preferred terms (i.e., labels) given the use case
-        self.onto_terms = self.nerd.process_ontology_concepts([term.lower() for term in self.onto['label'].tolist()])
+        use_cases = self.use_cases
+        if use_case in use_cases:  # use case already prepared -- avoid waiting for ongoing updates
+            return use_cases[use_case]
+        with self.update_lock:
+            if use_case not in self.use_cases:  # use case not prepared yet
+                # restrict onto concepts to the given use case
+                onto = self.onto_proc.restrict2use_case(use_case)
+                # restrict concept preferred terms (i.e., labels) given the use case
+                onto_terms = self.nerd.process_ontology_concepts([term.lower() for term in onto['label'].tolist()])
+                # replace cache instead of updating it -- concurrent readers keep a consistent view
+                use_cases = dict(self.use_cases)
+                use_cases[use_case] = (onto, onto_terms)
+                with self.lock:
+                    self.use_cases = use_cases
+            return self.use_cases[use_case]
+
+    def get_router(self, use_cases=None, min_ratio=0.5):
+        """
+        Get the use case router built from rule triggers, dysplasia/cin mappings, and ontology labels -- the router is rebuilt when knowledge is reloaded
+
+        Params:
+            use_cases (list(str)): considered use cases -- if None, consider all the supported use cases
+            min_ratio (float): route reports to the use cases scoring at least min_ratio times the top score
+
+        Returns: the UseCaseRouter
+        """
+
+        if not use_cases:  # consider all the supported use cases
+            use_cases = ['colon', 'cervix', 'lung']
+        contexts = [self.get_context(use_case) for use_case in use_cases]
+        # the router depends on the spaCy model and on the knowledge and ontology of each use case
+        sources = [self.nerd.nlp] + [source for context in contexts for source in (context.knowledge, context.onto)]
+
+        def build():
+            vocabularies = dict()
+            for context in contexts:
+                # rule triggers, dysplasia triggers, and ontology labels of the use case
+                vocabularies[context.use_case] = list(context.knowledge['rules'].keys()) + list(context.knowledge['dysplasia'].keys()) + context.onto['label'].tolist()
+                if context.use_case == 'cervix':  # cin mappings are used by cervix linking only
+                    vocabularies[context.use_case] += list(context.knowledge['cin'].keys())
+            return UseCaseRouter(self.nerd.nlp, vocabularies, min_ratio)
+
+        return self.cached_router((tuple(use_cases), min_ratio), sources, build)
+
+    def cached_router(self, key, sources, build):
+        """
+        Get the router cached under key -- the router is (re)built when missing or built from sources other than the given ones
+
+        Params:
+            key (tuple): router key
+            sources (list): objects the router is built from -- compared by identity
+            build (function): function building the router
+
+        Returns: the UseCaseRouter
+        """
+
+        def is_valid(cached):
+            return cached is not None and len(cached[0]) == len(sources) and all(c_source is source for c_source, source in zip(cached[0], sources))
+
+        with self.lock:
+            cached = self.routers.get(key)
+        if is_valid(cached):  # reuse router -- avoid waiting for ongoing updates
+            return cached[1]
+        with self.update_lock:
+            cached = self.routers.get(key)
+            if not is_valid(cached):  # router missing or stale -- build it
+                cached = (sources, build())
+                # replace cache instead of updating it -- concurrent readers keep a consistent view
+                routers = dict(self.routers)
+                routers[key] = cached
+                with self.lock:
+                    self.routers = routers
+        return cached[1]
+
+    def route_reports(self, reports, use_cases=None, min_ratio=0.5):
+        """
+        Route reports to the likely use case(s) based on keyword hits -- cheap pre-classification performed before NERD
+
+        Params:
+            reports (dict): dict containing (translated) reports
+            use_cases (list(str)): candidate use cases -- if None, consider all the supported use cases
+            min_ratio (float): route reports to the use cases scoring at least min_ratio times the top score
+
+        Returns: a dict containing the routing decision {use_cases, confidence, scores, keywords} for each report
+        """
+
+        router = self.get_router(use_cases, min_ratio)
+        decisions = dict(zip(reports.keys(), router.route([report['text'] for report in reports.values()])))
+        # report routing summary
+        counts = {use_case: 0 for use_case in router.use_cases}
+        for decision in decisions.values():
+            for use_case in decision['use_cases']:
+                counts[use_case] += 1
+        unrouted = sum(1 for decision in decisions.values() if not decision['use_cases'])
+        print('routed {} reports -- {}, unrouted: {}'.format(len(decisions), ', '.join('{}: {}'.format(use_case, count) for use_case, count in counts.items()), unrouted))
+        return decisions
+
+    def prefilter_reports(self, reports, keywords=None, context=None):
+        """
+        Detect the reports w/o candidate entities -- i.e., reports containing none of the use case rule triggers, mapping triggers, and ontology labels
+
+        Params:
+            reports (dict): dict containing (processed or translated) reports
+            keywords (list(str)): keywords used in place of the use case vocabulary -- e.g., source-language keywords checked before translation
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+
+        Returns: the set of ids of the reports to skip
+        """
+
+        if not context:  # get current context
+            context = self.get_context()
+        if keywords:  # match the given keywords -- keyword routers are cached along w/ use case routers
+            router = self.cached_router(
+                ('keywords', context.use_case, tuple(keywords)), [self.nerd.nlp], lambda: UseCaseRouter(self.nerd.nlp, {context.use_case: keywords}))
+        else:  # match the use case vocabulary
+            router = self.get_router([context.use_case])
+        decisions = router.route([report['text'] for report in reports.values()])
+        skipped = set(rid for rid, decision in zip(reports.keys(), decisions) if not decision['use_cases'])
+        print('prefilter: {} reports, {} skipped w/o candidate entities'.format(len(reports), len(skipped)))
+        return skipped
+
+    def empty_concepts(self, raw=False, context=None):
+        """
+        Get the concepts assigned to reports skipped by the prefilter -- i.e., empty semantic areas
+
+        Params:
+            raw (bool): whether to return concepts within semantic areas or mentions+concepts
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+
+        Returns: empty mentions+concepts when raw == True, a dict of empty semantic areas otherwise
+        """
+
+        if raw:  # empty mentions+concepts
+            return []
+        if not context:  # get current context
+            context = self.get_context()
+        return {area: [] for area in set(context.onto['semantic_area_label'].tolist()) if area is not None}
 
     def update_nmt(self, src_lang):
         """
@@ -173,25 +385,262 @@ class SKET(object):
         # update report fields
         self.rep_proc.fields = fields
 
+    def get_context(self, use_case=None, src_lang=None, fields=None):
+        """
+        Get the immutable context for the given use case, source language, and report fields -- pipeline runs rely on it and never mutate shared state
+
+        Params:
+            use_case (str): considered use case -- if None, use the current use case
+            src_lang (str): considered source language -- if None, use the current source language
+            fields (list): report fields -- if None, use the current report fields
+
+        Returns: a PipelineContext containing use case, NERD knowledge, ontology processor, restricted ontology, processed ontology labels, source language, NMT model, and report fields
+        """
+
+        if not use_case:  # use the current use case
+            use_case = self.use_case
+        if not src_lang:  # use the current source language
+            src_lang = self.rep_proc.src_lang
+        if fields is None:  # use the current report fields
+            fields = self.rep_proc.fields
+        # prepare use case and NMT model (if not prepared yet)
+        self.prepare_use_case(use_case)
+        translator = self.rep_proc.get_translator(src_lang)
+
+        with self.lock:
+            onto, onto_terms = self.use_cases[use_case]
+            return PipelineContext(
+                use_case, self.nerd.kb[use_case], self.onto_proc, onto, onto_terms, src_lang, translator, tuple(fields) if fields else ())
+
+    def get_sources(self):
+        """
+        Get knowledge source files and their last modification times
+
+        Returns: a dict of {source: (file path, modification time)}
+        """
+
+        paths = {
+            'rules': self.nerd.rules_path,
+            'dysplasia_mappings': self.nerd.dysplasia_path,
+            'cin_mappings': self.nerd.cin_path,
+            'ontology_path': self.onto_proc.ontology_path,
+            'hierarchies_path': self.onto_proc.hierarchies_path
+        }
+        return {source: (path, os.path.getmtime(path)) for source, path in paths.items()}
+
+    def get_fingerprint(self):
+        """
+        Get the hashes of the knowledge source files (ontology, rules, mappings, and hierarchies) -- files are hashed only when they change
+
+        Returns: a dict of {source: md5 hash}
+        """
+
+        fingerprint = dict()
+        for source, (path, mtime) in self.sources.items():
+            if (path, mtime) not in self.hashes:  # hash new (or changed) source
+                with open(path, 'rb') as f:
+                    self.hashes[(path, mtime)] = hashlib.md5(f.read()).hexdigest()
+            fingerprint[source] = self.hashes[(path, mtime)]
+        return fingerprint
+
+    def get_report_keys(self, reports, context=None, **params):
+        """
+        Get the report cache keys -- i.e., hashes of report fields plus the pipeline configuration (use case, language, fields, models, knowledge sources, and params)
+
+        Params:
+            reports (dict): dict containing reports
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
+            params (dict): additional params affecting outputs -- e.g., sim_thr, debug, and hospital
+
+        Returns: a dict of {rid: key} -- None when no report cache is used
+        """
+
+        if not self.report_cache:  # no report cache
+            return None
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
+
+        config = utils.dumps_record({
+            'use_case': context.use_case, 'src_lang': context.src_lang, 'fields': list(context.fields),
+            'models': self.models, 'sources': self.get_fingerprint(), 'params': params}, sort_keys=True)
+        return {rid: hashlib.md5((config + utils.dumps_record(report, sort_keys=True)).encode('utf-8')).hexdigest() for rid, report in reports.items()}
+
+    def cached_step(self, keys, field, items, compute):
+        """
+        Retrieve the outputs of a pipeline step from the report cache and compute (and cache) only the missing ones
+
+        Params:
+            keys (dict): report cache keys -- if None, compute all outputs
+            field (str): cached field -- e.g., 'translation', 'concepts', 'labels', or 'graph'
+            items (dict): step inputs
+            compute (function): step function taking (and returning) a dict w/ the same keys as items
+
+        Returns: a dict containing step outputs -- ordered as items
+        """
+
+        if keys is None:  # no report cache
+            return compute(items)
+
+        hits = self.report_cache.get([keys[rid] for rid in items.keys()], field)
+        misses = {rid: item for rid, item in items.items() if keys[rid] not in hits}
+        if misses:  # compute and cache missing outputs
+            computed = compute(misses)
+            self.report_cache.put(field, {keys[rid]: computed[rid] for rid in misses.keys()})
+        else:
+            computed = dict()
+        print('report cache -- {}: {} hits, {} misses'.format(field, len(items) - len(misses), len(misses)))
+        return {rid: computed[rid] if rid in computed else hits[keys[rid]] for rid in items.keys()}
+
+    def cached_misses(self, keys, field, items):
+        """
+        Get the step inputs whose outputs are missing from the report cache
+
+        Params:
+            keys (dict): report cache keys -- if None, all inputs are missing
+            field (str): cached field -- e.g., 'translation', 'concepts', 'labels', or 'graph'
+            items (dict): step inputs
+
+        Returns: a dict containing the step inputs missing from the report cache
+        """
+
+        if keys is None:  # no report cache
+            return items
+        hits = self.report_cache.get([keys[rid] for rid in items.keys()], field)
+        return {rid: item for rid, item in items.items() if keys[rid] not in hits}
+
+    def store_results(self, ds_name, reports, concepts, labels=None, context=None, skipped=None):
+        """
+        Store reports, concepts, labels, and provenance within the results database
+
+        Params:
+            ds_name (str): dataset name
+            reports (dict): dict containing reports
+            concepts (dict): dict containing concepts extracted from reports
+            labels (dict): dict containing labels mapped from extracted concepts -- if None, labels are not stored
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
+            skipped (set): ids of the reports skipped by the prefilter -- if None, the prefilter was not used
+
+        Returns: the run id
+        """
+
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
+
+        models = dict(self.models)
+        if context.src_lang and context.src_lang != 'en':  # reports have been translated
+            models['nmt'] = 'Helsinki-NLP/opus-mt-' + context.src_lang + '-en'
+        run_id = self.results_db.store_run(ds_name, context.use_case, context.src_lang, self.get_fingerprint(), models, skipped)
+        self.results_db.store_reports(run_id, reports)
+        self.results_db.store_concepts(run_id, concepts, context.use_case)
+        if labels:  # store labels
+            self.results_db.store_labels(run_id, labels)
+        return run_id
+
+    def reload(self, rules=None, dysplasia_mappings=None, cin_mappings=None, ontology_path=None, hierarchies_path=None, background=True):
+        """
+        Reload knowledge source files that changed (or that are provided w/ a new path) and rebuild only the affected artefacts:
+            - rules: PhraseMatcher patterns
+            - dysplasia/cin mappings: grade maps
+            - ontology: ontology indexes and label embeddings
+            - hierarchies: hierarchy relations
+        Rebuilt artefacts are swapped in atomically: in-flight pipeline runs complete on the previous version
+
+        Params:
+            rules (str): hand-crafted rules file path
+            dysplasia_mappings (str): dysplasia mappings file path
+            cin_mappings (str): cin mappings file path
+            ontology_path (str): ontology.owl file path
+            hierarchies_path (str): hierarchy relations file path
+            background (bool): whether to rebuild artefacts in a background thread
+
+        Returns: the reloading thread when background == True, the list of reloaded sources otherwise
+        """
+
+        if background:  # rebuild artefacts in a background thread
+            thread = threading.Thread(
+                target=self.reload_knowledge, args=(rules, dysplasia_mappings, cin_mappings, ontology_path, hierarchies_path), daemon=True)
+            thread.start()
+            return thread
+        else:  # rebuild artefacts in the current thread
+            return self.reload_knowledge(rules, dysplasia_mappings, cin_mappings, ontology_path, hierarchies_path)
+
+    def reload_knowledge(self, rules=None, dysplasia_mappings=None, cin_mappings=None, ontology_path=None, hierarchies_path=None):
+        """
+        Rebuild the artefacts depending on changed knowledge source files and swap them w/ the current ones
+
+        Params:
+            rules (str): hand-crafted rules file path
+            dysplasia_mappings (str): dysplasia mappings file path
+            cin_mappings (str): cin mappings file path
+            ontology_path (str): ontology.owl file path
+            hierarchies_path (str): hierarchy relations file path
+
+        Returns: the list of reloaded sources
+        """
+
+        paths = {
+            'rules': rules,
+            'dysplasia_mappings': dysplasia_mappings,
+            'cin_mappings': cin_mappings,
+            'ontology_path': ontology_path,
+            'hierarchies_path': hierarchies_path
+        }
+        with self.update_lock:
+            # get sources modification times before rebuilding -- changes occurring during rebuild are detected by the next reload
+            sources = dict()
+            for source, (path, _) in self.sources.items():
+                path = paths[source] if paths[source] else path
+                sources[source] = (path, os.path.getmtime(path))
+            # detect changed sources
+            changed = {source: path for source, (path, mtime) in sources.items() if (path, mtime) != self.sources[source]}
+            if not changed:  # nothing to reload
+                return []
+
+            # rebuild NERD knowledge only when rules or mappings changed
+            if changed.keys() & {'rules', 'dysplasia_mappings', 'cin_mappings'}:
+                knowledge = self.nerd.build_knowledge(changed.get('rules'), changed.get('dysplasia_mappings'), changed.get('cin_mappings'))
+            else:
+                knowledge = self.nerd.kb
+
+            onto_proc, use_cases = self.onto_proc, self.use_cases
+            if 'ontology_path' in changed:  # reload ontology and rebuild ontology indexes and label embeddings for the prepared use cases
+                onto_proc = OntoProc(sources['ontology_path'][0], sources['hierarchies_path'][0])
+                use_cases = dict()
+                for use_case in self.use_cases.keys():
+                    onto = onto_proc.restrict2use_case(use_case)
+                    use_cases[use_case] = (onto, self.nerd.process_ontology_concepts([term.lower() for term in onto['label'].tolist()]))
+            elif 'hierarchies_path' in changed:  # reuse loaded ontology and update hierarchy relations only
+                onto_proc = copy.copy(self.onto_proc)
+                onto_proc.hierarchies_path = sources['hierarchies_path'][0]
+                onto_proc.hrels = utils.read_hierarchies(onto_proc.hierarchies_path)
+
+            with self.lock:  # swap artefacts
+                self.nerd.set_knowledge(knowledge, changed.get('rules'), changed.get('dysplasia_mappings'), changed.get('cin_mappings'))
+                self.onto_proc, self.use_cases = onto_proc, use_cases
+                self.onto, self.onto_terms = use_cases[self.use_case]
+                self.sources = sources
+        print('reloaded knowledge sources: ' + ', '.join(sorted(changed.keys())))
+        return sorted(changed.keys())
+
     @staticmethod
-    def store_reports(reports, r_path):
+    def store_reports(reports, r_path, append=False):
         """
-        Store reports
+        Store reports -- as JSON Lines when r_path ends w/ '.jsonl'
 
         Params:
             reports (dict): reports
             r_path (str): reports file path
+            append (bool): whether to append reports to the existing file (JSON Lines only)
 
         Returns: None
         """
 
-        with open(r_path, 'w') as out:
-            json.dump(reports, out, indent=4)
+        utils.store_json(reports, r_path, append=append)
 
     @staticmethod
     def load_reports(r_fpath):
         """
-        Load reports
+        Load reports -- JSON Lines are read one report at a time
 
         Params:
             r_fpath (str): reports file path
@@ -199,37 +648,81 @@ class SKET(object):
         Returns: reports
         """
 
-        with open(r_fpath, 'r') as rfp:
-            reports = json.load(rfp)
-        return reports
+        return utils.load_json(r_fpath)
+
+    def find_reports(self, r_fpath):
+        """
+        Find the reports file stored w/ the current extension or, failing that, w/ the other one -- e.g., JSON files stored by earlier versions
+
+        Params:
+            r_fpath (str): reports file path w/o extension
+
+        Returns: the existing reports file path -- None if reports have not been stored
+        """
+
+        for ext in [self.json_ext] + [ext for ext in ['.jsonl', '.json'] if ext != self.json_ext]:
+            if os.path.isfile(r_fpath + ext):  # reports file exists
+                return r_fpath + ext
+        return None
 
     @staticmethod
-    def store_concepts(concepts, c_fpath):
+    def store_concepts(concepts, c_fpath, append=False):
         """
-        Store extracted concepts as JSON dict
+        Store extracted concepts as JSON dict -- as JSON Lines when c_fpath ends w/ '.jsonl'
 
         Params:
             concepts (dict): dict containing concepts extracted from reports
             c_fpath (str): concepts file path
+            append (bool): whether to append concepts to the existing file (JSON Lines only)
 
         Returns: None
         """
 
-        utils.store_concepts(concepts, c_fpath)
+        utils.store_concepts(concepts, c_fpath, append=append)
 
     @staticmethod
-    def store_labels(labels, l_fpath):
+    def store_labels(labels, l_fpath, append=False):
         """
-        Store mapped labels as JSON dict
+        Store mapped labels as JSON dict -- as JSON Lines when l_fpath ends w/ '.jsonl'
 
         Params:
             labels (dict): dict containing labels mapped from extracted concepts
             l_fpath (str): labels file path
+            append (bool): whether to append labels to the existing file (JSON Lines only)
+
+        Returns: None
+        """
+
+        utils.store_labels(labels, l_fpath, append=append)
+
+    @staticmethod
+    def store_concepts_parquet(concepts, c_fpath, use_case):
+        """
+        Store extracted concepts as long Parquet table w/ (report_id, use_case, semantic_area, iri, label, mention) columns -- requires pyarrow
+
+        Params:
+            concepts (dict): dict containing concepts extracted from reports -- can be streamed as (rid, concepts) pairs
+            c_fpath (str): concepts file path
+            use_case (str): considered use case
+
+        Returns: None
+        """
+
+        utils.store_concepts_parquet(concepts, c_fpath, use_case)
+
+    @staticmethod
+    def store_labels_parquet(labels, l_fpath):
+        """
+        Store mapped labels as wide Parquet table w/ one column per label -- requires pyarrow
+
+        Params:
+            labels (dict): dict containing labels mapped from extracted concepts -- can be streamed as (rid, labels) pairs
+            l_fpath (str): labels file path
 
         Returns: None
         """
 
-        utils.store_labels(labels, l_fpath)
+        utils.store_labels_parquet(labels, l_fpath)
 
     def store_rdf_graphs(self, graphs, g_fpath, rdf_format='turtle'):
         """
@@ -254,26 +747,156 @@ class SKET(object):
 
         return self.rdf_proc.serialize_report_graphs(graphs, output=g_fpath, rdf_format=rdf_format)
 
+    def store_rdf_graphs_formats(self, graphs, g_fpath, rdf_formats, parallel=False):
+        """
+        Store RDF graphs w/ several RDF serialization formats -- triples are converted once and all formats are written from the same graph
+
+        Params:
+            graphs (list): list containing (s,p,o) triples representing ExaMode report(s)
+            g_fpath (str): graphs file path w/o extension -- extension is set based on format
+            rdf_formats (list(str)): RDF formats used to serialize graphs
+            parallel (bool): whether to write each format in a separate thread
+
+        Returns: a dict containing, for each format, the boolean returned by the serializer
+        """
+
+        if not set(rdf_formats).issubset({'turtle', 'n3', 'trig'}):  # raise exception
+            print('provide correct format: "turtle", "n3", or "trig".')
+            raise Exception
+
+        outputs = {rdf_format: g_fpath + ('.ttl' if rdf_format == 'turtle' else '.' + rdf_format) for rdf_format in rdf_formats}
+        return self.rdf_proc.serialize_report_graphs_formats(graphs, outputs, parallel=parallel)
+
+    def store_parallel_rdf_graphs(self, reports, concepts, g_fpath, rdf_formats, hospital=None, struct=False, workers=None, chunk_size=1000, debug=False, context=None):
+        """
+        Create and store RDF graphs within a pool of worker processes -- reports are split into chunks and chunk outputs are concatenated into the final files
+
+        Params:
+            reports (dict): dict containing reports -- can be either one or many
+            concepts (dict): dict containing concepts extracted from report(s)
+            g_fpath (str): graphs file path w/o extension -- extension is set based on format. If g_fpath == 'stream' --> return streamed graphs
+            rdf_formats (list(str)): RDF formats used to serialize graphs -- i.e., n3, nt, turtle, or trig
+            hospital (str): considered hospital for ExaMode data -- if None, use the generic graph creation
+            struct (bool): whether to return graphs structured as dict
+            workers (int): number of worker processes -- if None, use the number of processors
+            chunk_size (int): number of reports within each chunk
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
+
+        Returns: a dict containing, for each format, the serialized graphs (g_fpath == 'stream') or the boolean returned by the serializer, and the list of dict graphs (if struct==True)
+        """
+
+        if hospital not in [None, 'aoec', 'radboud']:  # raise exception
+            print('provide correct hospital info: "aoec" or "radboud"')
+            raise Exception
+
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
+
+        # precompute higher concepts for report diagnoses -- workers cannot access the ontology
+        closure = context.onto_proc.get_closure(self.rdf_proc.get_diagnoses(concepts), self.rdf_proc.higher_concepts)
+        if g_fpath == 'stream':  # stream graphs
+            outputs = {rdf_format: 'stream' for rdf_format in rdf_formats}
+        else:  # store graphs to file
+            outputs = {rdf_format: g_fpath + ('.ttl' if rdf_format == 'turtle' else '.' + rdf_format) for rdf_format in rdf_formats}
+        return self.rdf_proc.parallel_report_graphs(
+            reports, concepts, closure, context.use_case, outputs, hospital=hospital, struct=struct, workers=workers, chunk_size=chunk_size, debug=debug)
+
+    def update_rdf_dataset(self, graphs, dataset_path):
+        """
+        Incrementally update a TriG dataset where each report is a named graph identified by the report IRI -- new reports are appended and only changed reports are replaced
+
+        Params:
+            graphs (list): list containing (s,p,o) triples representing ExaMode report(s)
+            dataset_path (str): dataset path -- a '.trig' file or a directory w/ one file per report
+
+        Returns: a dict containing the number of added, replaced, and unchanged reports
+        """
+
+        return self.rdf_proc.update_trig_dataset(graphs, dataset_path)
+
+    def stream_rdf_graphs(self, reports, concepts, g_fpath, rdf_format='nt', hospital=None, debug=False, context=None):
+        """
+        Stream RDF graphs w/o building the whole rdflib graph -- report graphs are created and written one at a time, keeping memory constant
+
+        Params:
+            reports (dict): dict containing reports -- can be either one or many
+            concepts (dict): dict containing concepts extracted from report(s)
+            g_fpath (str): graphs file path -- if g_fpath == 'stream' --> return streamed graphs
+            rdf_format (str): RDF format used to serialize graphs -- i.e., nt, turtle, or trig
+            hospital (str): considered hospital for ExaMode data -- if None, use the generic graph creation
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
+
+        Returns: serialized report graphs when g_fpath == 'stream' or boolean when g_fpath != 'stream'
+        """
+
+        if rdf_format not in ['nt', 'turtle', 'trig']:  # raise exception
+            print('provide correct format: "nt", "turtle", or "trig".')
+            raise Exception
+
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
+
+        if hospital == 'aoec':  # AOEC data
+            create_graph = self.rdf_proc.aoec_create_graph
+        elif hospital == 'radboud':  # Radboud data
+            create_graph = self.rdf_proc.radboud_create_graph
+        elif hospital is None:  # generic data
+            create_graph = self.rdf_proc.create_graph
+        else:  # raise exception
+            print('provide correct hospital info: "aoec" or "radboud"')
+            raise Exception
+
+        # lazily convert report data into (s,p,o) triples
+        graphs = (create_graph(rid, reports[rid], concepts[rid], context.onto_proc, context.use_case, debug=debug)[0] for rid in reports.keys())
+        return self.rdf_proc.stream_report_graphs(graphs, output=g_fpath, rdf_format=rdf_format)
+
+    @staticmethod
+    def set_outputs(store=False, rdf_format='all', outputs=None):
+        """
+        Set the outputs required from the pipeline
+
+        Params:
+            store (bool): whether to store concepts, labels, and RDF graphs
+            rdf_format (str): RDF format used to serialize graphs
+            outputs (set(str)): requested outputs among "concepts", "labels", "n3", "trig", "turtle", and "json" -- if None, outputs are set based on store and rdf_format
+
+        Returns: the set of requested outputs
+        """
+
+        if outputs is None:  # set outputs based on store and rdf_format
+            outputs = {'concepts', 'labels'}
+            outputs |= {'n3', 'trig', 'turtle'} if rdf_format == 'all' else {rdf_format}
+            if store:  # store also JSON graphs
+                outputs |= {'json'}
+        outputs = set(outputs)
+        if not outputs.issubset({'concepts', 'labels', 'n3', 'trig', 'turtle', 'json'}):  # raise exception
+            print('provide correct outputs: "concepts", "labels", "n3", "trig", "turtle", and/or "json".')
+            raise Exception
+        if not store and len(outputs & {'n3', 'trig', 'turtle'}) > 1:  # raise exception
+            print('"all" is not supported for standard (stream) output.\nSupported RDF serialization formats for stream output are: "n3", "trig", and "turtle".')
+            raise Exception
+        return outputs
+
     @staticmethod
-    def store_json_graphs(graphs, g_fpath):
+    def store_json_graphs(graphs, g_fpath, append=False):
         """
-        Store RDF graphs w/ JSON serialization format
+        Store RDF graphs w/ JSON serialization format -- as JSON Lines (one graph per line) when g_fpath ends w/ '.jsonl'
 
         Params:
-            graphs (dict): dict containing (s,p,o) triples representing ExaMode report(s)
+            graphs (list(dict)): list containing dict graphs representing ExaMode report(s)
             g_fpath (str): graphs file path
+            append (bool): whether to append graphs to the existing file (JSON Lines only)
 
         Returns: None
         """
 
-        os.makedirs(os.path.dirname(g_fpath), exist_ok=True)
-
-        with open(g_fpath, 'w') as out:
-            json.dump(graphs, out, indent=4)
+        utils.store_json(graphs, g_fpath, append=append)
 
     # EXAMODE RELATED FUNCTIONS
 
-    def prepare_exa_dataset(self, ds_fpath, sheet, header, hospital, ver, ds_name=None, debug=False):
+    def prepare_exa_dataset(self, ds_fpath, sheet, header, hospital, ver, ds_name=None, debug=False, context=None):
         """
         Prepare ExaMode batch data to perform NERD
 
@@ -285,76 +908,216 @@ class SKET(object):
             ver (int): data format version
             ds_name (str): dataset name
             debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the current one
 
         Returns: translated, split, and prepared dataset
         """
 
+        if not context:  # get current context
+            context = self.get_context()
         # get dataset name from file path if not provided
         if not ds_name:
             ds_name = ds_fpath.split('/')[-1].split('.')[0]  # ./dataset/raw/aoec/####.csv
         # set output directories
-        proc_out = './dataset/processed/' + hospital + '/' + self.use_case + '/'
-        trans_out = './dataset/translated/' + hospital + '/' + self.use_case + '/'
+        proc_out = './dataset/processed/' + hospital + '/' + context.use_case + '/'
+        trans_out = './dataset/translated/' + hospital + '/' + context.use_case + '/'
 
-        if os.path.isfile(trans_out + ds_name + '.json'):  # translated reports file already exists
+        # get stored translated and processed reports -- w/ either JSON or JSON Lines extension
+        trans_fpath = self.find_reports(trans_out + ds_name)
+        proc_fpath = self.find_reports(proc_out + ds_name)
+        if trans_fpath:  # translated reports file already exists
             print('translated reports file already exist -- remove it before running "exa_pipeline" to reprocess it')
-            trans_reports = self.load_reports(trans_out + ds_name + '.json')
+            trans_reports = self.load_reports(trans_fpath)
             return trans_reports
-        elif os.path.isfile(proc_out + ds_name + '.json'):  # processed reports file already exists
+        elif proc_fpath:  # processed reports file already exists
             print('processed reports file already exist -- remove it before running "exa_pipeline" to reprocess it')
-            proc_reports = self.load_reports(proc_out + ds_name + '.json')
-            if hospital == 'aoec':
-                # translate reports
-                trans_reports = self.rep_proc.aoec_translate_reports(proc_reports)
-            elif hospital == 'radboud':
-                # translate reports
-                trans_reports = self.rep_proc.radboud_translate_reports(proc_reports)
-            else:  # raise exception
-                print('provide correct hospital info: "aoec" or "radboud"')
-                raise Exception
+            proc_reports = self.load_reports(proc_fpath)
+            # translate reports
+            trans_reports = self.exa_translator(hospital)(proc_reports, context.translator)
 
             if not os.path.exists(trans_out):  # dir not exists -- make it
                 os.makedirs(trans_out)
             # store translated reports
-            self.store_reports(trans_reports, trans_out + ds_name + '.json')
+            self.store_reports(trans_reports, trans_out + ds_name + self.json_ext)
 
             return trans_reports
         else:  # neither processed nor translated reports files exist
-            # load dataset
-            dataset = self.rep_proc.load_dataset(ds_fpath, sheet, header)
-
-            if hospital == 'aoec':
-                if ver == 1:  # process data using method v1
-                    proc_reports = self.rep_proc.aoec_process_data(dataset)
-                else:  # process data using method v2
-                    proc_reports = self.rep_proc.aoec_process_data_v2(dataset, debug=debug)
-
-                # translate reports
-                trans_reports = self.rep_proc.aoec_translate_reports(proc_reports)
-            elif hospital == 'radboud':
-                if ver == 1:  # process data using method v1
-                    proc_reports = self.rep_proc.radboud_process_data(dataset, debug=debug)
-                else:  # process data using method v2
-                    proc_reports = self.rep_proc.radboud_process_data_v2(dataset)
-
-                # translate reports
-                trans_reports = self.rep_proc.radboud_translate_reports(proc_reports)
-            else:  # raise exception
-                print('provide correct hospital info: "aoec" or "radboud"')
-                raise Exception
+            # load and process dataset
+            dataset = self.rep_proc.stream_dataset(ds_fpath, sheet, header)
+            proc_reports = self.process_exa_dataset(dataset, hospital, ver, debug=debug, context=context)
+            # translate reports
+            trans_reports = self.exa_translator(hospital)(proc_reports, context.translator)
 
             if not os.path.exists(proc_out):  # dir not exists -- make it
                 os.makedirs(proc_out)
             # store processed reports
-            self.store_reports(proc_reports, proc_out + ds_name + '.json')
+            self.store_reports(proc_reports, proc_out + ds_name + self.json_ext)
             if not os.path.exists(trans_out):  # dir not exists -- make it
                 os.makedirs(trans_out)
             # store translated reports
-            self.store_reports(trans_reports, trans_out + ds_name + '.json')
+            self.store_reports(trans_reports, trans_out + ds_name + self.json_ext)
 
             return trans_reports
 
-    def exa_entity_linking(self, reports, hospital, sim_thr=0.7, raw=False, debug=False):
+    def process_exa_dataset(self, dataset, hospital, ver, debug=False, context=None):
+        """
+        Process ExaMode dataset based on hospital and data format version
+
+        Params:
+            dataset (pandas DataFrame): examode dataset
+            hospital (str): considered hospital
+            ver (int): data format version
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+
+        Returns: a dict containing processed reports
+        """
+
+        if not context:  # get current context
+            context = self.get_context()
+
+        if hospital == 'aoec':
+            if ver == 1:  # process data using method v1
+                return self.rep_proc.aoec_process_data(dataset)
+            else:  # process data using method v2
+                return self.rep_proc.aoec_process_data_v2(dataset, debug=debug)
+        elif hospital == 'radboud':
+            if ver == 1:  # process data using method v1
+                return self.rep_proc.radboud_process_data(dataset, debug=debug, use_case=context.use_case)
+            else:  # process data using method v2
+                return self.rep_proc.radboud_process_data_v2(dataset, use_case=context.use_case)
+        else:  # raise exception
+            print('provide correct hospital info: "aoec" or "radboud"')
+            raise Exception
+
+    def exa_translator(self, hospital):
+        """
+        Get the function translating ExaMode reports for the given hospital
+
+        Params:
+            hospital (str): considered hospital
+
+        Returns: the translation function -- taking reports and translator as input
+        """
+
+        if hospital == 'aoec':
+            return self.rep_proc.aoec_translate_reports
+        elif hospital == 'radboud':
+            return self.rep_proc.radboud_translate_reports
+        else:  # raise exception
+            print('provide correct hospital info: "aoec" or "radboud"')
+            raise Exception
+
+    @staticmethod
+    def checkpoint_stage(ckpt_fpath, items, compute, stats):
+        """
+        Run pipeline stage over a chunk of reports and checkpoint its outputs -- or restore them from the checkpoint of a previous run
+
+        Params:
+            ckpt_fpath (str): chunk checkpoint file path
+            items (dict): stage inputs
+            compute (function): stage function taking (and returning) a dict w/ the same keys as items
+            stats (list): [computed reports, elapsed time] of the stage during the current run -- updated in place
+
+        Returns: a dict containing stage outputs
+        """
+
+        if os.path.isfile(ckpt_fpath):  # chunk completed during a previous run
+            return utils.load_json(ckpt_fpath)
+        start = time.time()
+        outputs = compute(items)
+        # checkpoints are written atomically -- interrupted runs never leave partial chunks
+        utils.store_json(outputs, ckpt_fpath)
+        stats[0] += len(items)
+        stats[1] += time.time() - start
+        return outputs
+
+    def checkpointed_exa_dataset(self, ds_fpath, sheet, header, hospital, ver, ds_name, sim_thr=0.7, raw=False, chunk_size=1000, debug=False, context=None):
+        """
+        Prepare ExaMode data and perform entity linking chunk by chunk -- processed reports and each chunk of translated and linked reports are checkpointed as soon as they complete, so that reruns resume from the last completed chunk
+
+        Params:
+            ds_fpath (str): examode dataset file path
+            sheet (str): name of the excel sheet to use
+            header (int): row index used as header
+            hospital (str): considered hospital
+            ver (int): data format version
+            ds_name (str): dataset name
+            sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+            raw (bool): whether to return concepts within semantic areas or mentions+concepts
+            chunk_size (int): number of reports within each checkpointed chunk
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+
+        Returns: translated reports and concepts
+        """
+
+        if not context:  # get current context
+            context = self.get_context()
+        # set output directories
+        proc_out = './dataset/processed/' + hospital + '/' + context.use_case + '/'
+        trans_out = './dataset/translated/' + hospital + '/' + context.use_case + '/'
+        ckpt_out = './dataset/checkpoints/' + hospital + '/' + context.use_case + '/' + ds_name + '/chunks_' + str(chunk_size) + '/'
+        translate = self.exa_translator(hospital)
+
+        # get stored translated and processed reports -- w/ either JSON or JSON Lines extension
+        trans_fpath = self.find_reports(trans_out + ds_name)
+        proc_fpath = self.find_reports(proc_out + ds_name)
+        if trans_fpath:  # translated reports file already exists -- translation is not required
+            print('translated reports file already exist -- resume from it (remove it before running "exa_pipeline" to reprocess it)')
+            proc_reports = self.load_reports(trans_fpath)
+            translate = None
+        elif proc_fpath:  # processed reports file already exists
+            print('processed reports file already exist -- resume from it (remove it before running "exa_pipeline" to reprocess it)')
+            proc_reports = self.load_reports(proc_fpath)
+        else:  # load and process dataset
+            start = time.time()
+            dataset = self.rep_proc.stream_dataset(ds_fpath, sheet, header)
+            proc_reports = self.process_exa_dataset(dataset, hospital, ver, debug=debug, context=context)
+            del dataset
+            # store processed reports -- checkpoint of the processing stage
+            self.store_reports(proc_reports, proc_out + ds_name + self.json_ext)
+            utils.report_progress('processed', len(proc_reports), len(proc_reports), len(proc_reports), time.time() - start)
+
+        # set linking stage -- checkpoints depend on knowledge sources, models, fields, and linking params
+        config = {
+            'use_case': context.use_case, 'hospital': hospital, 'fields': list(context.fields), 'models': self.models, 'sources': self.get_fingerprint(),
+            'params': {'sim_thr': sim_thr, 'raw': raw, 'debug': debug}}
+        linking = ('raw_linked_' if raw else 'linked_') + hashlib.md5(utils.dumps_record(config, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        if not os.path.isfile(ckpt_out + linking + self.json_ext):  # store linking configuration next to its chunks
+            utils.store_json(config, ckpt_out + linking + self.json_ext)
+        # keep track of reports computed and time spent by each stage during the current run
+        stats = {'translated': [0, 0.0], linking: [0, 0.0]}
+        rids = list(proc_reports.keys())
+        trans_reports = dict()
+        concepts = dict()
+        for ix, start in enumerate(range(0, len(rids), chunk_size)):
+            chunk = {rid: proc_reports[rid] for rid in rids[start:start + chunk_size]}
+            done = start + len(chunk)
+            if translate:  # translate chunk (reports missing from the report cache)
+                chunk_reports = self.checkpoint_stage(
+                    ckpt_out + 'translated_' + str(ix) + self.json_ext, chunk,
+                    lambda items: self.cached_step(self.get_report_keys(items, context), 'translation', items, lambda misses: translate(misses, context.translator)),
+                    stats['translated'])
+                utils.report_progress('translated', done, len(rids), stats['translated'][0], stats['translated'][1])
+            else:  # chunk already translated
+                chunk_reports = chunk
+            # perform entity linking over chunk (reports missing from the report cache) -- mentions+concepts are not cached
+            chunk_concepts = self.checkpoint_stage(
+                ckpt_out + linking + '_' + str(ix) + self.json_ext, chunk_reports,
+                lambda items: self.cached_step(
+                    self.get_report_keys(items, context, sim_thr=sim_thr, debug=debug, hospital=hospital) if not raw else None, 'concepts', items,
+                    lambda misses: self.exa_entity_linking(misses, hospital, sim_thr, raw, debug=debug, context=context)),
+                stats[linking])
+            utils.report_progress('linked', done, len(rids), stats[linking][0], stats[linking][1])
+            trans_reports.update(chunk_reports)
+            concepts.update(chunk_concepts)
+
+        if not trans_fpath:  # store translated reports
+            self.store_reports(trans_reports, trans_out + ds_name + self.json_ext)
+        return trans_reports, concepts
+
+    def exa_entity_linking(self, reports, hospital, sim_thr=0.7, raw=False, debug=False, context=None):
         """
         Perform entity linking based on ExaMode reports structure and data
 
@@ -364,27 +1127,33 @@ class SKET(object):
             sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
             raw (bool): whether to return concepts within semantic areas or mentions+concepts
             debug (bool): whether to keep flags for debugging
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
 
         Returns: a dict containing concepts from input reports
         """
 
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
         # perform entity linking
         if hospital == 'aoec':  # AOEC data
-            concepts = self.nerd.aoec_entity_linking(reports, self.onto_proc, self.onto, self.onto_terms, self.use_case, sim_thr, raw, debug=debug)
+            concepts = self.nerd.aoec_entity_linking(
+                reports, context.onto_proc, context.onto, context.onto_terms, context.use_case, sim_thr, raw, debug=debug, knowledge=context.knowledge, whole_doc=self.whole_doc)
         elif hospital == 'radboud':  # Radboud data
-            concepts = self.nerd.radboud_entity_linking(reports, self.onto, self.onto_terms, self.use_case, sim_thr, raw, debug=debug)
+            concepts = self.nerd.radboud_entity_linking(
+                reports, context.onto, context.onto_terms, context.use_case, sim_thr, raw, debug=debug, knowledge=context.knowledge, whole_doc=self.whole_doc)
         else:  # raise exception
             print('provide correct hospital info: "aoec" or "radboud"')
             raise Exception
         return concepts
 
-    def exa_labeling(self, concepts, hospital):
+    def exa_labeling(self, concepts, hospital, context=None):
         """
         Map extracted concepts to pre-defined labels
 
         Params:
             concepts (dict): dict containing concepts extracted from report(s)
             hospital (str): considered hospital
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
 
         Returns: a dict containing labels from input report(s)
         """
@@ -392,10 +1161,11 @@ class SKET(object):
         if hospital not in ['aoec', 'radboud']:
             print('provide correct hospital info: "aoec" or "radboud"')
             raise Exception
-        labels = self.ad_hoc_exa_labeling[hospital][self.use_case]['original'](concepts)
+        use_case = context.use_case if context else self.use_case
+        labels = self.ad_hoc_exa_labeling[hospital][use_case]['original'](concepts)
         return labels
 
-    def create_exa_graphs(self, reports, concepts, hospital, struct=False, debug=False):
+    def create_exa_graphs(self, reports, concepts, hospital, struct=False, debug=False, context=None, keys=None):
         """
         Create report graphs in RDF format
 
@@ -405,10 +1175,15 @@ class SKET(object):
             hospital (str): considered hospital
             struct (bool): whether to return graphs structured as dict
             debug (bool): whether to keep flags for debugging
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
+            keys (dict): report cache keys -- if None, graphs are not cached
 
         Returns: list of (s,p,o) triples representing report graphs and dict structuring report graphs (if struct==True)
         """
 
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
+
         if hospital == 'aoec':  # AOEC data
             create_graph = self.rdf_proc.aoec_create_graph
         elif hospital == 'radboud':  # Radboud data
@@ -417,19 +1192,43 @@ class SKET(object):
             print('provide correct hospital info: "aoec" or "radboud"')
             raise Exception
 
-        rdf_graphs = []
-        struct_graphs = []
-        # convert report data into (s,p,o) triples
-        for rid in reports.keys():
-            rdf_graph, struct_graph = create_graph(rid, reports[rid], concepts[rid], self.onto_proc, self.use_case, debug=debug)
-            rdf_graphs.append(rdf_graph)
-            struct_graphs.append(struct_graph)
+        # convert report data into (s,p,o) triples (for reports missing from the report cache)
+        graphs = self.cached_graphs(reports, concepts, create_graph, keys, debug=debug, context=context)
+        rdf_graphs = [rdf_graph for rdf_graph, _ in graphs]
+        struct_graphs = [struct_graph for _, struct_graph in graphs]
         if struct:  # return both rdf and dict graphs
             return rdf_graphs, struct_graphs
         else:
             return rdf_graphs
 
-    def exa_pipeline(self, ds_fpath, sheet, header, ver, use_case=None, hosp=None, sim_thr=0.7, raw=False, debug=False):
+    def cached_graphs(self, reports, concepts, create_graph, keys=None, debug=False, context=None):
+        """
+        Create report graph fragments -- fragments are retrieved from the report cache when available
+
+        Params:
+            reports (dict): dict containing reports
+            concepts (dict): dict containing concepts extracted from reports
+            create_graph (function): function converting report data into (s,p,o) triples
+            keys (dict): report cache keys -- if None, graphs are not cached
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): knowledge snapshot used throughout the run
+
+        Returns: a list of (rdf graph, struct graph) pairs -- ordered as reports
+        """
+
+        def create_graphs(misses):
+            return {
+                rid: create_graph(rid, reports[rid], concepts[rid], context.onto_proc, context.use_case, debug=debug) for rid in misses.keys()}
+
+        if keys is not None:  # report ids are part of graph IRIs -- pair report keys w/ report ids
+            keys = {rid: keys[rid] + '/' + str(rid) for rid in reports.keys()}
+        graphs = self.cached_step(keys, 'graph', reports, create_graphs)
+        if keys is None:  # graphs created from scratch
+            return list(graphs.values())
+        # restore rdflib predicates within cached fragments
+        return [(self.rdf_proc.load_graph(rdf_graph), struct_graph) for rdf_graph, struct_graph in graphs.values()]
+
+    def exa_pipeline(self, ds_fpath, sheet, header, ver, use_case=None, hosp=None, sim_thr=0.7, raw=False, debug=False, workers=None, chunk_size=None):
         """
         Perform the complete SKET pipeline over ExaMode data:
             - (i) Load dataset
@@ -449,12 +1248,14 @@ class SKET(object):
             sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
             raw (bool): whether to return concepts within semantic areas or mentions+concepts
             debug (bool): whether to keep flags for debugging.
+            workers (int): number of worker processes used to create and store RDF graphs -- if None, graphs are created in the main process
+            chunk_size (int): number of reports within each checkpointed chunk -- if set, processed, translated, and linked reports are checkpointed and reruns resume from the last completed chunk
 
         Returns: None
         """
 
-        if use_case:  # update to input use case
-            self.update_usecase(use_case)
+        # get context for the input use case -- shared state is not modified and reloads occurring during the run do not affect it
+        context = self.get_context(use_case)
 
         # get dataset name
         ds_name = ds_fpath.split('/')[-1].split('.')[0]  # ./dataset/raw/aoec/####.csv
@@ -471,39 +1272,51 @@ class SKET(object):
 
         # set output directories
         if raw:  # return mentions+concepts (used for EXATAG)
-            concepts_out = './outputs/concepts/raw/' + hospital + '/' + self.use_case + '/'
+            concepts_out = './outputs/concepts/raw/' + hospital + '/' + context.use_case + '/'
         else:  # perform complete pipeline (used for SKET/CERT/EXANET)
-            concepts_out = './outputs/concepts/refined/' + hospital + '/' + self.use_case + '/'
-            labels_out = './outputs/labels/' + hospital + '/' + self.use_case + '/'
-            rdf_graphs_out = './outputs/graphs/rdf/' + hospital + '/' + self.use_case + '/'
-            struct_graphs_out = './outputs/graphs/json/' + hospital + '/' + self.use_case + '/'
-
-        # prepare dataset
-        reports = self.prepare_exa_dataset(ds_fpath, sheet, header, hospital, ver, ds_name, debug=debug)
-
-        # perform entity linking
-        concepts = self.exa_entity_linking(reports, hospital, sim_thr, raw, debug=debug)
+            concepts_out = './outputs/concepts/refined/' + hospital + '/' + context.use_case + '/'
+            labels_out = './outputs/labels/' + hospital + '/' + context.use_case + '/'
+            rdf_graphs_out = './outputs/graphs/rdf/' + hospital + '/' + context.use_case + '/'
+            struct_graphs_out = './outputs/graphs/json/' + hospital + '/' + context.use_case + '/'
+
+        if chunk_size:  # prepare dataset and perform entity linking chunk by chunk w/ checkpoints
+            reports, concepts = self.checkpointed_exa_dataset(
+                ds_fpath, sheet, header, hospital, ver, ds_name, sim_thr, raw, chunk_size, debug=debug, context=context)
+            # get report cache keys -- mentions+concepts are not cached
+            keys = self.get_report_keys(reports, context, sim_thr=sim_thr, debug=debug, hospital=hospital) if not raw else None
+        else:
+            # prepare dataset
+            reports = self.prepare_exa_dataset(ds_fpath, sheet, header, hospital, ver, ds_name, debug=debug, context=context)
+            # get report cache keys -- mentions+concepts are not cached
+            keys = self.get_report_keys(reports, context, sim_thr=sim_thr, debug=debug, hospital=hospital) if not raw else None
+            # perform entity linking (on reports missing from the report cache)
+            concepts = self.cached_step(
+                keys, 'concepts', reports, lambda misses: self.exa_entity_linking(misses, hospital, sim_thr, raw, debug=debug, context=context))
         # store concepts
-        self.store_concepts(concepts, concepts_out + 'concepts_' + ds_name + '.json')
+        self.store_concepts(concepts, concepts_out + 'concepts_' + ds_name + self.json_ext)
         if raw:  # return mentions+concepts
             return concepts
 
-        # perform labeling
-        labels = self.exa_labeling(concepts, hospital)
+        # perform labeling (on reports missing from the report cache)
+        labels = self.cached_step(keys, 'labels', concepts, lambda misses: self.exa_labeling(misses, hospital, context=context))
         # store labels
-        self.store_labels(labels, labels_out + 'labels_' + ds_name + '.json')
-        # create RDF graphs
-        rdf_graphs, struct_graphs = self.create_exa_graphs(reports, concepts, hospital, struct=True, debug=debug)
-        # store RDF graphs
-        self.store_rdf_graphs(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name + '.n3', 'n3')
-        self.store_rdf_graphs(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name + '.trig', 'trig')
-        self.store_rdf_graphs(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name + '.ttl', 'turtle')
+        self.store_labels(labels, labels_out + 'labels_' + ds_name + self.json_ext)
+        if self.results_db:  # store results and provenance within the results database
+            self.store_results(ds_name, reports, concepts, labels, context=context)
+        if workers:  # create and store RDF graphs within worker processes
+            _, struct_graphs = self.store_parallel_rdf_graphs(
+                reports, concepts, rdf_graphs_out + 'graphs_' + ds_name, ['n3', 'trig', 'turtle'], hospital, struct=True, workers=workers, debug=debug, context=context)
+        else:
+            # create RDF graphs
+            rdf_graphs, struct_graphs = self.create_exa_graphs(reports, concepts, hospital, struct=True, debug=debug, context=context, keys=keys)
+            # store RDF graphs
+            self.store_rdf_graphs_formats(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name, ['n3', 'trig', 'turtle'])
         # store JSON graphs
-        self.store_json_graphs(struct_graphs, struct_graphs_out + 'graphs_' + ds_name + '.json')
+        self.store_json_graphs(struct_graphs, struct_graphs_out + 'graphs_' + ds_name + self.json_ext)
 
     # GENERAL-PURPOSE FUNCTIONS
 
-    def prepare_med_dataset(self, ds, ds_name, src_lang=None, store=False, debug=False):
+    def prepare_med_dataset(self, ds, ds_name, src_lang=None, store=False, debug=False, context=None):
         """
         Prepare dataset to perform NERD
 
@@ -513,31 +1326,106 @@ class SKET(object):
             src_lang (str): considered language
             store (bool): whether to store concepts, labels, and RDF graphs
             debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the context for src_lang
 
         Returns: translated, split, and prepared dataset
         """
 
-        # set output directories
-        proc_out = './dataset/processed/' + self.use_case + '/'
-        trans_out = './dataset/translated/' + self.use_case + '/'
+        if not context:  # get context for the input source language
+            context = self.get_context(src_lang=src_lang)
+
+        # process and translate reports
+        proc_reports = self.process_med_dataset(ds, ds_name, store, debug=debug, context=context)
+        return self.translate_med_dataset(proc_reports, ds_name, store, context=context)
+
+    def process_med_dataset(self, ds, ds_name, store=False, debug=False, context=None):
+        """
+        Process dataset
+
+        Params:
+            ds (dict): dataset
+            ds_name (str): dataset name
+            store (bool): whether to store processed reports
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+
+        Returns: a dict containing processed reports
+        """
+
+        if not context:  # get current context
+            context = self.get_context()
+        # set output directory
+        proc_out = './dataset/processed/' + context.use_case + '/'
 
         # process reports
-        proc_reports = self.rep_proc.process_data(ds, debug=debug)
+        proc_reports = self.rep_proc.process_data(ds, debug=debug, fields=context.fields)
         if store:  # store processed reports
             os.makedirs(proc_out, exist_ok=True)
-            self.store_reports(proc_reports, proc_out + ds_name + '.json')
+            self.store_reports(proc_reports, proc_out + ds_name + self.json_ext)
+        return proc_reports
+
+    def translate_med_dataset(self, proc_reports, ds_name, store=False, context=None):
+        """
+        Translate processed reports (missing from the report cache)
+
+        Params:
+            proc_reports (dict): dict containing processed reports
+            ds_name (str): dataset name
+            store (bool): whether to store translated reports
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+
+        Returns: a dict containing translated reports
+        """
+
+        if not context:  # get current context
+            context = self.get_context()
+        # set output directory
+        trans_out = './dataset/translated/' + context.use_case + '/'
 
-        if src_lang != 'en':  # translate reports
-            trans_reports = self.rep_proc.translate_reports(proc_reports)
+        if context.src_lang != 'en':  # translate reports (missing from the report cache)
+            trans_reports = self.cached_step(
+                self.get_report_keys(proc_reports, context), 'translation', proc_reports,
+                lambda misses: self.rep_proc.translate_reports(misses, context.translator))
         else:  # keep processed reports
             trans_reports = proc_reports
         if store:  # store translated reports
             os.makedirs(trans_out, exist_ok=True)
-            self.store_reports(trans_reports, trans_out + ds_name + '.json')
+            self.store_reports(trans_reports, trans_out + ds_name + self.json_ext)
 
         return trans_reports
 
-    def med_entity_linking(self, reports, sim_thr=0.7, raw=False, debug=False):
+    def prefilter_med_dataset(self, ds, ds_name, prefilter=False, prefilter_keywords=None, store=False, debug=False, context=None):
+        """
+        Prepare dataset and detect the reports w/o candidate entities -- either on source-language keywords (before translation) or on use case keywords (after translation)
+
+        Params:
+            ds (dict): dataset
+            ds_name (str): dataset name
+            prefilter (bool): whether to detect translated reports w/o use case keywords
+            prefilter_keywords (list(str)): source-language keywords -- if set, reports w/o keywords are detected before translation and kept untranslated
+            store (bool): whether to store processed and translated reports
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+
+        Returns: the prepared dataset and the set of ids of the reports to skip
+        """
+
+        if not context:  # get current context
+            context = self.get_context()
+
+        if not prefilter and not prefilter_keywords:  # no prefilter
+            return self.prepare_med_dataset(ds, ds_name, store=store, debug=debug, context=context), set()
+        proc_reports = self.process_med_dataset(ds, ds_name, store, debug=debug, context=context)
+        if prefilter_keywords:  # detect reports w/o source-language keywords -- skipped reports are not translated
+            skipped = self.prefilter_reports(proc_reports, prefilter_keywords, context=context)
+            trans_reports = self.translate_med_dataset({rid: report for rid, report in proc_reports.items() if rid not in skipped}, ds_name, store, context=context)
+            # restore dataset order
+            return {rid: trans_reports[rid] if rid in trans_reports else proc_reports[rid] for rid in proc_reports.keys()}, skipped
+        # detect translated reports w/o use case keywords
+        trans_reports = self.translate_med_dataset(proc_reports, ds_name, store, context=context)
+        return trans_reports, self.prefilter_reports(trans_reports, context=context)
+
+    def med_entity_linking(self, reports, sim_thr=0.7, raw=False, debug=False, context=None):
         """
         Perform entity linking on input reports
 
@@ -546,29 +1434,35 @@ class SKET(object):
             sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
             raw (bool): whether to return concepts within semantic areas or mentions+concepts
             debug (bool): whether to keep flags for debugging
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
 
         Returns: a dict containing concepts from input reports
         """
 
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
         # perform entity linking
-        concepts = self.nerd.entity_linking(reports, self.onto, self.onto_terms, self.use_case, sim_thr, raw, debug=debug)
+        concepts = self.nerd.entity_linking(
+            reports, context.onto, context.onto_terms, context.use_case, sim_thr, raw, debug=debug, knowledge=context.knowledge, whole_doc=self.whole_doc)
 
         return concepts
 
-    def med_labeling(self, concepts):
+    def med_labeling(self, concepts, context=None):
         """
         Map extracted concepts to pre-defined labels
 
         Params:
             concepts (dict): dict containing concepts extracted from report(s)
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
 
         Returns: a dict containing labels from input report(s)
         """
 
-        labels = self.ad_hoc_med_labeling[self.use_case]['original'](concepts)
+        use_case = context.use_case if context else self.use_case
+        labels = self.ad_hoc_med_labeling[use_case]['original'](concepts)
         return labels
 
-    def create_med_graphs(self, reports, concepts, struct=False, debug=False):
+    def create_med_graphs(self, reports, concepts, struct=False, debug=False, context=None, keys=None):
         """
         Create report graphs in RDF format
 
@@ -577,23 +1471,25 @@ class SKET(object):
             concepts (dict): dict containing concepts extracted from report(s)
             struct (bool): whether to return graphs structured as dict
             debug (bool): whether to keep flags for debugging
+            context (PipelineContext): knowledge snapshot used throughout the run -- if None, use the current one
+            keys (dict): report cache keys -- if None, graphs are not cached
 
         Returns: list of (s,p,o) triples representing report graphs and dict structuring report graphs (if struct==True)
         """
 
-        rdf_graphs = []
-        struct_graphs = []
-        # convert report data into (s,p,o) triples
-        for rid in reports.keys():
-            rdf_graph, struct_graph = self.rdf_proc.create_graph(rid, reports[rid], concepts[rid], self.onto_proc, self.use_case, debug=debug)
-            rdf_graphs.append(rdf_graph)
-            struct_graphs.append(struct_graph)
+        if not context:  # get current knowledge snapshot
+            context = self.get_context()
+
+        # convert report data into (s,p,o) triples (for reports missing from the report cache)
+        graphs = self.cached_graphs(reports, concepts, self.rdf_proc.create_graph, keys, debug=debug, context=context)
+        rdf_graphs = [rdf_graph for rdf_graph, _ in graphs]
+        struct_graphs = [struct_graph for _, struct_graph in graphs]
         if struct:  # return both rdf and dict graphs
             return rdf_graphs, struct_graphs
         else:
             return rdf_graphs
 
-    def med_pipeline(self, ds, src_lang=None, use_case=None, sim_thr=0.7, store=False, rdf_format='all', raw=False, debug=False):
+    def med_pipeline(self, ds, src_lang=None, use_case=None, sim_thr=0.7, store=False, rdf_format='all', raw=False, debug=False, outputs=None, prefilter=False, prefilter_keywords=None):
         """
         Perform the complete SKET pipeline over generic data:
             - (i) Process dataset
@@ -605,6 +1501,8 @@ class SKET(object):
 
         When raw == True: perform steps i-iii and return mentions+concepts
         When store == True: store concepts, labels, and RDF graphs
+        When outputs is set: skip the steps that do not feed any requested output -- skipped outputs are returned as None
+        When prefilter == True: reports w/o candidate entities skip NERD and get empty concepts (and the labels assigned to empty concepts)
 
         Params:
             ds (dict): dataset
@@ -616,57 +1514,336 @@ class SKET(object):
             rdf_format (str): RDF format used to serialize graphs
             raw (bool): whether to return concepts within semantic areas or mentions+concepts
             debug (bool): whether to keep flags for debugging
+            outputs (set(str)): requested outputs among "concepts", "labels", "n3", "trig", "turtle", and "json" -- if None, outputs are set based on store and rdf_format
+            prefilter (bool): whether to skip NERD for translated reports w/o use case keywords (i.e., rule triggers, mapping triggers, and ontology labels)
+            prefilter_keywords (list(str)): source-language keywords -- if set, reports w/o keywords are skipped before translation (and kept untranslated)
 
-        Returns: None
+        Returns: concepts, labels, and RDF graphs -- as returned by med_outputs -- the ids of the reports skipped by the prefilter are stored w/ concepts and recorded w/ the run
         """
 
-        if use_case:  # update to input use case
-            self.update_usecase(use_case)
-
-        if src_lang:  # update to input source language
-            self.update_nmt(src_lang)
-
-        # set output directories
-        if raw:  # return mentions+concepts (used for EXATAG)
-            concepts_out = './outputs/concepts/raw/' + self.use_case + '/'
-        else:  # perform complete pipeline (used for SKET/CERT/EXANET)
-            concepts_out = './outputs/concepts/refined/' + self.use_case + '/'
-            labels_out = './outputs/labels/' + self.use_case + '/'
-            rdf_graphs_out = './outputs/graphs/rdf/' + self.use_case + '/'
-            struct_graphs_out = './outputs/graphs/json/' + self.use_case + '/'
+        # set requested outputs
+        outputs = self.set_outputs(store, rdf_format, outputs)
+        # get context for the input use case and source language -- shared state is not modified and reloads occurring during the run do not affect it
+        context = self.get_context(use_case, src_lang)
 
         # set dataset name
         ds_name = str(uuid.uuid4())
-        # prepare dataset
-        reports = self.prepare_med_dataset(ds, ds_name, src_lang, store, debug=debug)
-
-        # perform entity linking
-        concepts = self.med_entity_linking(reports, sim_thr, raw, debug=debug)
-        if store:  # store concepts
-            self.store_concepts(concepts, concepts_out + 'concepts_' + ds_name + '.json')
-        if raw:  # return mentions+concepts
+        # prepare dataset -- reports skipped by the prefilter are not linked
+        reports, skipped = self.prefilter_med_dataset(ds, ds_name, prefilter, prefilter_keywords, store, debug=debug, context=context)
+
+        # get report cache keys -- mentions+concepts are not cached
+        keys = self.get_report_keys(reports, context, sim_thr=sim_thr, debug=debug) if not raw else None
+        if keys and skipped:  # outputs of skipped reports are cached apart from those of linked reports
+            keys = {rid: key + '/skipped' if rid in skipped else key for rid, key in keys.items()}
+        # perform entity linking (on reports missing from the report cache) -- reports skipped by the prefilter get empty concepts
+        linked = {rid: report for rid, report in reports.items() if rid not in skipped}
+        linked = self.cached_step(keys, 'concepts', linked, lambda misses: self.med_entity_linking(misses, sim_thr, raw, debug=debug, context=context))
+        concepts = {rid: linked[rid] if rid in linked else self.empty_concepts(raw, context) for rid in reports.keys()}
+        if raw:  # return mentions+concepts (used for EXATAG)
+            if store:  # store concepts
+                self.store_concepts(concepts, './outputs/concepts/raw/' + context.use_case + '/concepts_' + ds_name + self.json_ext)
             return concepts
 
-        # perform labeling
-        labels = self.med_labeling(concepts)
-        if store:  # store labels
-            self.store_labels(labels, labels_out + 'labels_' + ds_name + '.json')
+        # perform labeling (if required)
+        labels = self.cached_step(keys, 'labels', concepts, lambda misses: self.med_labeling(misses, context=context)) if 'labels' in outputs else None
+        # create RDF graphs and store (or return) concepts, labels, and RDF graphs
+        return self.med_outputs(
+            reports, concepts, labels, ds_name, store, rdf_format, debug=debug, context=context, outputs=outputs, keys=keys,
+            skipped=skipped if prefilter or prefilter_keywords else None)
+
+    def med_outputs(self, reports, concepts, labels, ds_name, store=False, rdf_format='all', debug=False, context=None, outputs=None, keys=None, skipped=None):
+        """
+        Create RDF graphs and store (or return) concepts, labels, and RDF graphs
+
+        Params:
+            reports (dict): dict containing reports -- can be either one or many
+            concepts (dict): dict containing concepts extracted from report(s)
+            labels (dict): dict containing labels mapped from extracted concepts
+            ds_name (str): dataset name
+            store (bool): whether to store concepts, labels, and RDF graphs
+            rdf_format (str): RDF format used to serialize graphs
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+            outputs (set(str)): requested outputs among "concepts", "labels", "n3", "trig", "turtle", and "json" -- if None, outputs are set based on store and rdf_format
+            keys (dict): report cache keys -- if None, graphs are not cached
+            skipped (set): ids of the reports skipped by the prefilter -- if None, the prefilter was not used
+
+        Returns: concepts, labels, and RDF graphs -- RDF graphs are serialized when store == False (JSON graphs are returned when no RDF format is requested) and None when not requested
+        """
+
+        # set requested outputs
+        outputs = self.set_outputs(store, rdf_format, outputs)
+        rdf_formats = [rdf_format for rdf_format in ['n3', 'trig', 'turtle'] if rdf_format in outputs]
+        if not context:  # get current context
+            context = self.get_context()
+        # set output directories (used for SKET/CERT/EXANET)
+        concepts_out = './outputs/concepts/refined/' + context.use_case + '/'
+        labels_out = './outputs/labels/' + context.use_case + '/'
+        rdf_graphs_out = './outputs/graphs/rdf/' + context.use_case + '/'
+        struct_graphs_out = './outputs/graphs/json/' + context.use_case + '/'
+
+        if store:  # store concepts and labels (if requested)
+            if 'concepts' in outputs:
+                self.store_concepts(concepts, concepts_out + 'concepts_' + ds_name + self.json_ext)
+                if skipped is not None:  # store the ids of the reports skipped by the prefilter next to concepts
+                    utils.store_json(sorted(str(rid) for rid in skipped), concepts_out + 'skipped_' + ds_name + self.json_ext)
+            if labels is not None and 'labels' in outputs:
+                self.store_labels(labels, labels_out + 'labels_' + ds_name + self.json_ext)
+        if self.results_db:  # store results and provenance within the results database
+            self.store_results(ds_name, reports, concepts, labels, context=context, skipped=skipped)
+        if not rdf_formats and 'json' not in outputs:  # no graphs requested -- skip graph construction and serialization
+            return concepts, labels, None
         # create RDF graphs
-        rdf_graphs, struct_graphs = self.create_med_graphs(reports, concepts, struct=True, debug=debug)
+        rdf_graphs, struct_graphs = self.create_med_graphs(reports, concepts, struct=True, debug=debug, context=context, keys=keys)
         if store:  # store graphs
             # RDF graphs
-            if rdf_format in ['all', 'n3']:
-                self.store_rdf_graphs(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name + '.n3', 'n3')
-            if rdf_format in ['all', 'trig']:
-                self.store_rdf_graphs(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name + '.trig', 'trig')
-            if rdf_format in ['all', 'turtle']:
-                self.store_rdf_graphs(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name + '.ttl', 'turtle')
+            if rdf_formats:
+                self.store_rdf_graphs_formats(rdf_graphs, rdf_graphs_out + 'graphs_' + ds_name, rdf_formats)
             # JSON graphs
-            self.store_json_graphs(struct_graphs, struct_graphs_out + 'graphs_' + ds_name + '.json')
+            if 'json' in outputs:
+                self.store_json_graphs(struct_graphs, struct_graphs_out + 'graphs_' + ds_name + self.json_ext)
         else:  # return serialized graphs as stream
-            if rdf_format == 'all':
-                print('"all" is not supported for standard (stream) output.\nSupported RDF serialization formats for stream output are: "n3", "trig", and "turtle".')
-                raise Exception
-            else:
-                rdf_graphs = self.store_rdf_graphs(rdf_graphs, 'stream', rdf_format)
+            if rdf_formats:  # return RDF graphs serialized w/ the requested format
+                rdf_graphs = self.store_rdf_graphs(rdf_graphs, 'stream', rdf_formats[0])
+            else:  # return JSON graphs
+                rdf_graphs = struct_graphs
         return concepts, labels, rdf_graphs
+
+    def med_batch_pipeline(self, datasets, src_lang=None, use_case=None, sim_thr=0.7, stores=None, rdf_formats=None, debug=False, batch_size=16, outputs=None, completed=None):
+        """
+        Perform the complete SKET pipeline over a batch of datasets sharing use case and source language:
+        reports from all the datasets are processed, translated, and linked in one pass, then outputs are split back per dataset
+
+        Params:
+            datasets (list(dict)): datasets
+            src_lang (str): considered language
+            use_case (str): considered use case
+            sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+            stores (list(bool)): whether to store concepts, labels, and RDF graphs for each dataset -- if None, outputs are not stored
+            rdf_formats (list(str)): RDF format used to serialize graphs for each dataset -- if None, use 'turtle'
+            debug (bool): whether to keep flags for debugging
+            batch_size (int): number of reports translated at once
+            outputs (list(set(str))): requested outputs for each dataset -- if None, outputs are set based on stores and rdf_formats
+            completed (list): list collecting the outputs of each dataset as soon as they are (stored and) returned -- if the batch fails, datasets w/ collected outputs are complete
+
+        Returns: a list containing concepts, labels, and RDF graphs for each dataset -- as returned by med_pipeline
+        """
+
+        if not stores:  # do not store outputs
+            stores = [False] * len(datasets)
+        if not rdf_formats:  # return graphs serialized w/ turtle format
+            rdf_formats = ['turtle'] * len(datasets)
+        if not outputs:  # set outputs based on stores and rdf_formats
+            outputs = [None] * len(datasets)
+        # check outputs before processing -- avoid partially stored batches
+        outputs = [self.set_outputs(store, rdf_format, ds_outputs) for store, rdf_format, ds_outputs in zip(stores, rdf_formats, outputs)]
+
+        # get context for the input use case and source language
+        context = self.get_context(use_case, src_lang)
+
+        # process reports and merge datasets -- report ids are paired w/ dataset index to avoid collisions across datasets
+        proc_reports = dict()
+        for ix, ds in enumerate(datasets):
+            for rid, report in self.rep_proc.process_data(ds, debug=debug, fields=context.fields).items():
+                proc_reports[(ix, rid)] = report
+        if context.src_lang != 'en':  # translate reports (missing from the report cache) in batches
+            trans_reports = self.cached_step(
+                self.get_report_keys(proc_reports, context), 'translation', proc_reports,
+                lambda misses: self.rep_proc.translate_reports(misses, context.translator, batch_size))
+        else:  # keep processed reports
+            trans_reports = proc_reports
+
+        # perform entity linking and labeling (if required) over the whole batch -- only reports missing from the report cache are annotated
+        cache_keys = self.get_report_keys(trans_reports, context, sim_thr=sim_thr, debug=debug)
+        concepts = self.cached_step(cache_keys, 'concepts', trans_reports, lambda misses: self.med_entity_linking(misses, sim_thr, debug=debug, context=context))
+        if any('labels' in ds_outputs for ds_outputs in outputs):
+            labels = self.cached_step(cache_keys, 'labels', concepts, lambda misses: self.med_labeling(misses, context=context))
+        else:
+            labels = None
+
+        # split outputs per dataset
+        ds_keys = [[] for _ in datasets]
+        for key in trans_reports.keys():
+            ds_keys[key[0]].append(key)
+        ds_outputs = []
+        for ix, keys in enumerate(ds_keys):
+            # set dataset name
+            ds_name = str(uuid.uuid4())
+            ds_reports = {rid: trans_reports[(ix, rid)] for _, rid in keys}
+            if stores[ix]:  # store processed and translated reports
+                os.makedirs('./dataset/processed/' + context.use_case + '/', exist_ok=True)
+                self.store_reports({rid: proc_reports[(ix, rid)] for _, rid in keys}, './dataset/processed/' + context.use_case + '/' + ds_name + self.json_ext)
+                os.makedirs('./dataset/translated/' + context.use_case + '/', exist_ok=True)
+                self.store_reports(ds_reports, './dataset/translated/' + context.use_case + '/' + ds_name + self.json_ext)
+            ds_labels = {rid: labels[(ix, rid)] for _, rid in keys} if 'labels' in outputs[ix] else None
+            ds_outputs.append(self.med_outputs(
+                ds_reports, {rid: concepts[(ix, rid)] for _, rid in keys}, ds_labels,
+                ds_name, stores[ix], rdf_formats[ix], debug=debug, context=context, outputs=outputs[ix],
+                keys={rid: cache_keys[(ix, rid)] for _, rid in keys} if cache_keys else None))
+            if completed is not None:  # dataset outputs are complete
+                completed.append(ds_outputs[-1])
+        return ds_outputs
+
+    def multi_pipeline(self, ds, src_lang=None, use_cases=None, sim_thr=0.7, store=False, rdf_format='all', raw=False, debug=False, outputs=None, route=False, min_ratio=0.5, fallback=True):
+        """
+        Perform the complete SKET pipeline over generic data for several use cases at once:
+        reports are processed and translated once, parsed w/ spaCy once, and linked, labeled, and turned into graphs w/ the knowledge of each use case
+
+        When route == True: reports are routed w/ keyword hits and annotated for the use cases they are routed to only
+
+        Params:
+            ds (dict): dataset
+            src_lang (str): considered language
+            use_cases (list(str)): considered use cases -- if None, consider all the supported use cases
+            sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+            store (bool): whether to store concepts, labels, and RDF graphs
+            rdf_format (str): RDF format used to serialize graphs
+            raw (bool): whether to return concepts within semantic areas or mentions+concepts
+            debug (bool): whether to keep flags for debugging
+            outputs (set(str)): requested outputs among "concepts", "labels", "n3", "trig", "turtle", and "json" -- if None, outputs are set based on store and rdf_format
+            route (bool): whether to route reports to the likely use case(s) before NERD
+            min_ratio (float): route reports to the use cases scoring at least min_ratio times the top score
+            fallback (bool): whether to annotate unrouted reports (i.e., w/o keyword hits) for all the use cases -- otherwise, they are skipped
+
+        Returns: a dict containing concepts, labels, and RDF graphs for each use case -- as returned by med_pipeline -- and, when route == True, the routing decision for each report
+        """
+
+        if not use_cases:  # consider all the supported use cases
+            use_cases = ['colon', 'cervix', 'lung']
+        # set requested outputs
+        outputs = self.set_outputs(store, rdf_format, outputs)
+        # get context for each use case -- reloads occurring during the run do not affect them
+        contexts = {use_case: self.get_context(use_case, src_lang) for use_case in use_cases}
+
+        # set dataset name
+        ds_name = str(uuid.uuid4())
+        # prepare dataset -- report processing and translation do not depend on the use case
+        reports = self.prepare_med_dataset(ds, ds_name, src_lang, store, debug=debug, context=contexts[use_cases[0]])
+
+        if route:  # route reports to the likely use case(s)
+            decisions = self.route_reports(reports, use_cases, min_ratio)
+            if store:  # store routing decisions for auditing
+                os.makedirs('./outputs/routes/', exist_ok=True)
+                self.store_reports(decisions, './outputs/routes/routes_' + ds_name + self.json_ext)
+            use_case_reports = {
+                use_case: {rid: report for rid, report in reports.items() if use_case in decisions[rid]['use_cases'] or (fallback and not decisions[rid]['use_cases'])}
+                for use_case in use_cases}
+        else:  # annotate all reports for each use case
+            decisions = None
+            use_case_reports = {use_case: reports for use_case in use_cases}
+
+        # get report cache keys for each use case -- mentions+concepts are not cached
+        keys = {use_case: self.get_report_keys(use_case_reports[use_case], context, sim_thr=sim_thr, debug=debug) if not raw else None for use_case, context in contexts.items()}
+        # perform entity linking for each use case in one pass (on reports missing from the report cache)
+        linked = self.nerd.multi_entity_linking(
+            {use_case: self.cached_misses(keys[use_case], 'concepts', use_case_reports[use_case]) for use_case in use_cases},
+            {use_case: (context.onto, context.onto_terms, context.knowledge) for use_case, context in contexts.items()},
+            sim_thr, raw, debug, whole_doc=self.whole_doc)
+
+        use_case_outputs = dict()
+        for use_case, context in contexts.items():
+            reports = use_case_reports[use_case]
+            # merge linked concepts w/ those from the report cache
+            concepts = self.cached_step(keys[use_case], 'concepts', reports, lambda misses: linked[use_case])
+            if raw:  # return mentions+concepts (used for EXATAG)
+                if store:  # store concepts
+                    self.store_concepts(concepts, './outputs/concepts/raw/' + use_case + '/concepts_' + ds_name + self.json_ext)
+                use_case_outputs[use_case] = concepts
+                continue
+            # perform labeling (if required)
+            labels = self.cached_step(keys[use_case], 'labels', concepts, lambda misses: self.med_labeling(misses, context=context)) if 'labels' in outputs else None
+            # create RDF graphs and store (or return) concepts, labels, and RDF graphs
+            use_case_outputs[use_case] = self.med_outputs(reports, concepts, labels, ds_name, store, rdf_format, debug=debug, context=context, outputs=outputs, keys=keys[use_case])
+        if route:  # return outputs along w/ routing decisions
+            return use_case_outputs, decisions
+        return use_case_outputs
+
+    def stream_pipeline(self, source, src_lang=None, use_case=None, sim_thr=0.7, chunk_size=1000, graphs=True, batch_size=None, debug=False, prefilter=False, prefilter_keywords=None, skipped=None):
+        """
+        Perform the SKET pipeline over a stream of reports: reports are read lazily from source and pushed through
+        processing, translation, entity linking, labeling, and graph creation in bounded chunks -- memory depends on chunk_size, not on the source size
+
+        Params:
+            source (str/dict/iterable(dict)): JSON, JSON Lines, xls, or xlsx file path, stream dict, or iterable of reports
+            src_lang (str): considered language
+            use_case (str): considered use case
+            sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+            chunk_size (int): number of reports within each chunk
+            graphs (bool): whether to create report graphs
+            batch_size (int): number of reports translated at once -- if None, translate one report at a time
+            debug (bool): whether to keep flags for debugging
+            prefilter (bool): whether to skip NERD for translated reports w/o use case keywords (i.e., rule triggers, mapping triggers, and ontology labels)
+            prefilter_keywords (list(str)): source-language keywords -- if set, reports w/o keywords are skipped before translation (and kept untranslated)
+            skipped (set): set collecting the ids of the reports skipped by the prefilter as chunks complete -- if None, skipped ids are not collected
+
+        Returns: a generator yielding (rid, concepts, labels, rdf graph) for each report as soon as its chunk completes -- rdf graph is None when graphs == False
+        """
+
+        # get context for the input use case and source language -- reloads occurring during the stream do not affect it
+        context = self.get_context(use_case, src_lang)
+
+        chunk = dict()
+        for report in self.rep_proc.iter_reports(source):
+            # process report
+            rid, proc_report = self.rep_proc.process_report(report, context.fields)
+            chunk[rid] = proc_report
+            if len(chunk) == chunk_size:  # chunk is full -- annotate it and release it
+                for output in self.stream_chunk(
+                        chunk, sim_thr, graphs, batch_size, debug=debug, context=context, prefilter=prefilter, prefilter_keywords=prefilter_keywords, skipped=skipped):
+                    yield output
+                chunk = dict()
+        if chunk:  # annotate remaining reports
+            for output in self.stream_chunk(
+                    chunk, sim_thr, graphs, batch_size, debug=debug, context=context, prefilter=prefilter, prefilter_keywords=prefilter_keywords, skipped=skipped):
+                yield output
+
+    def stream_chunk(self, proc_reports, sim_thr=0.7, graphs=True, batch_size=None, debug=False, context=None, prefilter=False, prefilter_keywords=None, skipped=None):
+        """
+        Translate, link, label, and create graphs for a chunk of processed reports -- reports missing from the report cache only
+
+        Params:
+            proc_reports (dict): dict containing processed reports
+            sim_thr (float): keep candidates with sim score greater than or equal to sim_thr
+            graphs (bool): whether to create report graphs
+            batch_size (int): number of reports translated at once -- if None, translate one report at a time
+            debug (bool): whether to keep flags for debugging
+            context (PipelineContext): context used throughout the run -- if None, use the current one
+            prefilter (bool): whether to skip NERD for translated reports w/o use case keywords
+            prefilter_keywords (list(str)): source-language keywords -- if set, reports w/o keywords are skipped before translation (and kept untranslated)
+            skipped (set): set collecting the ids of the reports skipped by the prefilter -- if None, skipped ids are not collected
+
+        Returns: a generator yielding (rid, concepts, labels, rdf graph) for each report
+        """
+
+        if not context:  # get current context
+            context = self.get_context()
+
+        # detect reports w/o source-language keywords (if required) -- skipped reports are not translated
+        chunk_skipped = self.prefilter_reports(proc_reports, prefilter_keywords, context=context) if prefilter_keywords else set()
+        if context.src_lang != 'en':  # translate reports (missing from the report cache)
+            translated = {rid: report for rid, report in proc_reports.items() if rid not in chunk_skipped}
+            translated = self.cached_step(
+                self.get_report_keys(translated, context), 'translation', translated,
+                lambda misses: self.rep_proc.translate_reports(misses, context.translator, batch_size))
+            reports = {rid: translated[rid] if rid in translated else proc_reports[rid] for rid in proc_reports.keys()}
+        else:  # keep processed reports
+            reports = proc_reports
+        if prefilter and not prefilter_keywords:  # detect translated reports w/o use case keywords
+            chunk_skipped = self.prefilter_reports(reports, context=context)
+        if skipped is not None:  # collect skipped reports for the caller
+            skipped.update(chunk_skipped)
+        # perform entity linking and labeling (on reports missing from the report cache) -- reports skipped by the prefilter get empty concepts
+        keys = self.get_report_keys(reports, context, sim_thr=sim_thr, debug=debug)
+        if keys and chunk_skipped:  # outputs of skipped reports are cached apart from those of linked reports
+            keys = {rid: key + '/skipped' if rid in chunk_skipped else key for rid, key in keys.items()}
+        linked = {rid: report for rid, report in reports.items() if rid not in chunk_skipped}
+        linked = self.cached_step(keys, 'concepts', linked, lambda misses: self.med_entity_linking(misses, sim_thr, debug=debug, context=context))
+        concepts = {rid: linked[rid] if rid in linked else self.empty_concepts(context=context) for rid in reports.keys()}
+        labels = self.cached_step(keys, 'labels', concepts, lambda misses: self.med_labeling(misses, context=context))
+        if graphs:  # create RDF graphs
+            rdf_graphs = self.create_med_graphs(reports, concepts, debug=debug, context=context, keys=keys)
+        else:
+            rdf_graphs = [None] * len(reports)
+
+        for rid, rdf_graph in zip(reports.keys(), rdf_graphs):
+            yield rid, concepts[rid], labels[rid], rdf_graph
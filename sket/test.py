@@ -0,0 +1,122 @@
+import threading
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+spacy = pytest.importorskip('spacy')
+sket = pytest.importorskip('sket.sket')
+
+from sket.utils import utils
+from sket.utils.results_db import ResultsDB
+
+
+REPORTS = {
+	'r1': {'text': 'tubular adenoma'},
+	'r2': {'text': 'normal mucosa'},
+	'r3': {'text': 'colon adenocarcinoma'}
+}
+
+
+def build_sket(tmp_path):
+	# build a SKET instance w/o loading models -- NERD and report processing are stubbed
+	onto = pd.DataFrame({
+		'label': ['colon adenocarcinoma', 'colon adenoma', 'colon'],
+		'semantic_area_label': ['Diagnosis', 'Diagnosis', 'Anatomical Location']})
+	knowledge = {'rules': {'adenoma': {}}, 'dysplasia': {}, 'cin': {}}
+	context = sket.PipelineContext('colon', knowledge, None, onto, None, 'en', None, ())
+
+	def entity_linking(reports, onto, onto_terms, use_case, sim_thr, raw, debug=False, knowledge=None, whole_doc=False):
+		# record linked reports and link each report to the diagnosis it mentions
+		pipe.linked.update(reports.keys())
+		return {rid: {'Diagnosis': [['iri:' + report['text'], report['text']]], 'Anatomical Location': []} for rid, report in reports.items()}
+
+	pipe = sket.SKET.__new__(sket.SKET)
+	pipe.lock, pipe.update_lock, pipe.routers = threading.Lock(), threading.Lock(), dict()
+	pipe.nerd = SimpleNamespace(nlp=spacy.blank('en'), entity_linking=entity_linking)
+	pipe.rep_proc = SimpleNamespace(process_data=lambda ds, debug=False, fields=None: dict(ds))
+	pipe.ad_hoc_med_labeling = {'colon': {'original': utils.colon_concepts2labels}}
+	pipe.whole_doc, pipe.report_cache, pipe.models = False, None, dict()
+	pipe.sources, pipe.hashes = dict(), dict()
+	pipe.results_db = ResultsDB(str(tmp_path / 'results.db'))
+	pipe.get_context = lambda use_case=None, src_lang=None, fields=None: context
+	pipe.linked = set()
+	return pipe
+
+
+def test_empty_concepts(tmp_path):
+	pipe = build_sket(tmp_path)
+	assert pipe.empty_concepts(raw=True) == []
+	# fall back to the current context when no context is given
+	assert pipe.empty_concepts() == {'Diagnosis': [], 'Anatomical Location': []}
+	assert pipe.empty_concepts(context=pipe.get_context()) == pipe.empty_concepts()
+
+
+@pytest.mark.parametrize('prefilter, keywords, skipped', [
+	(True, None, ['r2']),  # use case keywords -- rule triggers and ontology labels
+	(False, ['adenoma'], ['r2', 'r3']),  # source-language keywords
+	(False, None, None)  # no prefilter
+])
+def test_med_pipeline_prefilter(tmp_path, prefilter, keywords, skipped):
+	pipe = build_sket(tmp_path)
+	concepts, labels, _ = pipe.med_pipeline(
+		dict(REPORTS), outputs={'concepts', 'labels'}, prefilter=prefilter, prefilter_keywords=keywords)
+	# skipped reports are not linked
+	assert pipe.linked == set(REPORTS.keys()) - set(skipped or [])
+	for rid in REPORTS.keys():
+		if rid in (skipped or []):  # skipped reports get empty concepts and the labels of empty concepts
+			assert concepts[rid] == {'Diagnosis': [], 'Anatomical Location': []}
+			assert labels[rid] == {'cancer': 0, 'hgd': 0, 'lgd': 0, 'hyperplastic': 0, 'ni': 1}
+		else:
+			assert concepts[rid]['Diagnosis'] == [['iri:' + REPORTS[rid]['text'], REPORTS[rid]['text']]]
+	assert labels['r3']['cancer'] == (0 if 'r3' in (skipped or []) else 1)
+	# skipped reports are recorded w/ the run -- None when the prefilter is not used
+	assert pipe.results_db.runs()[-1]['skipped'] == skipped
+	pipe.results_db.close()
+
+
+TEXTS = {
+	'r1': {'text': 'Tubular adenoma with low grade dysplasia. Hyperplastic polyp of the sigmoid colon.'},
+	'r2': {'text': 'Colon adenocarcinoma, moderately differentiated. No evidence of dysplasia.'},
+	'r3': {'text': 'Tubular adenoma with low grade dysplasia. Hyperplastic polyp of the sigmoid colon.'},
+	'r4': {'text': 'Cervical biopsy w/ koilocytes and CIN2. Squamous metaplasia of the cervix.'}
+}
+
+
+@pytest.fixture(scope='module')
+def sket_pipe():
+	# full SKET w/ the sentence cache enabled -- requires the scispaCy model
+	pytest.importorskip('en_core_sci_sm')
+	return sket.SKET('colon', 'en', 'en_core_sci_sm', True, None, None, False, sentence_cache=1000)
+
+
+@pytest.mark.parametrize('raw', [False, True])
+def test_sentence_linking_matches_whole_doc(sket_pipe, raw):
+	context = sket_pipe.get_context('colon')
+	whole_doc = sket_pipe.nerd.entity_linking(
+		TEXTS, context.onto, context.onto_terms, 'colon', raw=raw, knowledge=context.knowledge, whole_doc=True)
+	# first pass fills the sentence cache, second pass reads it
+	for _ in range(2):
+		sentences = sket_pipe.nerd.entity_linking(
+			TEXTS, context.onto, context.onto_terms, 'colon', raw=raw, knowledge=context.knowledge, whole_doc=False)
+		assert sentences == whole_doc
+	assert context.knowledge['sentences'].hits > 0
+
+
+@pytest.mark.parametrize('raw', [False, True])
+def test_multi_entity_linking_matches_entity_linking(sket_pipe, raw):
+	contexts = {use_case: sket_pipe.get_context(use_case) for use_case in ['colon', 'cervix', 'lung']}
+	# use cases link different (and overlapping) subsets of reports
+	reports = {
+		'colon': TEXTS,
+		'cervix': {rid: TEXTS[rid] for rid in ['r2', 'r4']},
+		'lung': {rid: TEXTS[rid] for rid in ['r1']}}
+	# whole documents are parsed once and shared among use cases
+	multi = sket_pipe.nerd.multi_entity_linking(
+		reports, {use_case: (context.onto, context.onto_terms, context.knowledge) for use_case, context in contexts.items()}, raw=raw, whole_doc=True)
+	assert multi.keys() == reports.keys()
+	for use_case, context in contexts.items():
+		single = sket_pipe.nerd.entity_linking(
+			reports[use_case], context.onto, context.onto_terms, use_case, raw=raw, knowledge=context.knowledge, whole_doc=True)
+		assert multi[use_case] == single
@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+
+from . import utils
+
+
+class ReportCache(object):
+
+	def __init__(self, cache_path, batch_size=10000):
+		"""
+		Open (or create) the SQLite cache storing per-report outputs -- i.e., translations, concepts, labels, and graph fragments
+
+		Params:
+			cache_path (str): cache file path
+			batch_size (int): number of entries inserted within each transaction
+
+		Returns: None
+		"""
+
+		self.cache_path = cache_path
+		self.batch_size = batch_size
+		# share the connection across threads -- writes and reads are serialized by the lock
+		self.lock = threading.Lock()
+		self.conn = sqlite3.connect(cache_path, check_same_thread=False)
+		# write-ahead logging allows readers to proceed during bulk inserts
+		self.conn.execute('PRAGMA journal_mode=WAL')
+		self.conn.execute('PRAGMA synchronous=NORMAL')
+		with self.lock, self.conn:
+			self.conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT, field TEXT, value TEXT, PRIMARY KEY (key, field))')
+
+	def get(self, keys, field):
+		"""
+		Get the cached values of field for the given keys
+
+		Params:
+			keys (list(str)): report keys
+			field (str): cached field -- e.g., 'translation', 'concepts', 'labels', or 'graph'
+
+		Returns: a dict of {key: value} containing cache hits only
+		"""
+
+		keys = list(set(keys))
+		hits = dict()
+		for i in range(0, len(keys), 500):  # look up keys in batches -- SQLite limits the number of query parameters
+			batch = keys[i:i + 500]
+			with self.lock:
+				rows = self.conn.execute(
+					'SELECT key, value FROM entries WHERE field = ? AND key IN (' + ','.join(['?'] * len(batch)) + ')', [field] + batch).fetchall()
+			for key, value in rows:
+				hits[key] = utils.loads_record(value)
+		return hits
+
+	def put(self, field, values):
+		"""
+		Add (or replace) the values of field
+
+		Params:
+			field (str): cached field -- e.g., 'translation', 'concepts', 'labels', or 'graph'
+			values (dict): dict of {key: value}
+
+		Returns: the number of cached values
+		"""
+
+		rows = [(key, field, utils.dumps_record(value)) for key, value in values.items()]
+		for i in range(0, len(rows), self.batch_size):  # insert rows w/ one transaction per batch
+			with self.lock, self.conn:
+				self.conn.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?)', rows[i:i + self.batch_size])
+		return len(rows)
+
+	def clear(self):
+		"""
+		Remove all cached entries
+
+		Returns: None
+		"""
+
+		with self.lock, self.conn:
+			self.conn.execute('DELETE FROM entries')
+
+	def close(self):
+		"""
+		Close the cache connection
+
+		Returns: None
+		"""
+
+		with self.lock:
+			self.conn.close()
@@ -0,0 +1,250 @@
+import json
+import sqlite3
+import datetime
+import threading
+
+from . import utils
+
+
+class ResultsDB(object):
+
+	def __init__(self, db_path, batch_size=10000):
+		"""
+		Open (or create) the SQLite database storing SKET results
+
+		Params:
+			db_path (str): database file path
+			batch_size (int): number of rows inserted within each transaction
+
+		Returns: None
+		"""
+
+		self.db_path = db_path
+		self.batch_size = batch_size
+		# share the connection across threads -- writes and reads are serialized by the lock
+		self.lock = threading.Lock()
+		self.conn = sqlite3.connect(db_path, check_same_thread=False)
+		# write-ahead logging allows readers to proceed during bulk inserts
+		self.conn.execute('PRAGMA journal_mode=WAL')
+		self.conn.execute('PRAGMA synchronous=NORMAL')
+		self.create_tables()
+
+	def create_tables(self):
+		"""
+		Create tables and indexes on report id, IRI, and label
+
+		Returns: None
+		"""
+
+		with self.lock, self.conn:
+			self.conn.executescript(
+				'CREATE TABLE IF NOT EXISTS runs ('
+				'run_id INTEGER PRIMARY KEY AUTOINCREMENT, ds_name TEXT, use_case TEXT, src_lang TEXT, created TEXT, fingerprint TEXT, models TEXT, skipped TEXT);'
+				'CREATE TABLE IF NOT EXISTS reports (run_id INTEGER, report_id TEXT, data TEXT);'
+				'CREATE TABLE IF NOT EXISTS concepts (run_id INTEGER, report_id TEXT, use_case TEXT, semantic_area TEXT, iri TEXT, label TEXT, mention TEXT);'
+				'CREATE TABLE IF NOT EXISTS labels (run_id INTEGER, report_id TEXT, label TEXT, value INTEGER);'
+				'CREATE INDEX IF NOT EXISTS reports_report_id ON reports (report_id);'
+				'CREATE INDEX IF NOT EXISTS concepts_report_id ON concepts (report_id);'
+				'CREATE INDEX IF NOT EXISTS concepts_iri ON concepts (iri);'
+				'CREATE INDEX IF NOT EXISTS concepts_label ON concepts (label);'
+				'CREATE INDEX IF NOT EXISTS labels_report_id ON labels (report_id);'
+				'CREATE INDEX IF NOT EXISTS labels_label ON labels (label, value);'
+				'CREATE INDEX IF NOT EXISTS reports_report_run ON reports (report_id, run_id);'
+				'CREATE INDEX IF NOT EXISTS concepts_report_run ON concepts (report_id, run_id);'
+				'CREATE INDEX IF NOT EXISTS labels_report_run ON labels (report_id, run_id);'
+			)
+			if 'skipped' not in [column[1] for column in self.conn.execute('PRAGMA table_info(runs)')]:  # add skipped reports to runs created by former versions
+				self.conn.execute('ALTER TABLE runs ADD COLUMN skipped TEXT')
+
+	def insert_rows(self, table, rows):
+		"""
+		Insert rows into table w/ one transaction per batch of rows
+
+		Params:
+			table (str): target table
+			rows (iterable(tuple)): rows to insert
+
+		Returns: the number of inserted rows
+		"""
+
+		n_rows = 0
+		batch = []
+		for row in rows:
+			batch.append(row)
+			if len(batch) == self.batch_size:  # insert batch within a single transaction
+				with self.lock, self.conn:
+					self.conn.executemany('INSERT INTO ' + table + ' VALUES (' + ','.join(['?'] * len(row)) + ')', batch)
+				n_rows += len(batch)
+				batch = []
+		if batch:  # insert remaining rows
+			with self.lock, self.conn:
+				self.conn.executemany('INSERT INTO ' + table + ' VALUES (' + ','.join(['?'] * len(batch[0])) + ')', batch)
+			n_rows += len(batch)
+		return n_rows
+
+	def store_run(self, ds_name, use_case, src_lang, fingerprint=None, models=None, skipped=None):
+		"""
+		Store the provenance of a pipeline run
+
+		Params:
+			ds_name (str): dataset name
+			use_case (str): considered use case
+			src_lang (str): considered language
+			fingerprint (dict): hashes of the knowledge sources (ontology, rules, mappings, hierarchies)
+			models (dict): models used throughout the run
+			skipped (set(str)): ids of the reports skipped by the prefilter -- if None, the prefilter was not used
+
+		Returns: the run id
+		"""
+
+		with self.lock, self.conn:
+			cursor = self.conn.execute(
+				'INSERT INTO runs (ds_name, use_case, src_lang, created, fingerprint, models, skipped) VALUES (?, ?, ?, ?, ?, ?, ?)',
+				(
+					ds_name, use_case, src_lang, datetime.datetime.now().isoformat(), json.dumps(fingerprint, sort_keys=True), json.dumps(models, sort_keys=True),
+					json.dumps(sorted(str(rid) for rid in skipped)) if skipped is not None else None))
+			return cursor.lastrowid
+
+	def store_reports(self, run_id, reports):
+		"""
+		Store reports
+
+		Params:
+			run_id (int): the run id
+			reports (dict/iterable(pair)): reports -- can be streamed as (rid, report) pairs
+
+		Returns: the number of stored reports
+		"""
+
+		return self.insert_rows('reports', ((run_id, rid, utils.dumps_record(report)) for rid, report in utils.iter_items(reports)))
+
+	def store_concepts(self, run_id, concepts, use_case):
+		"""
+		Store report concepts -- one row per (report, concept)
+
+		Params:
+			run_id (int): the run id
+			concepts (dict/iterable(pair)): report concepts -- can be streamed as (rid, concepts) pairs
+			use_case (str): considered use case
+
+		Returns: the number of stored concepts
+		"""
+
+		return self.insert_rows('concepts', ((run_id,) + row for row in utils.concepts2rows(concepts, use_case)))
+
+	def store_labels(self, run_id, labels):
+		"""
+		Store report labels -- one row per (report, label)
+
+		Params:
+			run_id (int): the run id
+			labels (dict/iterable(pair)): report labels -- can be streamed as (rid, labels) pairs
+
+		Returns: the number of stored labels
+		"""
+
+		# Radboud labels are nested within 'labels'
+		rows = (
+			(run_id, rid, label, value)
+			for rid, rlabels in utils.iter_items(labels) for label, value in (rlabels['labels'] if 'labels' in rlabels else rlabels).items())
+		return self.insert_rows('labels', rows)
+
+	def query(self, sql, params=()):
+		"""
+		Issue query against the database
+
+		Params:
+			sql (str): the SQL query
+			params (tuple): query parameters
+
+		Returns: the list of returned rows
+		"""
+
+		with self.lock:
+			return self.conn.execute(sql, params).fetchall()
+
+	def reports_with_concept(self, iri, use_case=None):
+		"""
+		Get the reports annotated w/ target concept
+
+		Params:
+			iri (str): the concept IRI
+			use_case (str): considered use case -- if None, consider all use cases
+
+		Returns: the sorted list of report ids
+		"""
+
+		if use_case:  # restrict to use case
+			rows = self.query('SELECT DISTINCT report_id FROM concepts WHERE iri = ? AND use_case = ? ORDER BY report_id', (iri, use_case))
+		else:
+			rows = self.query('SELECT DISTINCT report_id FROM concepts WHERE iri = ? ORDER BY report_id', (iri,))
+		return [row[0] for row in rows]
+
+	def reports_with_label(self, label, value=1):
+		"""
+		Get the reports w/ target label value
+
+		Params:
+			label (str): the label
+			value (int): the label value
+
+		Returns: the sorted list of report ids
+		"""
+
+		rows = self.query('SELECT DISTINCT report_id FROM labels WHERE label = ? AND value = ? ORDER BY report_id', (label, value))
+		return [row[0] for row in rows]
+
+	def report_concepts(self, report_id):
+		"""
+		Get the concepts stored for target report by the latest run that annotated it -- runs w/o concepts for the report return no concepts
+
+		Params:
+			report_id (str): the report id
+
+		Returns: a dict of concepts {semantic_area: [[iri, label], ...]}
+		"""
+
+		rows = self.query(
+			'SELECT semantic_area, iri, label FROM concepts WHERE report_id = ? AND run_id = (SELECT MAX(run_id) FROM reports WHERE report_id = ?) ORDER BY rowid',
+			(report_id, report_id))
+		concepts = dict()
+		for semantic_area, iri, label in rows:
+			concepts.setdefault(semantic_area, []).append([iri, label])
+		return concepts
+
+	def report_labels(self, report_id):
+		"""
+		Get the latest labels stored for target report
+
+		Params:
+			report_id (str): the report id
+
+		Returns: a dict of labels {label: value}
+		"""
+
+		rows = self.query(
+			'SELECT label, value FROM labels WHERE report_id = ? AND run_id = (SELECT MAX(run_id) FROM labels WHERE report_id = ?) ORDER BY rowid',
+			(report_id, report_id))
+		return {label: value for label, value in rows}
+
+	def runs(self):
+		"""
+		Get the provenance of stored runs
+
+		Returns: a list of dicts containing run provenance -- skipped is None for runs w/o prefilter
+		"""
+
+		rows = self.query('SELECT run_id, ds_name, use_case, src_lang, created, fingerprint, models, skipped FROM runs ORDER BY run_id')
+		return [{
+			'run_id': row[0], 'ds_name': row[1], 'use_case': row[2], 'src_lang': row[3], 'created': row[4],
+			'fingerprint': json.loads(row[5]), 'models': json.loads(row[6]), 'skipped': json.loads(row[7]) if row[7] is not None else None} for row in rows]
+
+	def close(self):
+		"""
+		Close the database connection
+
+		Returns: None
+		"""
+
+		with self.lock:
+			self.conn.close()
@@ -0,0 +1,66 @@
+from sket.utils import utils
+from sket.utils.results_db import ResultsDB
+
+
+def stub_linker(text):
+	# link concepts based on the words of text -- outputs of different calls never share lists
+	return {'Diagnosis': [[word, word.upper()] for word in text.split() if word.startswith('ade')], 'Test': []}
+
+
+def test_dedup_texts_fan_out():
+	texts = ['adenoma found', 'no findings', 'adenoma found', 'adenocarcinoma', 'no findings']
+	unique_texts, text_ixs = utils.dedup_texts(texts)
+	assert unique_texts == ['adenoma found', 'no findings', 'adenocarcinoma']
+	assert [unique_texts[ix] for ix in text_ixs] == texts
+	# fanned out concepts match the concepts linked text by text
+	unique_concepts = [stub_linker(text) for text in unique_texts]
+	fanned = [utils.copy_concepts(unique_concepts[ix]) for ix in text_ixs]
+	assert fanned == [stub_linker(text) for text in texts]
+	# reports sharing the same text do not share concept lists
+	fanned[0]['Diagnosis'].append(['polyp', 'POLYP'])
+	assert fanned[2] == stub_linker(texts[2])
+	# mentions+concepts are copied as well
+	raw = [utils.copy_concepts(unique_concepts[ix]['Diagnosis']) for ix in text_ixs]
+	raw[0].clear()
+	assert raw[2] == stub_linker(texts[2])['Diagnosis']
+
+
+def test_dedup_texts_verbose(capsys):
+	# the duplicate rate is printed only when requested
+	utils.dedup_texts(['a', 'a'])
+	assert capsys.readouterr().out == ''
+	utils.dedup_texts(['a', 'a'], verbose=True)
+	assert '50.00% duplicates' in capsys.readouterr().out
+
+
+def test_dumps_record_non_str_keys():
+	# numeric report ids are serialized as strings w/ and w/o orjson
+	assert utils.dumps_record({1: {'Diagnosis': []}}) == '{"1":{"Diagnosis":[]}}'
+	assert utils.dumps_record({'b': 1, 'a': {2: 0}}, sort_keys=True) == '{"a":{"2":0},"b":1}'
+
+
+def test_latest_report_concepts(tmp_path):
+	db = ResultsDB(str(tmp_path / 'results.db'))
+	# first run finds a concept, second run finds none
+	run_id = db.store_run('ds', 'colon', 'en')
+	db.store_reports(run_id, {'r1': {'text': 'adenoma'}})
+	db.store_concepts(run_id, {'r1': {'Diagnosis': [['iri1', 'lab']]}}, 'colon')
+	run_id = db.store_run('ds', 'colon', 'en')
+	db.store_reports(run_id, {'r1': {'text': 'no findings'}})
+	db.store_concepts(run_id, {'r1': {'Diagnosis': []}}, 'colon')
+	assert db.report_concepts('r1') == {}
+	db.close()
+
+
+def test_runs_skipped(tmp_path):
+	db_path = str(tmp_path / 'results.db')
+	db = ResultsDB(db_path)
+	# runs w/o prefilter record no skipped reports
+	db.store_run('ds', 'colon', 'en')
+	db.store_run('ds', 'colon', 'en', skipped={'r2', 'r1'})
+	assert [run['skipped'] for run in db.runs()] == [None, ['r1', 'r2']]
+	db.close()
+	# reopening the database keeps the skipped column
+	db = ResultsDB(db_path)
+	assert db.runs()[1]['skipped'] == ['r1', 'r2']
+	db.close()
@@ -1,5 +1,12 @@
 import os
 import json
+import datetime
+import itertools
+
+try:  # use the C-accelerated JSON encoder/decoder when available
+	import orjson
+except ImportError:
+	orjson = None
 
 
 def assign_gpu(tknz_out, gpu):
@@ -177,6 +184,40 @@ def sanitize_codes(codes):
 	return codes
 
 
+def dedup_texts(texts, verbose=False):
+	"""
+	Group identical texts and (optionally) report the duplicate rate
+
+	Params:
+		texts (list(hashable)): texts to group -- e.g., sanitized report texts or tuples of them
+		verbose (bool): whether to print the duplicate rate
+
+	Returns: the list of unique texts and, for each input text, the index of the corresponding unique text
+	"""
+
+	unique = dict()
+	text_ixs = [unique.setdefault(text, len(unique)) for text in texts]
+	if verbose and texts:  # report duplicate rate
+		print('{} reports, {} unique texts -- {:.2f}% duplicates'.format(len(texts), len(unique), 100 * (1 - len(unique) / len(texts))))
+	return list(unique.keys()), text_ixs
+
+
+def copy_concepts(concepts):
+	"""
+	Copy the containers of linked concepts -- concepts fanned out to several reports do not share lists
+
+	Params:
+		concepts (dict/list): linked concepts -- either within semantic areas or as mentions+concepts
+
+	Returns: the copied concepts
+	"""
+
+	if type(concepts) == dict:  # concepts within semantic areas
+		return {area: list(area_concepts) for area, area_concepts in concepts.items()}
+	else:  # mentions+concepts
+		return list(concepts)
+
+
 def read_rules(rules):
 	"""
 	Read rules stored within file
@@ -271,29 +312,166 @@ def read_report_fields(rfields):
 	return [field.strip() for field in fields if field]
 
 
-def store_concepts(concepts, out_path, indent=4, sort_keys=False):
+def dumps_record(record, sort_keys=False):
+	"""
+	Serialize record as compact JSON -- use orjson when available
+
+	Params:
+		record (dict/list): the record to serialize
+		sort_keys (bool): sort keys
+
+	Returns: the JSON string
+	"""
+
+	if orjson:  # C-accelerated encoder -- serialize non-str keys (e.g., numeric report ids) as strings like json does
+		option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS if sort_keys else orjson.OPT_NON_STR_KEYS
+		return orjson.dumps(record, option=option).decode('utf-8')
+	else:
+		return json.dumps(record, separators=(',', ':'), sort_keys=sort_keys)
+
+
+def loads_record(record):
+	"""
+	Deserialize JSON record -- use orjson when available
+
+	Params:
+		record (str): the JSON string
+
+	Returns: the deserialized record
+	"""
+
+	return orjson.loads(record) if orjson else json.loads(record)
+
+
+def store_json(data, out_path, indent=4, sort_keys=False, append=False):
+	"""
+	Store data as JSON Lines (out_path ending w/ '.jsonl') or as pretty-printed JSON -- JSON Lines contain one compact record per report: {rid: data[rid]} for dicts and data[i] for lists
+
+	Params:
+		data (dict/list): data to store
+		out_path (str): output file-path
+		indent (int): indentation level (pretty-printed JSON only)
+		sort_keys (bool): sort keys
+		append (bool): whether to append records to the existing file (JSON Lines only)
+
+	Returns: True
+	"""
+
+	if os.path.dirname(out_path):
+		os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+	# write (non-appended) outputs to a temporary file and move it in place -- readers and reruns never see partial files
+	tmp_path = out_path if append else out_path + '.tmp'
+	if out_path.endswith('.jsonl'):  # store one record per line
+		records = data.items() if type(data) == dict else data
+		with open(tmp_path, 'a' if append else 'w', encoding='utf-8') as out:
+			for record in records:
+				if type(data) == dict:  # key-value record
+					record = {record[0]: record[1]}
+				out.write(dumps_record(record, sort_keys) + '\n')
+	else:  # store pretty-printed JSON
+		if append:  # raise exception
+			print('append is supported by JSON Lines (.jsonl) files only.')
+			raise Exception
+		with open(tmp_path, 'w') as out:
+			json.dump(data, out, indent=indent, sort_keys=sort_keys)
+	if not append:  # atomically replace the output
+		os.replace(tmp_path, out_path)
+	return True
+
+
+def report_progress(stage, done, total, computed, elapsed):
+	"""
+	Print the progress of a pipeline stage w/ its throughput and estimated time of arrival (ETA)
+
+	Params:
+		stage (str): the pipeline stage
+		done (int): number of reports completed by the stage -- including those restored from checkpoints
+		total (int): total number of reports
+		computed (int): number of reports computed by the stage during the current run
+		elapsed (float): time (in seconds) spent by the stage during the current run
+
+	Returns: None
+	"""
+
+	if computed and elapsed:  # estimate throughput and ETA from the reports computed so far
+		throughput = computed / elapsed
+		eta = str(datetime.timedelta(seconds=int((total - done) / throughput)))
+		print('{}: {}/{} reports -- {:.2f} reports/s -- ETA {}'.format(stage, done, total, throughput, eta))
+	else:  # reports restored from checkpoints
+		print('{}: {}/{} reports -- restored from checkpoints'.format(stage, done, total))
+
+
+def iter_jsonl(fpath):
 	"""
-	Store report concepts 
+	Stream the records stored within JSON Lines file
+
+	Params:
+		fpath (str): file-path to JSON Lines file
+
+	Returns: a generator over stored records
+	"""
+
+	with open(fpath, 'r', encoding='utf-8') as f:
+		for line in f:
+			if line.strip():  # skip empty lines
+				yield loads_record(line)
+
+
+def iter_json(fpath):
+	"""
+	Stream the (key, value) pairs stored within JSON (dict) or JSON Lines ({key: value} records) files
+
+	Params:
+		fpath (str): file-path to JSON or JSON Lines file
+
+	Returns: a generator over stored (key, value) pairs
+	"""
+
+	if fpath.endswith('.jsonl'):  # read one record at a time
+		for record in iter_jsonl(fpath):
+			for key, value in record.items():
+				yield key, value
+	else:  # read the whole dict
+		with open(fpath, 'r') as f:
+			data = json.load(f)
+		for key, value in data.items():
+			yield key, value
+
+
+def load_json(fpath):
+	"""
+	Load dict stored within JSON or JSON Lines file
+
+	Params:
+		fpath (str): file-path to JSON or JSON Lines file
+
+	Returns: the stored dict
+	"""
+
+	return dict(iter_json(fpath))
+
+
+def store_concepts(concepts, out_path, indent=4, sort_keys=False, append=False):
+	"""
+	Store report concepts -- as JSON Lines when out_path ends w/ '.jsonl'
 
 	Params:
 		concepts (dict): report concepts
-		out_path (str): output file-path w/o extension
+		out_path (str): output file-path
 		indent (int): indentation level
 		sort_keys (bool): sort keys
+		append (bool): whether to append concepts to the existing file (JSON Lines only)
 
 	Returns: True
 	"""
 
-	os.makedirs(os.path.dirname(out_path), exist_ok=True)
-
-	with open(out_path, 'w') as out:
-		json.dump(concepts, out, indent=indent, sort_keys=sort_keys)
-	return True
+	return store_json(concepts, out_path, indent, sort_keys, append)
 
 
 def load_concepts(concept_fpath):
 	"""
-	Load stored concepts
+	Load stored concepts -- JSON Lines are read one report at a time
 
 	Params:
 		concept_fpath (str): file-path to stored concepts
@@ -301,34 +479,29 @@ def load_concepts(concept_fpath):
 	Returns: the dict containing the report (stored) concepts
 	"""
 
-	with open(concept_fpath, 'r') as f:
-		concepts = json.load(f)
-	return concepts
+	return load_json(concept_fpath)
 
 
-def store_labels(labels, out_path, indent=4, sort_keys=False):
+def store_labels(labels, out_path, indent=4, sort_keys=False, append=False):
 	"""
-	Store report labels 
+	Store report labels -- as JSON Lines when out_path ends w/ '.jsonl'
 
 	Params:
 		labels (dict): report labels
-		out_path (str): output file-path w/o extension
+		out_path (str): output file-path
 		indent (int): indentation level
 		sort_keys (bool): sort keys
+		append (bool): whether to append labels to the existing file (JSON Lines only)
 
 	Returns: True
 	"""
 
-	os.makedirs(os.path.dirname(out_path), exist_ok=True)
-
-	with open(out_path, 'w') as out:
-		json.dump(labels, out, indent=indent, sort_keys=sort_keys)
-	return True
+	return store_json(labels, out_path, indent, sort_keys, append)
 
 
 def load_labels(label_fpath):
 	"""
-	Load stored labels
+	Load stored labels -- JSON Lines are read one report at a time
 
 	Params:
 		label_fpath (str): file-path to stored labels
@@ -336,9 +509,140 @@ def load_labels(label_fpath):
 	Returns: the dict containing the report (stored) labels
 	"""
 
-	with open(label_fpath, 'r') as f:
-		labels = json.load(f)
-	return labels
+	return load_json(label_fpath)
+
+
+def iter_items(data):
+	"""
+	Iterate over (report id, value) pairs
+
+	Params:
+		data (dict/iterable(pair)): dict keyed by report id or iterable of (report id, value) pairs -- e.g., iter_json(fpath)
+
+	Returns: an iterator over (report id, value) pairs
+	"""
+
+	return iter(data.items()) if type(data) == dict else iter(data)
+
+
+def concepts2rows(concepts, use_case):
+	"""
+	Flatten report concepts into (report_id, use_case, semantic_area, iri, label, mention) rows
+
+	Params:
+		concepts (dict/iterable(pair)): report concepts -- either within semantic areas or as mentions+concepts (raw)
+		use_case (str): the use_case considered
+
+	Returns: a generator over concept rows
+	"""
+
+	for rid, rconcepts in iter_items(concepts):
+		if type(rconcepts) == dict and 'concepts' in rconcepts:  # Radboud concepts
+			rconcepts = rconcepts['concepts']
+		if type(rconcepts) == list:  # mentions+concepts -- [(mention, [iri, label, semantic_area]), ...]
+			for mention, concept in rconcepts:
+				yield rid, use_case, concept[2], concept[0], concept[1], str(mention)
+		else:  # concepts within semantic areas -- {semantic_area: [[iri, label], ...]}
+			for semantic_area, area_concepts in rconcepts.items():
+				for concept in area_concepts:
+					yield rid, use_case, semantic_area, concept[0], concept[1], None
+
+
+def labels2rows(labels, names):
+	"""
+	Flatten report labels into (report_id, label_1, ..., label_n) rows
+
+	Params:
+		labels (dict/iterable(pair)): report labels
+		names (list(str)): label names
+
+	Returns: a generator over label rows
+	"""
+
+	for rid, rlabels in iter_items(labels):
+		if 'labels' in rlabels:  # Radboud labels
+			rlabels = rlabels['labels']
+		yield tuple([rid] + [rlabels.get(name) for name in names])
+
+
+def store_parquet(rows, out_path, columns, types, row_group_size=65536):
+	"""
+	Store rows as Parquet table -- rows are consumed in batches and each batch is written as a row group (requires pyarrow)
+
+	Params:
+		rows (iterable(tuple)): table rows
+		out_path (str): output file-path
+		columns (list(str)): column names
+		types (list(str)): column types -- i.e., 'string' or 'int8'
+		row_group_size (int): max number of rows within each row group
+
+	Returns: True
+	"""
+
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+
+	if os.path.dirname(out_path):
+		os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+	schema = pa.schema([(column, getattr(pa, ctype)()) for column, ctype in zip(columns, types)])
+	writer = pq.ParquetWriter(out_path, schema)
+	try:
+		batch = []
+		written = False
+		for row in rows:
+			batch.append(row)
+			if len(batch) == row_group_size:  # write row group
+				writer.write_table(pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)], schema=schema))
+				batch = []
+				written = True
+		if batch or not written:  # write remaining rows (or the empty table)
+			batch = list(zip(*batch)) if batch else [[] for _ in columns]
+			writer.write_table(pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(batch, schema)], schema=schema))
+	finally:
+		writer.close()
+	return True
+
+
+def store_concepts_parquet(concepts, out_path, use_case, row_group_size=65536):
+	"""
+	Store report concepts as long Parquet table w/ (report_id, use_case, semantic_area, iri, label, mention) columns (requires pyarrow)
+
+	Params:
+		concepts (dict/iterable(pair)): report concepts -- can be streamed, e.g., iter_json(concept_fpath)
+		out_path (str): output file-path
+		use_case (str): the use_case considered
+		row_group_size (int): max number of rows within each row group
+
+	Returns: True
+	"""
+
+	columns = ['report_id', 'use_case', 'semantic_area', 'iri', 'label', 'mention']
+	return store_parquet(concepts2rows(concepts, use_case), out_path, columns, ['string'] * len(columns), row_group_size)
+
+
+def store_labels_parquet(labels, out_path, row_group_size=65536):
+	"""
+	Store report labels as wide Parquet table w/ one column per label -- labels must belong to the same use case (requires pyarrow)
+
+	Params:
+		labels (dict/iterable(pair)): report labels -- can be streamed, e.g., iter_json(label_fpath)
+		out_path (str): output file-path
+		row_group_size (int): max number of rows within each row group
+
+	Returns: True
+	"""
+
+	labels = iter_items(labels)
+	# get label names from the first report
+	first = next(labels, None)
+	if first is None:  # no labels to store
+		names = []
+		labels = []
+	else:
+		names = list((first[1]['labels'] if 'labels' in first[1] else first[1]).keys())
+		labels = itertools.chain([first], labels)
+	return store_parquet(labels2rows(labels, names), out_path, ['report_id'] + names, ['string'] + ['int8'] * len(names), row_group_size)
 
 
 # AOEC RELATED FUNCTIONS
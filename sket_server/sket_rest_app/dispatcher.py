@@ -0,0 +1,109 @@
+import threading
+
+from concurrent.futures import Future
+
+
+class BatchDispatcher(object):
+
+    def __init__(self, sket_pipe, window=0.02, max_batch_size=16):
+        """
+        Collect annotation requests sharing the same (use_case, language, thr) and run them as a single batch
+
+        Params:
+            sket_pipe (SKET): the SKET instance used to annotate reports
+            window (float): max time (in seconds) a request waits for other requests to join its batch
+            max_batch_size (int): max number of requests within a batch -- full batches run without waiting for the window
+
+        Returns: None
+        """
+
+        self.sket_pipe = sket_pipe
+        self.window = window
+        self.max_batch_size = max_batch_size
+        # pending batches for each (use_case, language, thr) key
+        self.lock = threading.Lock()
+        self.batches = dict()
+
+    def submit(self, ds, use_case, language, thr, store, rdf_format, outputs=None):
+        """
+        Add request to the pending batch for (use_case, language, thr) and wait for its outputs
+
+        Params:
+            ds (dict): dataset
+            use_case (str): considered use case
+            language (str): considered language
+            thr (float): similarity threshold
+            store (bool): whether to store concepts, labels, and RDF graphs
+            rdf_format (str): RDF format used to serialize graphs
+            outputs (set(str)): requested outputs -- if None, outputs are set based on store and rdf_format
+
+        Returns: concepts, labels, and RDF graphs -- as returned by med_pipeline
+        """
+
+        key = (use_case, language, thr)
+        future = Future()
+        with self.lock:
+            batch = self.batches.get(key)
+            if batch is None:  # open a new batch and schedule its execution at the end of the window
+                batch = []
+                self.batches[key] = batch
+                timer = threading.Timer(self.window, self.flush, args=(key, batch))
+                timer.daemon = True
+                timer.start()
+            batch.append((ds, store, rdf_format, outputs, future))
+            if len(batch) >= self.max_batch_size:  # batch is full -- run it in the current thread
+                self.batches.pop(key)
+            else:  # wait for the window to expire
+                batch = None
+        if batch:
+            self.run(key, batch)
+        return future.result()
+
+    def flush(self, key, batch):
+        """
+        Run the given batch if it is still pending (i.e., it did not fill up during the window)
+
+        Params:
+            key (tuple): the (use_case, language, thr) key
+            batch (list): the batch to run
+
+        Returns: None
+        """
+
+        with self.lock:
+            if self.batches.get(key) is not batch:  # batch already run
+                return
+            self.batches.pop(key)
+        self.run(key, batch)
+
+    def run(self, key, batch):
+        """
+        Annotate the batch w/ one pass over all its reports and fan outputs out to the waiting requests
+
+        Params:
+            key (tuple): the (use_case, language, thr) key
+            batch (list): the list of (ds, store, rdf_format, outputs, future) requests
+
+        Returns: None
+        """
+
+        use_case, language, thr = key
+        # collect the outputs of completed requests -- they are already stored and must not be annotated again
+        completed = []
+        try:
+            outputs = self.sket_pipe.med_batch_pipeline(
+                [request[0] for request in batch], language, use_case, thr,
+                stores=[request[1] for request in batch], rdf_formats=[request[2] for request in batch], outputs=[request[3] for request in batch],
+                completed=completed)
+        except Exception as e:  # batch failed -- annotate the remaining requests one by one so that failures affect only the faulty requests
+            print('batch annotation failed after {} of {} requests: {} -- annotating remaining requests one by one'.format(len(completed), len(batch), e))
+            for request, output in zip(batch, completed):
+                request[4].set_result(output)
+            for ds, store, rdf_format, outputs, future in batch[len(completed):]:
+                try:
+                    future.set_result(self.sket_pipe.med_pipeline(ds, language, use_case, thr, store, rdf_format, raw=False, debug=False, outputs=outputs))
+                except Exception as e:
+                    future.set_exception(e)
+        else:
+            for request, output in zip(batch, outputs):
+                request[4].set_result(output)
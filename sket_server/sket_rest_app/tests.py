@@ -1,3 +1,110 @@
-from django.test import TestCase
+import threading
+import unittest
 
-# Create your tests here.
+from sket_server.sket_rest_app.dispatcher import BatchDispatcher
+
+
+class StubPipe(object):
+
+    def __init__(self, fail_batch=False, completed=0, fail_ids=()):
+        """
+        Set a stub SKET instance returning the dataset id as output
+
+        Params:
+            fail_batch (bool): whether med_batch_pipeline fails
+            completed (int): number of datasets completed before med_batch_pipeline fails
+            fail_ids (iterable(str)): dataset ids for which med_pipeline fails
+
+        Returns: None
+        """
+
+        self.fail_batch = fail_batch
+        self.completed = completed
+        self.fail_ids = set(fail_ids)
+        self.batches = []
+        self.singles = []
+
+    def med_batch_pipeline(self, datasets, src_lang=None, use_case=None, sim_thr=0.7, stores=None, rdf_formats=None, outputs=None, completed=None):
+        self.batches.append(([ds['id'] for ds in datasets], threading.current_thread()))
+        if self.fail_batch:  # complete the first datasets and fail
+            completed.extend('batch-' + ds['id'] for ds in datasets[:self.completed])
+            raise ValueError('batch failed')
+        return ['batch-' + ds['id'] for ds in datasets]
+
+    def med_pipeline(self, ds, src_lang=None, use_case=None, sim_thr=0.7, store=False, rdf_format='all', raw=False, debug=False, outputs=None):
+        self.singles.append((ds['id'], raw, debug, outputs))
+        if ds['id'] in self.fail_ids:
+            raise ValueError('request ' + ds['id'] + ' failed')
+        return 'single-' + ds['id']
+
+
+def submit_all(dispatcher, ids):
+    """
+    Submit one request per id from concurrent threads
+
+    Returns: a dict containing the result (or the exception) of each request
+    """
+
+    results = dict()
+
+    def submit(rid):
+        try:
+            results[rid] = dispatcher.submit({'id': rid}, 'colon', 'en', 0.9, False, 'turtle', {'concepts'})
+        except Exception as e:
+            results[rid] = e
+
+    threads = [threading.Thread(target=submit, args=(rid,)) for rid in ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class BatchDispatcherTest(unittest.TestCase):
+
+    def test_flush_after_window(self):
+        # a single request runs once the window expires -- within the timer thread
+        pipe = StubPipe()
+        dispatcher = BatchDispatcher(pipe, window=0.01, max_batch_size=16)
+        self.assertEqual(dispatcher.submit({'id': 'a'}, 'colon', 'en', 0.9, False, 'turtle'), 'batch-a')
+        self.assertEqual(pipe.batches[0][0], ['a'])
+        self.assertIsInstance(pipe.batches[0][1], threading.Timer)
+
+    def test_full_batch_runs_in_submitting_thread(self):
+        # full batches do not wait for the window
+        pipe = StubPipe()
+        dispatcher = BatchDispatcher(pipe, window=60, max_batch_size=2)
+        results = submit_all(dispatcher, ['a', 'b'])
+        self.assertEqual(results, {'a': 'batch-a', 'b': 'batch-b'})
+        self.assertEqual(len(pipe.batches), 1)
+        self.assertNotIsInstance(pipe.batches[0][1], threading.Timer)
+
+    def test_fan_out(self):
+        # each request gets the output of its own dataset
+        pipe = StubPipe()
+        dispatcher = BatchDispatcher(pipe, window=0.2, max_batch_size=16)
+        results = submit_all(dispatcher, ['a', 'b', 'c'])
+        self.assertEqual(results, {'a': 'batch-a', 'b': 'batch-b', 'c': 'batch-c'})
+        self.assertEqual(sorted(pipe.batches[0][0]), ['a', 'b', 'c'])
+        self.assertEqual(pipe.singles, [])
+
+    def test_fallback_when_batch_fails(self):
+        # requests are annotated one by one -- failures affect only the faulty request
+        pipe = StubPipe(fail_batch=True, fail_ids=['b'])
+        dispatcher = BatchDispatcher(pipe, window=0.2, max_batch_size=16)
+        results = submit_all(dispatcher, ['a', 'b', 'c'])
+        self.assertEqual(results['a'], 'single-a')
+        self.assertIsInstance(results['b'], ValueError)
+        self.assertEqual(str(results['b']), 'request b failed')
+        self.assertEqual(results['c'], 'single-c')
+        self.assertEqual(sorted(pipe.singles), [(rid, False, False, {'concepts'}) for rid in ['a', 'b', 'c']])
+
+    def test_fallback_skips_completed_requests(self):
+        # requests completed before the batch failed are not annotated again
+        pipe = StubPipe(fail_batch=True, completed=1)
+        dispatcher = BatchDispatcher(pipe, window=0.2, max_batch_size=16)
+        results = submit_all(dispatcher, ['a', 'b'])
+        first = pipe.batches[0][0][0]
+        self.assertEqual(results[first], 'batch-' + first)
+        self.assertEqual([single[0] for single in pipe.singles], [rid for rid in ['a', 'b'] if rid != first])
@@ -13,5 +13,6 @@ urlpatterns = [
     path('annotate/<use_case>/<language>/<obj>/<rdf_format>', views.annotate, name='annotate'),    
     path('annotate/<use_case>/<language>/<obj>', views.annotate, name='annotate'), 
     path('annotate/<use_case>/<language>', views.annotate, name='annotate'),
+    path('reload', views.reload, name='reload'),
 
 ]
@@ -2,7 +2,7 @@ import json
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from sket_server.sket_rest_config import sket_pipe
+from sket_server.sket_rest_config import sket_pipe, dispatcher
 from django.core.files.storage import FileSystemStorage
 import shutil
 import os
@@ -50,6 +50,12 @@ def annotate(request, use_case=None, language=None, obj=None, rdf_format=None):
             rdf_format = 'all'
         if store == True and obj in ['n3', 'turtle', 'trig', 'all']:
             rdf_format = obj
+        # restrict the pipeline to the requested outputs (all outputs when storing)
+        outputs = None
+        if obj in ['concepts', 'labels']:
+            outputs = {obj}
+        elif obj == 'graphs':
+            outputs = {rdf_format}
 
 
         if len(request.FILES) > 0:
@@ -60,9 +66,8 @@ def annotate(request, use_case=None, language=None, obj=None, rdf_format=None):
             print('json')
             if type(request.data) == dict:
                 request_body = request.data
-                concepts, labels, rdf_graphs = sket_pipe.med_pipeline(request_body, language, use_case, thr, store,
-                                                                      rdf_format,
-                                                                      False, False)
+                # requests for the same use case and language are batched together
+                concepts, labels, rdf_graphs = dispatcher.submit(request_body, use_case, language, thr, store, rdf_format, outputs)
         elif len(files) > 0:
             for file in files:
                 workpath = os.path.dirname(os.path.abspath(__file__))
@@ -74,7 +79,7 @@ def annotate(request, use_case=None, language=None, obj=None, rdf_format=None):
                 try:
                     concepts, labels, rdf_graphs = sket_pipe.med_pipeline(uploaded_file_path, language, use_case, thr,
                                                                           store, rdf_format,
-                                                                          False, False)
+                                                                          False, False, outputs)
                 except Exception as e:
                     print(e)
                     js_resp = {'error': 'an error occurred: ' + str(e) + '.'}
@@ -99,3 +104,11 @@ def annotate(request, use_case=None, language=None, obj=None, rdf_format=None):
     else:
         return Response(json_resp_single, status=status.HTTP_201_CREATED)
 
+
+@api_view(['POST'])
+def reload(request):
+    # reload the knowledge source files (rules, mappings, ontology, hierarchies) that changed on disk -- artefacts are rebuilt in background
+    # and swapped in atomically, so that in-flight requests complete with the previous knowledge
+    sket_pipe.reload(background=True)
+    json_resp = {"response": "reload started."}
+    return Response(json_resp, status=status.HTTP_202_ACCEPTED)
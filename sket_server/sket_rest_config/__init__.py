@@ -6,6 +6,7 @@ pp = os.path.join(workpath,'../../')
 import sys
 sys.path.insert(0,pp)
 from sket.sket import SKET
+from sket_server.sket_rest_app.dispatcher import BatchDispatcher
 print('start sket initialization')
 
 output_concepts_dir = os.path.join(workpath, './config.json')
@@ -13,6 +14,8 @@ f = open(output_concepts_dir,'r')
 data = json.load(f)
 st = time.time()
 # sket_pipe = SKET('colon', 'en', 'en_core_sci_sm', True, None, None, False, 0)
-sket_pipe = SKET('colon', 'en', 'en_core_sci_sm', data['w2v_model'], data['fasttext_model'], data['bert_model'], data['string_model'],data['gpu'])
+sket_pipe = SKET('colon', 'en', 'en_core_sci_sm', data['w2v_model'], data['fasttext_model'], data['bert_model'], data['string_model'],data['gpu'], results_db=data.get('results_db'), report_cache=data.get('report_cache'), sentence_cache=data.get('sentence_cache'), whole_doc=data.get('whole_doc', False))
 end = time.time()
 print('sket initialization completed in: ',str(end-st), ' seconds')
+# collect concurrent annotation requests sharing use case and language into batches
+dispatcher = BatchDispatcher(sket_pipe, data.get('batch_window_ms', 20) / 1000, data.get('max_batch_size', 16))